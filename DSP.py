@@ -3,8 +3,12 @@
 
 import sys
 import re
+import functools
+import weakref
+import os
+import struct
+from fractions import Fraction
 import numpy as np
-import matplotlib.pyplot as plt
 
 
 # TODOS:
@@ -20,21 +24,7 @@ import matplotlib.pyplot as plt
 #         ourselves and ultimately create the self.Type field and methods.
 # (s005): Should signal base classes have a fundamental-frequency of period? 
 # 
-# 
-# Plotting Related: 
-# =================
-# Note to self: This should be kept to a very minimum. MatplotLib is too flexible (complicated and complex) 
-#               to properly map all functionality. However, simple plotting functions should be consdiered. 
-# 
-# (p001): signal.tplot()
-#         signal.fplot() (dft or fft must first be taken).
-#         signal.tstem()
-#         signal.fstem() 
-# (p002): Related to (p001), Shoule we offer an keyword arg for the user to select the x-axis to be shown
-#         as time-stamps (Ts*[0,1,2,...,N-1]) or sample indices ([0,1,2,..., N-1])
-# (p003): Consider mergeing signal.__plot and signal.__stem into a single location (only do so when you move to 
-#         managing Figure objects).
-# (p004): ** Add docs to makeFigure, subplot, and makeGridSpec, showFigures() 
+# Plotting related TODOs are kept in DSPplot.py.
 #
 
 __author__ = "Max Sbabo, GIT: sbaby171"
@@ -60,96 +50,364 @@ SI_UNITS = {'ps' : 10**(-12), 'ns' : 10**(-9), 'us' : 10**(-6), 'ms' : 10**(-3),
            'THz' : 10**12, 'GHz' : 10**9, 'MHz' : 10**6, 'kHz' : 10**3, 'khz' : 10**3 ,
              'T' : 10**12, 'G' : 10**9, 'M' : 10**6, 'k' : 10**3} 
 
+# Note: <sign><value>[.<decimals>][e<exponent>] [<SI-Unit>], surrounding and inner blanks allowed.
+_SI_PATTERN = re.compile(r'^\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*([a-zA-Z]*)\s*$')
+SICACHE = 4096 # Note: Distinct strings remembered by the SI parser (LRU).
+
+def _parseSI(value): 
+    """ 
+    Parse one value (see SItoString); raises ValueError with the reason. 
+    """
+    if not isinstance(value, str): 
+        try: 
+            return float(value)
+        except (TypeError, ValueError): 
+            raise ValueError("%r is not a number or string"%(value,))
+    match = _SI_PATTERN.match(value)
+    if match is None: 
+        try: 
+            return float(value) # Note: "inf", "nan", ...
+        except ValueError: 
+            raise ValueError("%r does not match <value>[<SI-Unit>]"%(value,))
+    unit = match.group(2)
+    if not unit: 
+        return float(match.group(1))
+    if unit not in SI_UNITS: 
+        raise ValueError("%r has an unknown SI-Unit %r (options = %s)"%(value, unit, str(list(SI_UNITS.keys()))))
+    return float(match.group(1)) * float(SI_UNITS[unit])
+
+_SIcache = functools.lru_cache(maxsize=SICACHE)(_parseSI)
+
 def SItoString(inStr):
     """ 
     Convert string, with or without SI-Units, into a float data type. 
     
-    Syntax: <value>[.<decimals>]<SI-Unit>
+    Syntax: [-]<value>[.<decimals>][e<exponent>][ ]<SI-Unit>   (see SI_UNITS)
+    Numbers (int, float, numpy scalars) are returned as floats. 
         
     Concept examples: 
     -----------------
-      Ex.) inStr = str("200 kHz") -> str("200kHz") -> float(200*(10**3))
-      Ex.) inStr = str("30.0 us") -> str("30.0us") -> float(30*(10**(-6)))
+      Ex.) inStr = str("200 kHz") -> float(200*(10**3))
+      Ex.) inStr = str("30.0us")  -> float(30*(10**(-6)))
+      Ex.) inStr = str("-1.5e2 MHz") -> float(-150*(10**6))
     
     Useage example:
     ---------------
       >> tmp = str("30.0 us")
-      >> dsp.SI_string_to_float(tmp, debug = True)
+      >> dsp.SItoString(tmp)
             
     Return: 
     -------
       ret : Float variable representing input-string.    
 
+    NOTE: Parsed strings are kept in an LRU cache of SICACHE entries. For lists or 
+          arrays of values use SItoArray.
     """
     func = "SItoString"
 
-    result = None
+    if isinstance(inStr, (int, float)): 
+        return float(inStr)
+    try: 
+        return _SIcache(inStr)
+    except (ValueError, TypeError) as error: 
+        raise RuntimeError("(%s): Input string is not compatiable: %s"%(func, str(error)))
 
-    p = re.compile(r'([\d\.]+)([a-zA-Z]+)')
-    letters = p.search(inStr)
+def SItoArray(values, errors="raise"):
+    """ 
+    Convert a list (or array) of strings and/or numbers with SI-Units into a float ndarray. 
 
-    if letters:
-        try:
-           value = float(letters.group(1))           
-           scale = float(SI_UNITS[letters.group(2)]) 
-           result = value * scale
-        except:
-           raise RuntimeError("(%s): Input string is not compatiable"%(func))
-    else:
+    Each distinct string is parsed once (LRU cache, shared with SItoString), so 
+    configuration files with many repeated tokens load at dictionary-lookup speed. 
+
+    Parameters: 
+    -----------
+    values : list, tuple or numpy.ndarray 
+        Entries accepted by SItoString. Numeric arrays are converted directly. 
+
+    errors : str, default: "raise"
+        "raise": raise a RuntimeError listing every element that failed (index, 
+        value, reason). "nan": set those elements to NaN. 
+
+    Useage example:
+    ---------------
+      >> DSP.SItoArray(["200 kHz", "30.0 us", "-3dB"], errors="nan")  -> array([2e+05, 3e-05, nan])
+
+    Return: 
+    -------
+      ret : numpy.ndarray (float64), shaped like 'values'. 
+    """
+    func = "SItoArray"
+
+    if errors not in ("raise", "nan"): 
+        raise ValueError("ERROR: (%s): Arguement (%s) only takes the following options = %s"%(func,"errors",str(["raise","nan"])))
+    arr = values if isinstance(values, np.ndarray) else None
+    if arr is not None and arr.dtype.kind in "biuf": 
+        return arr.astype(float)
+    shape = np.shape(values) if arr is not None else (len(values),)
+    flat = arr.ravel().tolist() if arr is not None else values
+    try: 
+        return np.fromiter(map(_SIcache, flat), dtype=float, count=len(flat)).reshape(shape)
+    except (ValueError, TypeError): 
+        pass
+    # Note: Second pass only when something failed, to report every bad element.
+    out = np.empty(len(flat), dtype=float)
+    bad = []
+    for k, value in enumerate(flat): 
         try: 
-            result = float(inStr)  
-        except: 
-            raise RuntimeError("(%s): Input string is not compatiable"%(func))
-         
-    return result
-
-
-
-# TODO: Look at all plt.figure() input vars + look into FIgure.supt()
-# Default Figure settings. 
-FIGSIZEW = 10.0 # matplotlib default = 6.4
-FIGSIZEH =  8.0 # matplotlib default = 4.8
-FIGSIZE  = [FIGSIZEW, FIGSIZEH]
-DPI = 100       # matplotlib default = 100
-FACECOLOR = 'w' # matplotlib default = 'w'
-EDGECOLOR = 'w' # matplotlib default = 'w'
-FIGI = 0 
-def makeFigure(grid=True, t=None, figsize=None, dpi=None, facecolor=None, edgecolor=None, num=None, frameon=True, debug=False):
-    func = "makeFigure" 
-
-    global FIGI 
-    FIGI += 1
-    if (debug): print("DEBUG: (%s): FIGI = %d"%(func, FIGI))
-
-    # Set default values: 
-    if grid: 
-        plt.rcParams['axes.grid'] = True 
-    if not figsize:
-        figsize = FIGSIZE
-    if not dpi:
-        dpi = DPI
-    if not facecolor:
-        facecolor = FACECOLOR
-    if not edgecolor:
-        edgecolor = EDGECOLOR
-    # Create 'Figure' object
-    if not num: 
-        figure = plt.figure(num=FIGI, figsize=figsize, dpi=dpi, facecolor=facecolor, edgecolor=edgecolor, frameon=frameon)
-    else: 
-        figure = plt.figure(num=num, figsize=figsize, dpi=dpi, facecolor=facecolor, edgecolor=edgecolor, frameon=frameon)
-    if (debug): print("DEBUG: (%s): Figure = %s"%(func, figure))
+            out[k] = _SIcache(value)
+        except (ValueError, TypeError) as error: 
+            out[k] = np.nan
+            bad.append("[%d] %s"%(k, str(error)))
+    if bad and errors == "raise": 
+        shown = "\n  ".join(bad[:20]) + ("\n  ... (%d more)"%(len(bad) - 20) if len(bad) > 20 else "")
+        raise RuntimeError("(%s): %d of %d elements are not compatiable:\n  %s"%(func, len(bad), len(flat), shown))
+    return out.reshape(shape)
 
-    # Add title to figure. (TODO: other args. See source for figure.suptitle())
-    if t: 
-        figure.suptitle(t=t)
-  
-    # Return 'Figure' object
-    return figure
 
-def makeGridSpec(figure, nrows=1, ncols=1, wspace=None, hspace=None, debug=False):
-    func = "makeGridspec"
-    GS = figure.add_gridspec(nrows=nrows, ncols=ncols, hspace=hspace, wspace=wspace)
-    return GS
+
+# Plotting layer: 
+# ===============
+# makeFigure, makeGridSpec, subplot, showFigures, the figure defaults and the signal 
+# plotting methods are implemented in DSPplot.py. It is imported (together with 
+# matplotlib) on first use only, so the compute core starts fast and stays headless.
+_PLOTTING = ["makeFigure", "makeGridSpec", "subplot", "showFigures", "plotSignal", "plt", 
+             "drawSamples", "Pyramid", "STEMMAX", "renderFigure", "exportFigures", 
+             "FIGSIZEW", "FIGSIZEH", "FIGSIZE", "DPI", "FACECOLOR", "EDGECOLOR", "FIGI"]
+
+def __getattr__(name):
+    if name in _PLOTTING: 
+        import DSPplot
+        return getattr(DSPplot, name)
+    raise AttributeError("module %r has no attribute %r"%(__name__, name))
+
+# Instrumentation:
+# ================
+# A per-process registry of stage timings, counters and structured events. It is 
+# disabled by default; every instrumented hot path then costs a single attribute 
+# test (PROFILER.enabled). Enable it to find where a pipeline spends its time: 
+#
+#   >> DSP.PROFILER.enable(memory=True)
+#   >> x = DSP.sin(Fo=1e3, Fs=48e3, N=1<<20, Noise=DSP.Noise("awg", std=0.1, size=1<<20))
+#   >> DSP.PROFILER.summary()["stages"]["sin.waveform"]   -> count, total_s, bytes, hist, ...
+#   >> DSP.PROFILER.toChromeTrace("trace.json")          # open in chrome://tracing or Perfetto
+#
+# Instrumented stages: signal construction (sin/cos/cexp: '<class>.init', '.sanity_checks', 
+# '.axis', '.waveform', '.noise'), NCO.generate, Noise.generate, SignalExpr.evaluate, 
+# signal.fft, signal.save, FIR/IIR/Resampler.filter, Analytic.filter, DDC.filter, 
+# Channelizer/Synthesizer.filter, Kernel.full, Correlator.update, Welch.update and ToneDetector.update. 
+# Debug output ('debug=True') is emitted through Profiler.event(), which also records 
+# it in the trace when the registry is enabled.
+
+class Profiler(object):
+    """ 
+    Registry of stage timings (with log2 histograms), counters and events. 
+
+    Stages are timed with marks: 
+
+      >> m = PROFILER.mark() 
+      >> ... work ... 
+      >> m = PROFILER.lap("stage", m)   # records the stage, returns a new mark 
+
+    or, outside of hot paths, with the context manager 'with PROFILER.stage("name"):'. 
+    With memory=True, tracemalloc is started and each stage also records the net 
+    number of bytes it allocated. 
+    """
+    def __init__(self): 
+        self.enabled = False
+        self.memory  = False
+        self.maxEvents = 1 << 20
+        self._lock = None
+        self.reset()
+
+    def enable(self, memory=False, maxEvents=1 << 20): 
+        """ 
+        Start recording. memory=True also counts allocated bytes (tracemalloc; slower). 
+        """
+        import threading, time, tracemalloc
+        self._lock = threading.Lock()
+        self._time = time.perf_counter_ns
+        self._tid  = threading.get_ident
+        self.memory = bool(memory)
+        self.maxEvents = int(maxEvents)
+        if self.memory and not tracemalloc.is_tracing(): 
+            tracemalloc.start()
+            self._tracing = True
+        self._traced = tracemalloc.get_traced_memory
+        if self._t0 is None: 
+            self._t0 = self._time()
+        self.enabled = True
+        return self
+
+    def disable(self): 
+        """ 
+        Stop recording (the collected data is kept until reset()). 
+        """
+        self.enabled = False
+        if self._tracing: 
+            import tracemalloc
+            tracemalloc.stop()
+            self._tracing = False
+        return self
+
+    def reset(self): 
+        """ 
+        Drop all collected data. 
+        """
+        self.counters = {}
+        self.stages   = {} # Note: name -> [count, total ns, min ns, max ns, bytes, {log2 bucket : count}]
+        self.events   = [] # Note: Chrome trace events.
+        self.dropped  = 0
+        self._t0 = None
+        self._tracing = False
+
+    def mark(self): 
+        """ 
+        Current (time ns, traced bytes) for a following lap(). 
+        """
+        return (self._time(), self._traced()[0] if self.memory else 0)
+
+    def lap(self, name, mark, **fields): 
+        """ 
+        Record stage 'name' as having run since 'mark'; return a new mark. 
+        """
+        now = self.mark()
+        self.record(name, now[0] - mark[0], max(0, now[1] - mark[1]), start=mark[0], **fields)
+        return now
+
+    def record(self, name, ns, nbytes=0, start=None, **fields): 
+        """ 
+        Add one stage duration (ns) and its allocated bytes to the registry. 
+        """
+        with self._lock: 
+            st = self.stages.get(name)
+            if st is None: 
+                st = self.stages[name] = [0, 0, ns, ns, 0, {}]
+            st[0] += 1
+            st[1] += ns
+            st[2] = min(st[2], ns)
+            st[3] = max(st[3], ns)
+            st[4] += nbytes
+            bucket = max(0, int(ns).bit_length() - 1) # Note: floor(log2(ns)).
+            st[5][bucket] = st[5].get(bucket, 0) + 1
+            if len(self.events) < self.maxEvents: 
+                if start is None: 
+                    start = self._time() - ns
+                args = dict(fields)
+                if nbytes: 
+                    args["bytes"] = nbytes
+                self.events.append({"name" : name, "ph" : "X", "ts" : (start - self._t0)/1e3, "dur" : ns/1e3, 
+                                    "pid" : os.getpid(), "tid" : self._tid(), "args" : args})
+            else: 
+                self.dropped += 1
+
+    def count(self, name, n=1): 
+        """ 
+        Increase counter 'name' by n. 
+        """
+        with self._lock: 
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def event(self, name, debug=False, **fields): 
+        """ 
+        Structured event: recorded (as an instant trace event) when the registry is 
+        enabled, printed as a DEBUG line when 'debug' is set. 
+        """
+        if debug: 
+            print("DEBUG: (%s): %s"%(name, ", ".join("%s = %s"%(k, str(v)) for k, v in fields.items())))
+        if self.enabled: 
+            with self._lock: 
+                if len(self.events) < self.maxEvents: 
+                    self.events.append({"name" : name, "ph" : "i", "s" : "t", "ts" : (self._time() - self._t0)/1e3, 
+                                        "pid" : os.getpid(), "tid" : self._tid(), 
+                                        "args" : dict((k, v if isinstance(v, (int, float, str, bool)) else str(v)) for k, v in fields.items())})
+                else: 
+                    self.dropped += 1
+
+    def stage(self, name, **fields): 
+        """ 
+        Context manager timing the enclosed block as stage 'name' (no-op when disabled). 
+        """
+        return _Stage(self, name, fields) if self.enabled else _NOSTAGE
+
+    def summary(self): 
+        """ 
+        Return the registry as a dict: counters, and per stage count, total/mean/min/max 
+        seconds, bytes and a histogram {upper bound in seconds : count} of log2 buckets. 
+        """
+        stages = {}
+        for name, (n, total, lo, hi, nbytes, hist) in sorted(self.stages.items()): 
+            stages[name] = {"count" : n, "total_s" : total/1e9, "mean_s" : total/1e9/n, "min_s" : lo/1e9, "max_s" : hi/1e9, 
+                            "bytes" : nbytes, "hist" : dict(("%.3g"%(2.0**(b + 1)/1e9), c) for b, c in sorted(hist.items()))}
+        return {"counters" : dict(self.counters), "stages" : stages, "events" : len(self.events), "dropped" : self.dropped}
+
+    def toJSON(self, path=None): 
+        """ 
+        Write summary() as JSON to 'path' (or return the JSON string). 
+        """
+        import json
+        text = json.dumps(self.summary(), indent=2)
+        if path is None: 
+            return text
+        with open(path, "w") as f: 
+            f.write(text)
+
+    def toChromeTrace(self, path=None): 
+        """ 
+        Write the recorded events in the Chrome trace event format (chrome://tracing, Perfetto). 
+        """
+        import json
+        trace = {"traceEvents" : list(self.events), "displayTimeUnit" : "ms", 
+                 "otherData" : {"counters" : dict(self.counters)}}
+        if path is None: 
+            return trace
+        with open(path, "w") as f: 
+            json.dump(trace, f)
+
+
+class _Stage(object): 
+    __slots__ = ("prof", "name", "fields", "start")
+    def __init__(self, prof, name, fields): 
+        self.prof, self.name, self.fields = prof, name, fields
+    def __enter__(self): 
+        self.start = self.prof.mark()
+        return self
+    def __exit__(self, *exc): 
+        self.prof.lap(self.name, self.start, **self.fields)
+        return False
+
+class _NoStage(object): 
+    __slots__ = ()
+    def __enter__(self): 
+        return self
+    def __exit__(self, *exc): 
+        return False
+
+_NOSTAGE = _NoStage()
+
+PROFILER = Profiler() # Note: The per-process registry.
+
+def _timed(name): 
+    """ 
+    Method decorator: record each call as stage 'name' while PROFILER is enabled 
+    (with L = length of the last axis of the first argument, when it has one). 
+    """
+    def wrap(method): 
+        @functools.wraps(method)
+        def timed(self, *args, **kwargs): 
+            if not PROFILER.enabled: 
+                return method(self, *args, **kwargs)
+            m = PROFILER.mark()
+            ret = method(self, *args, **kwargs)
+            shape = getattr(args[0], "shape", None) if args else None
+            if shape: 
+                PROFILER.lap(name, m, L=int(shape[-1]))
+                PROFILER.count(name + ".samples", int(np.prod(shape)))
+            else: 
+                PROFILER.lap(name, m)
+            return ret
+        return timed
+    return wrap
+
 
 def hello_world():
     print("Hello world from DSP module.")
@@ -182,59 +440,6 @@ def resolve_freq_and_period(f,p):
 
 
 
-# TODO: Track the keyword arg 'show'. I want to remove it but not sure yet. So just set to 'true' for now
-def subplot(signals, dim, show=True, debug=False):
-    """ 
-    Produce a subplot of signals using matplotlib.pyplot.stem function
-
-    Parameters: 
-    ----------
-    signals : list
-    	A list of signals to be plotted. 
-    
-    dim : list or tuple 
-    	Number of rows and columns in grid. 
-        Ex.) (2,3) -> 2 rows, 3 columns
-
-    """
-    func = "subplot"
-    _signals = len(signals)
-    
-    nrows = dim[0]
-    ncols = dim[1]
-
-    # Create GridSpec: 
-    hspace = .5
-    wspace = None 
-    figure = makeFigure() #  figure : Figure (matplotlib.figure.Figure)
-    gridspec = makeGridSpec(figure, nrows=nrows, ncols=ncols, wspace=wspace, hspace=hspace)
-
-    i = 0 
-    for ir in range(nrows):
-        for ic in range(ncols): 
-            # TODO: Here there is potential to extract nameing out the signal objects and place them on the labels.
-            ax = figure.add_subplot(gridspec[ir,ic], xlabel = "Signal:%d"%i)
-
-            # Signal type: signal OR numpy.ndarray
-            signalType = str(type(signals[i]))
-            if debug: print("DEBUG: (%s): Signal-type = %s"%(func,signalType))   
-            if "ndarray" in signalType:
-                ax.stem(signals[i])
-            else: 
-                ax.stem(signals[i].nTs, signals[i].TimeSignal)
-            i+=1
-    if show:
-        plt.show()
-    
-    return
-
-
-def showFigures():
-    plt.show(); 
-    return;
-    
-
-
 def dSignal(a=1.0, dc=0.0, fo=5000.0, n=256, phase=0.0, per=None, fs=None, noise = False):
     if not per: 
         per = 1.0/fo # Add a constant to throw error.
@@ -297,16 +502,365 @@ def decay(a, b=1, start=0, stop=1, steps=1000, debug = False):
     ts = np.linspace(0,1,1000)
     x = b * np.exp(a*(-ts))
 
-    return x 
+    return x
+
+
+def next_fast_len(n):
+    """
+    Return the smallest 5-smooth integer (2^a * 3^b * 5^c) >= n.
+
+    FFT lengths with only small prime factors are considerably faster than
+    arbitrary (or prime) lengths, so zero-padding up to this length is cheap.
+    """
+    n = int(n)
+    if n <= 6:
+        return max(n, 1)
+    best = 1 << (n - 1).bit_length()
+    p5 = 1
+    while p5 < best:
+        p35 = p5
+        while p35 < best:
+            quotient = -(-n // p35)
+            p2 = 1 << (quotient - 1).bit_length()
+            length = p2 * p35
+            if length == n:
+                return n
+            if length < best:
+                best = length
+            p35 *= 3
+        p5 *= 5
+    return best
+
+
+def fft(x, n=None, real=None, fast=False, Fs=None):
+    """
+    Batched Fourier transform over the last axis of a signal stack.
+
+    Parameters:
+    -----------
+    x : signal, SignalBank, list of signal, or numpy.ndarray
+        Input samples. Lists of signal objects must share 'Fs' and 'N' and are
+        stacked into a (channels, N) array. ndarrays may have any number of
+        leading (batch) dimensions.
+
+    n : int, optional
+        FFT length. Shorter inputs are zero-padded, longer ones truncated.
+
+    real : bool, optional, default: numpy.isrealobj(x)
+        Use the real-input FFT (one-sided spectrum, n//2 + 1 bins).
+
+    fast : bool, default: False
+        Zero-pad 'n' up to next_fast_len(n).
+
+    Fs : float, optional
+        Sampling frequency for the frequency axis. Taken from the signal
+        objects when not given (1.0 for bare ndarrays).
+
+    Return:
+    -------
+      (spectrum, freqs) : numpy.ndarray, numpy.ndarray
+    """
+    func = "fft"
+
+    if isinstance(x, (signal, SignalBank)):
+        if Fs is None: Fs = x.Fs
+        x = x.getTime()
+    elif isinstance(x, (list, tuple)) and len(x) and isinstance(x[0], signal):
+        if Fs is None: Fs = x[0].Fs
+        for s in x:
+            if s.Fs != x[0].Fs or s.N != x[0].N:
+                raise ValueError("ERROR: (%s): All signals must share 'Fs' and 'N'."%(func))
+        x = np.stack([s.getTime() for s in x])
+    else:
+        x = np.asarray(x)
+    if Fs is None:
+        Fs = 1.0
+
+    return _transform(x, n=n, real=real, fast=fast, Ts=1.0/Fs)
+
+
+def _transform(x, n=None, real=None, fast=False, Ts=1.0):
+    """
+    Shared FFT kernel used by fft() and signal.fft()/signal.rfft().
+    """
+    if real is None:
+        real = np.isrealobj(x)
+    if n is None:
+        n = x.shape[-1]
+    if fast:
+        n = next_fast_len(n)
+    if real:
+        return np.fft.rfft(x, n=n, axis=-1), np.fft.rfftfreq(n, d=Ts)
+    return np.fft.fft(x, n=n, axis=-1), np.fft.fftfreq(n, d=Ts)
+
+
+# On-disk signal format (see signal.save/signal.load): 
+#   [ header : SIGFILE_HEADER bytes ][ samples : C-order (channels, N) or (N,) array of 'dtype' ]
+# The header is '<8sHH5dqq16s' = magic, version, ndim, Fs, Fo, A, DC, Phase, N, channels, dtype.str, 
+# zero-padded to SIGFILE_HEADER bytes. Fo is stored as NaN when unknown.
+SIGFILE_MAGIC   = b"PYDSPSIG"
+SIGFILE_VERSION = 1
+SIGFILE_FORMAT  = "<8sHH5dqq16s"
+SIGFILE_HEADER  = 128
+
+
+class NCO(object):
+    """ 
+    Numerically controlled oscillator: streaming generator of exp(j*(2*pi*Fo*n*Ts + Phase)). 
+
+    Each call to NCO.generate() continues the phase of the previous one. The real 
+    part (cos), the imaginary part (sin) or the complex tone (both, one pass) can be 
+    produced. 
+
+    Methods and their worst-case error relative to the exact numpy path: 
+      - "exact"      : np.sin/np.cos/np.exp of a wrapped float64 phase accumulator. 
+                       Reference (|err| ~ 1e-15 relative to A). 
+      - "lut"        : 64-bit integer phase accumulator indexing a 2**table entry sine 
+                       table. interp="linear": |err| <= pi**2/(2*T**2) (3e-7 for the 
+                       default T = 4096); interp="none" (nearest): |err| <= pi/T (8e-4). 
+                       The frequency is quantized to Fs/2**64 (negligible). 
+      - "recurrence" : Block-wise complex rotation z[n0+k] = z[n0]*exp(j*w*k) with an 
+                       exactly computed block ramp; the block start phasor is advanced 
+                       by exp(j*w*B) and renormalized to |z| = 1 every 'renorm' blocks. 
+                       Phase error grows by a few ulp per block: |err| ~ 1e-16*(n/B). 
+
+    Parameters: 
+    -----------
+    Fo, Fs : float 
+        Tone and sampling frequency. 
+
+    Phase : float, default: 0.0 
+        Initial phase (radians). 
+
+    method : str, default: "lut" 
+        Options: "exact", "lut", "recurrence". 
+
+    table : int, default: 12 
+        log2 of the sine table size ("lut"). 
+
+    interp : str, default: "linear" 
+        Table interpolation ("lut"). Options: "linear", "none". 
+
+    block : int, default: 4096 
+        Rotation block length ("recurrence"). 
+
+    renorm : int, default: 1 
+        Renormalize the block start phasor every 'renorm' blocks ("recurrence"). 
+    """
+    methods = ["exact", "lut", "recurrence"]
+
+    def __init__(self, Fo, Fs, Phase=0.0, method="lut", table=12, interp="linear", block=4096, renorm=1, debug=False):
+        func = "NCO.__init__"
+
+        if method not in self.methods: 
+            raise ValueError("ERROR: (%s): Arguement (%s) only takes the following options = %s"%(func,"method",str(self.methods)))
+        if interp not in ("linear", "none"): 
+            raise ValueError("ERROR: (%s): Arguement (%s) only takes the following options = %s"%(func,"interp",str(["linear","none"])))
+        if not (2 <= int(table) <= 24): 
+            raise ValueError("ERROR: (%s): Arguement (%s) must lie between 2 and 24."%(func,"table"))
+        self.Fo     = float(Fo)
+        self.Fs     = float(Fs)
+        self.Phase  = float(Phase)
+        self.method = method
+        self.table  = int(table)
+        self.interp = interp
+        self.block  = int(block)
+        self.renorm = max(1, int(renorm))
+        self.debug  = debug
+        self.w      = 2*np.pi*self.Fo/self.Fs # Note: Phase increment per sample (radians).
+        self._ramp  = None
+        self.reset()
+
+    def reset(self): 
+        """ 
+        Restart the oscillator at its initial phase. 
+        """
+        twoPi = 2*np.pi
+        self._phi = self.Phase % twoPi
+        if self.method == "lut": 
+            # Note: Phase as a fraction of a turn in a wrapping uint64 accumulator.
+            self._inc = int(round((self.Fo/self.Fs % 1.0) * 2.0**64)) % (1 << 64)
+            self._acc = int(round(self._phi/twoPi * 2.0**64)) % (1 << 64)
+            T = 1 << self.table
+            self._sine  = np.sin(twoPi*np.arange(T + 1)/T)
+            self._slope = np.diff(self._sine) # Note: Per-entry slope, so linear interpolation needs one table gather per table.
+        elif self.method == "recurrence": 
+            self._z      = np.exp(1j*self._phi)
+            self._step   = np.exp(1j*self.w*self.block)
+            self._blocks = 0
+            self._offset = 0 # Note: Samples already used of the current rotation block.
+
+    def __rampTo(self, n): 
+        if self._ramp is None or len(self._ramp) < n: 
+            if self.method == "recurrence": 
+                self._ramp = np.exp(1j*self.w*np.arange(self.block))
+            else: 
+                self._ramp = self.w*np.arange(n)
+        return self._ramp
+
+    def __lookup(self, idx, frac, out): 
+        if self.interp == "none": 
+            out[...] = self._sine[idx]
+        else: 
+            np.multiply(frac, self._slope[idx], out=frac)
+            np.add(self._sine[idx], frac, out=out)
+        return out
+
+    @_timed("NCO.generate")
+    def generate(self, n, part="complex", out=None): 
+        """ 
+        Return the next n samples. 
+
+        Parameters: 
+        -----------
+        n : int 
+            Number of samples. 
+
+        part : str, default: "complex" 
+            Options: "complex" (cos + j*sin), "sin", "cos". 
+
+        out : numpy.ndarray, optional 
+            Preallocated output of length n (complex for part="complex"). 
+        """
+        func = "NCO.generate"
+
+        if part not in ("complex", "sin", "cos"): 
+            raise ValueError("ERROR: (%s): Arguement (%s) only takes the following options = %s"%(func,"part",str(["complex","sin","cos"])))
+        if out is None: 
+            out = np.empty(n, dtype=complex if part == "complex" else float)
+
+        if self.method == "exact": 
+            ramp = self.__rampTo(n)
+            if part == "complex": 
+                np.exp(1j*(ramp[:n] + self._phi), out=out)
+            else: 
+                np.add(ramp[:n], self._phi, out=out)
+                (np.sin if part == "sin" else np.cos)(out, out=out)
+            self._phi = (self._phi + self.w*n) % (2*np.pi)
+
+        elif self.method == "lut": 
+            acc = np.arange(n, dtype=np.uint64)
+            acc *= np.uint64(self._inc)
+            acc += np.uint64(self._acc)
+            # Note: The top 'table' bits index the table, the remaining bits are the interpolation fraction.
+            T = 1 << self.table
+            if self.interp == "none": 
+                acc += np.uint64(1 << (63 - self.table)) # Note: Round to the nearest entry.
+                frac = None
+            else: 
+                frac = (acc << np.uint64(self.table)) >> np.uint64(11)
+                frac = frac.astype(float)
+                frac *= 2.0**-53
+            idx = (acc >> np.uint64(64 - self.table)).astype(np.intp)
+            if part == "sin": 
+                self.__lookup(idx, frac, out)
+            elif part == "cos": 
+                # Note: cos(x) = sin(x + pi/2) is a shift of exactly T/4 entries; the fraction is unchanged.
+                idx += T//4
+                idx &= T - 1
+                self.__lookup(idx, frac, out)
+            else: 
+                self.__lookup(idx, None if frac is None else frac.copy(), out.imag)
+                idx += T//4
+                idx &= T - 1
+                self.__lookup(idx, frac, out.real)
+            self._acc = (self._acc + self._inc*n) % (1 << 64)
+
+        else: 
+            ramp = self.__rampTo(self.block)
+            z = out if part == "complex" else np.empty(n, dtype=complex)
+            start = 0
+            while start < n: 
+                m = min(n - start, self.block - self._offset)
+                np.multiply(ramp[self._offset:self._offset + m], self._z, out=z[start:start + m])
+                start += m
+                self._offset += m
+                if self._offset == self.block: 
+                    self._offset = 0
+                    self._z *= self._step
+                    self._blocks += 1
+                    if self._blocks % self.renorm == 0: 
+                        self._z /= abs(self._z)
+            if part == "sin": 
+                out[:] = z.imag
+            elif part == "cos": 
+                out[:] = z.real
+        return out
+
+
+_AXIS_CACHE = {}
+_AXIS_CACHE_SIZE = 32 # Note: Most recently built axes kept; older ones are dropped first.
+
+def _axis(N, Ts=None):
+    """
+    Return the (cached, read-only) sample-index axis [0,1,...,N-1], or the time
+    axis Ts*[0,1,...,N-1] when 'Ts' is given. Signals with the same N (and Ts) share one array.
+    """
+    key = (int(N), None if Ts is None else float(Ts))
+    if key not in _AXIS_CACHE:
+        axis = np.arange(key[0]) if Ts is None else _axis(N) * key[1]
+        axis.flags.writeable = False
+        while len(_AXIS_CACHE) >= _AXIS_CACHE_SIZE:
+            _AXIS_CACHE.pop(next(iter(_AXIS_CACHE)))
+        _AXIS_CACHE[key] = axis
+    return _AXIS_CACHE[key]
+
+def _sampleDtype(dtype, part):
+    """
+    Sample dtype of a tone with NCO output 'part' generated at the precision of 'dtype'.
+    """
+    func = "signal.init"
+
+    real = np.zeros(0, dtype=float if dtype is None else dtype).real.dtype
+    if real not in (np.dtype(np.float32), np.dtype(np.float64)):
+        raise ValueError("ERROR: (%s): Arguement (%s) only takes the following options = %s"%(func,"dtype",str(["float32","float64","complex64","complex128"])))
+    return np.result_type(real, np.complex64) if part == "complex" else real
+
+
+def _isOperand(x):
+    """ 
+    True if x can take part in a signal expression (see SignalExpr). 
+    """
+    return isinstance(x, (signal, Noise, np.ndarray, int, float, complex, np.number))
 
 
 class signal(object):
     
+    _part = None # Note: NCO output ("sin", "cos" or "complex") of subclasses that can be streamed.
+
+    # Note: Slotted layout (no per-instance __dict__). The time axes 'Ns'/'nTs' are not 
+    #       stored; they are derived from N and Ts on access (see _axis), so a signal 
+    #       costs little more than its 'TimeSignal' buffer. Subclasses declare their own slots.
+    __slots__ = ("debug", "A", "DC", "Fs", "Ts", "Fo", "To", "N", "M", "_Ns", "_nTs", "Phase", 
+                 "lazy", "method", "table", "interp", "dtype", "Noise", "_TimeSignal", "_FreqSignal", 
+                 "_fftCache", "_lastFT", "_pyramid", "freqRes", "focusDomain", "__setFocusDomain", "shared", "__weakref__")
     
     def __init__(self, **kwargs):
         """ 
         Signal constructor: 
         """  
+        # Note: Stages are recorded under the class's qualified name, which setName() does not change.
+        m = PROFILER.mark() if PROFILER.enabled else None
+        self.__defaults()
+        self.init(**kwargs)
+        if m is not None: m = PROFILER.lap(type(self).__qualname__ + ".init", m)
+        self.sanity_checks()
+        if m is not None: m = PROFILER.lap(type(self).__qualname__ + ".sanity_checks", m)
+        if self._part is not None and not self.lazy: 
+            self.__generate()
+        if m is not None: 
+            PROFILER.count(type(self).__qualname__, 1)
+            PROFILER.count("samples", self.N or 0)
+        
+        if self.debug: self.debug_print()
+            
+
+        return 
+
+    def __defaults(self):
+        """ 
+        Set the default settings of a signal. 
+        """
         self.debug = False 
         self.A     = 1.0   
         self.DC    = 0.0  
@@ -316,29 +870,143 @@ class signal(object):
         self.To    = None 
         self.N     = None 
         self.M     = None 
-        self.Ns    = None 
+        self.Ns    = None # Note: None means derived from N (and Ts) on access.
         self.nTs   = None 
         self.Phase = 0.0  
+        self.lazy  = False # Note: If True, no samples are generated (see signal.stream).
+        self.method = "exact" # Note: Tone synthesis method (see NCO).
+        self.table  = 12
+        self.interp = "linear"
+        self.dtype  = None    # Note: Sample dtype; None is float64 (complex128 for complex tones).
+        self.shared = False   # Note: If True, the samples are allocated in shared memory (see signal.share).
+        self.freqRes = None
 
         self.Noise        = None  # Note: Noise class object. To added to 'self.TimeSignal'. 
         self.TimeSignal   = None  # Note: Time domain representation of signal.
-        self.FreqSignal   = None  # Note: Frequency domain representation of signal.
-        self.qFT          = False # Note: Query-Fourier transform. Set to true once the DFT of FFT of the signal was taken.
-       
+        self.FreqSignal   = None  # Note: Frequency domain representation of signal. Computed lazily (see signal.fft/rfft).
+                                  # Note: 'qFT' (Query-Fourier transform) is True once the DFT or FFT of the signal was taken.
+
         self.focusDomain = "time"     # TODO: Allow users to place focus variable on onthe particular object to easily control plots, len, etc.? 
         self.__setFocusDomain = False # TODO: This may not be needed
         self.__class__.name = "DSP.signal"
-        
-        self.init(**kwargs)
-        self.sanity_checks()
-        
-        if self.debug: self.debug_print()
-            
-
         return 
-    
+
+    @classmethod
+    def fromArray(cls, x, Fs=None, Ts=None, like=None, **kwargs):
+        """ 
+        Wrap existing samples (e.g. captured or processed data) in a signal. 
+
+        Parameters: 
+        -----------
+        x : numpy.ndarray
+            Samples. The last axis is time; leading axes are channels.
+
+        Fs, Ts : float
+            Sampling frequency or period. Taken from 'like' when not given.
+
+        like : signal, optional
+            Signal whose settings (A, DC, Fo, To, Phase, Fs) are copied.
+
+        **kwargs : signal.init keyword arguments, optional
+            Override individual settings. 'dtype' converts the samples 
+            (no copy if they already have that dtype).
+
+        Return: 
+        -------
+          ret : signal whose 'TimeSignal' is 'x' (no copy is made). 
+        """
+        func = "signal.fromArray"
+
+        ret = signal.__new__(signal)
+        ret.__defaults()
+        if like is not None: 
+            ret.A, ret.DC, ret.Phase = like.A, like.DC, like.Phase
+            ret.Fo, ret.To = like.Fo, like.To
+            if Fs is None and Ts is None: 
+                Fs = like.Fs
+        ret.init(**kwargs)
+        if Fs is None and Ts is None: 
+            raise ValueError("ERROR: (%s): No values for the sampling frequency or period."%(func))
+        ret.Fs, ret.Ts = resolve_freq_and_period(f=Fs, p=Ts)
+
+        if not isinstance(x, np.ndarray) or (ret.dtype is not None and x.dtype != ret.dtype):
+            x = np.asarray(x, dtype=ret.dtype)
+        ret.N     = x.shape[-1]
+        ret.dtype = x.dtype
+        ret.TimeSignal = x
+        ret.freqRes = float(ret.Fs)/float(ret.N) if ret.N else None
+        if ret.shared: 
+            ret.share()
+        return ret
  
 
+    @classmethod
+    def fromIQ(cls, I, Q, Fs=None, Ts=None, like=None, **kwargs):
+        """ 
+        Build a complex signal I + j*Q from its in-phase and quadrature samples 
+        (one allocation; see signal.fromArray for the other arguments). 
+        """
+        I, Q = np.asarray(I), np.asarray(Q)
+        x = np.empty(np.broadcast_shapes(I.shape, Q.shape), dtype=np.result_type(I, Q, np.complex64))
+        x.real[...] = I
+        x.imag[...] = Q
+        return signal.fromArray(x, Fs=Fs, Ts=Ts, like=like, **kwargs)
+
+    @property
+    def I(self):
+        """
+        In-phase samples: the real part of 'TimeSignal' (a view).
+        """
+        return None if self._TimeSignal is None else self._TimeSignal.real
+
+    @property
+    def Q(self):
+        """
+        Quadrature samples: the imaginary part of 'TimeSignal' (a view; zeros for a real signal).
+        """
+        return None if self._TimeSignal is None else np.imag(self._TimeSignal)
+
+    @property
+    def iscomplex(self):
+        """
+        True if the samples are complex (I/Q) valued.
+        """
+        return self._TimeSignal is not None and np.iscomplexobj(self._TimeSignal)
+
+    def share(self):
+        """ 
+        Move the samples into shared memory (one copy; no-op if they already are) and 
+        return the signal. It then pickles as its settings plus a descriptor of the 
+        segment, and unpickling in another process maps the samples without a copy. 
+        """
+        x = self._TimeSignal
+        self.shared = True
+        if x is not None and not isShared(x): 
+            y = sharedEmpty(x.shape, x.dtype)
+            y[...] = x
+            self.TimeSignal = y
+        return self
+
+    def __getstate__(self):
+        state = {}
+        for cls in type(self).__mro__: 
+            for name in getattr(cls, "__slots__", ()): 
+                if name == "__weakref__": 
+                    continue
+                if name.startswith("__"): 
+                    name = "_%s%s"%(cls.__name__.lstrip("_"), name) # Note: Private slots are name-mangled.
+                if hasattr(self, name): 
+                    state[name] = getattr(self, name)
+        if isShared(state.get("_TimeSignal")): 
+            # Note: The samples travel as a segment descriptor; the caches derived from them are dropped.
+            state["_TimeSignal"] = _shareRef(state["_TimeSignal"])
+            state["_fftCache"], state["_lastFT"], state["_pyramid"] = None, None, None
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items(): 
+            setattr(self, name, _shareAttach(value))
+
     def cycle_based(self):
         """ 
         Resolve setting for signal based on cycle calculation.
@@ -356,7 +1024,8 @@ class signal(object):
         if self.M and self.N: 
             self.Fs = ( self.N / self.M) * self.Fo
         elif self.M and self.Fs: 
-            self.N = ( self.Fs / self.Fo ) * self.M
+            # Note: A whole number of samples (as many as np.arange yields for a fractional count).
+            self.N = int(np.ceil(( self.Fs / self.Fo ) * self.M))
         else:
             raise RuntimeError("Must at least provide  either number of samples" \
                                "or sampling frequency.")
@@ -377,7 +1046,7 @@ class signal(object):
           Exiting checks and sets: 
           - Check that the sampling frequency and period are set.  
           - Check the N, the number of samples, are set.
-          - Set nTs: the time-index array.
+          - Resolve the sample dtype of tones (see 'dtype').
           
         
         """
@@ -401,11 +1070,10 @@ class signal(object):
         # - Check the N, the number of samples, are set.
         if self.N is None: 
             raise ValueError("Must provide the number of samples 'n=<int>' to create signal.")
-        else: 
-            self.Ns = np.arange(self.N)
-        
-        # - Set nTs: the time-index array.
-        self.nTs = np.linspace(start=0, stop=(float(1)/self.Fs)*self.N, num=self.N)
+
+        # - Resolve the sample dtype of tones. Note: nTs, Ts*[0,1,2,...,N-1], is derived on access.
+        if self._part is not None: 
+            self.dtype = _sampleDtype(self.dtype, self._part)
         
         return 
         
@@ -430,16 +1098,17 @@ class signal(object):
         Phase : float, default: 0.0
             Phase-shift of signal (radians).
 
-        To : float 
+        To : float or str
             Period of signal. (This should be the inverse of 'fo')
+            To, Fo, Fs and Ts also accept strings with SI-Units, e.g. "30.0 us" (see SItoString).
 
-        Fo : float 
+        Fo : float or str 
             Fundamental cyclic frequency of signal (inverse of 'per'). 
 
-        Fs : float
+        Fs : float or str
             Sampling frequency. 
             
-        Ts : float
+        Ts : float or str
             Sampling period.             
 
         N : int
@@ -450,6 +1119,29 @@ class signal(object):
 
         noise : noise  
             Noise object to be linear combined (added) to signal. 
+
+        lazy : bool, default: False
+            Only resolve the settings; do not generate the samples. 
+            Use with signal.stream() for signals too long to hold in memory.
+
+        dtype : numpy dtype, default: float64
+            Sample precision: np.float32 (complex64 for complex tones) halves the 
+            memory. The phase is always accumulated in float64, so only the 
+            samples are rounded.
+
+        shared : bool, default: False
+            Allocate the samples in shared memory, so the signal pickles to worker 
+            processes as a small descriptor (see signal.share).
+
+        method : str, default: "exact"
+            Tone synthesis: "exact" (numpy sin/cos), "lut" or "recurrence". See NCO 
+            for the error bound of each method.
+
+        table : int, default: 12
+            log2 of the NCO sine table size (method="lut").
+
+        interp : str, default: "linear"
+            NCO table interpolation, "linear" or "none" (method="lut").
         """
         for kw in kwargs:
             if kw == "A":
@@ -461,35 +1153,36 @@ class signal(object):
             if kw == "M":
                 self.M   = int(kwargs[kw]); continue
             if kw == "To":
-                self.To  = float(kwargs[kw]); continue 
+                self.To  = SItoString(kwargs[kw]); continue 
             if kw == "Fo":
-                try:
-                    self.Fo = float(kwargs[kw]); continue  
-                except:
-                    self.Fo = SItoString(kwargs[kw]); continue 
-            if kw == "Fs":
-                self.Fs = float(kwargs[kw]); continue 
+                self.Fo  = SItoString(kwargs[kw]); continue 
             if kw == "Fs":
-                self.Fs = float(kwargs[kw]); continue 
+                self.Fs  = SItoString(kwargs[kw]); continue 
+            if kw == "Ts":
+                self.Ts  = SItoString(kwargs[kw]); continue 
             if kw == "Phase":
-                self.PHASE = float(kwargs[kw]); continue 
+                self.Phase = float(kwargs[kw]); continue 
             if kw == "Noise":
-                self.noise = kwargs[kw]; continue 
+                self.Noise = kwargs[kw]; continue 
+            if kw == "lazy":
+                self.lazy = bool(kwargs[kw]); continue
+            if kw == "method":
+                self.method = str(kwargs[kw]); continue
+            if kw == "table":
+                self.table = int(kwargs[kw]); continue
+            if kw == "interp":
+                self.interp = str(kwargs[kw]); continue
+            if kw == "dtype":
+                self.dtype = None if kwargs[kw] is None else np.dtype(kwargs[kw]); continue
+            if kw == "shared":
+                self.shared = bool(kwargs[kw]); continue
             if kw == "debug":
                 self.debug = True;continue
         return 
                 
     def debug_print(self):
-        print("%s: id = %s"%(self.__class__.name, str(id(self))))
-        print(" - A.......: %s"%(str(self.A)))
-        print(" - DC......: %s"%(str(self.DC)))
-        print(" - Phase...: %s"%(str(self.Phase)))
-        print(" - N.......: %s"%(str(self.N)))
-        print(" - Fo......: %s"%(str(self.Fo)))
-        print(" - To......: %s"%(str(self.To)))
-        print(" - Fs......: %s"%(str(self.Fs)))
-        print(" - Ts......: %s"%(str(self.Ts)))
-        print("")
+        PROFILER.event(self.__class__.name, True, id=id(self), A=self.A, DC=self.DC, Phase=self.Phase, 
+                       N=self.N, Fo=self.Fo, To=self.To, Fs=self.Fs, Ts=self.Ts, dtype=self.dtype)
         return 
         
 
@@ -523,25 +1216,473 @@ class signal(object):
         Return the DSP.Noise object 
         NOTE: for numpy.ndarray signal call 'getNoise()' on the returned Noise object.
         """
-        return self.noise
+        return self.Noise
 
-    # Overloaded operators:
-    # ====================
+    def nco(self):
+        """ 
+        Return an NCO positioned at the start of this signal (see NCO). 
+        """
+        return NCO(Fo=self.Fo, Fs=self.Fs, Phase=self.Phase, method=self.method, table=self.table, interp=self.interp)
 
-    def __len__(self, domain = "time"): 
-        func = "len"
-        ret = None
+    def stream(self, chunk=65536):
+        """ 
+        Generate the signal block-by-block instead of all at once. 
 
-        if domain == "time": 
-            ret = len(self.TimeSignal)
-        elif domain == "freq":
-            ret = len(self.FreqSignal)
-        else: 
-            raise ValueError("ERROR: (%s): Arguement (%s) only takes the following options = %s"%(func,"domain",str(["time","freq"])))
+        Yields contiguous blocks of at most 'chunk' samples whose concatenation 
+        is the full N-sample signal (including noise). The phase is carried by an 
+        NCO (see NCO and the 'method' keyword) so it stays continuous across block 
+        boundaries regardless of N. Memory use is O(chunk). 
 
-        return ret
+        Construct the signal with 'lazy=True' to avoid materializing the full 
+        signal at all: 
 
-    # TODO: It doesnt really make sense to have an input arguement for 'domain' when the funciton is an operator [],
+          >> x = DSP.sin(A=1.0, Fo=1e6, Fs=100e6, N=60*100e6, lazy=True)
+          >> for block in x.stream(chunk=65536): 
+          >>     consume(block)
+
+        Blocks have the signal's 'dtype'; they are computed in full precision and 
+        rounded on output. 
+
+        NOTE: The yielded array is a preallocated working buffer that is 
+              overwritten on the next iteration; copy it to keep it.
+        """
+        func = "signal.stream"
+
+        if self._part is None: 
+            raise RuntimeError("ERROR: (%s): %s does not define a waveform to stream."%(func, self.getName()))
+        chunk = int(chunk)
+        if chunk < 1: 
+            raise ValueError("ERROR: (%s): Arguement (%s) must be a positive integer."%(func, "chunk"))
+
+        nco   = self.nco()
+        buf   = np.empty(min(chunk, self.N), dtype=complex if self._part == "complex" else float)
+        cast  = None
+        if self.dtype is not None and self.dtype != buf.dtype: 
+            cast = np.empty(len(buf), dtype=self.dtype)
+        noise = None
+        if self.Noise is not None: 
+            noise = self.Noise.stream(chunk=chunk, size=self.N)
+
+        start = 0
+        while start < self.N: 
+            n   = min(chunk, self.N - start)
+            out = nco.generate(n, part=self._part, out=buf[:n])
+            out *= self.A
+            out += self.DC
+            if noise is not None: 
+                out += next(noise)
+            if cast is not None: 
+                out = cast[:n]
+                out[...] = buf[:n]
+            yield out
+            start += n
+        return 
+
+    def __generate(self): 
+        """ 
+        Build 'TimeSignal' = A*tone + DC (+ Noise) in the signal's dtype. 
+        """
+        name = type(self).__qualname__ # Note: Not getName(), which setName() rewrites.
+        m = PROFILER.mark() if PROFILER.enabled else None
+        if self.dtype != np.dtype(float) and self.dtype != np.dtype(complex): 
+            # Note: Reduced precision is filled block-wise from full-precision blocks, 
+            #       so no full-length float64 intermediate is ever allocated.
+            x = _empty(self.N, self.dtype, self.shared)
+            start = 0
+            for block in self.stream(): 
+                x[start:start+len(block)] = block
+                start += len(block)
+            self.TimeSignal = x
+            if m is not None: PROFILER.lap(name + ".waveform", m, N=self.N, dtype=self.dtype.name)
+            return 
+        # Note: A*tone + DC is evaluated in place in the output buffer (which may be shared memory).
+        x = _empty(self.N, self.dtype, self.shared)
+        if self.method == "exact": 
+            nTs = self.nTs
+            if m is not None: m = PROFILER.lap(name + ".axis", m, N=self.N)
+            if self._part == "complex": 
+                arg = (self.Fo*2*np.pi)*nTs + self.Phase
+                np.exp(1j*arg, out=x)
+            else: 
+                np.multiply(self.Fo*2*np.pi, nTs, out=x)
+                x += self.Phase
+                (np.sin if self._part == "sin" else np.cos)(x, out=x)
+        else: 
+            self.nco().generate(self.N, part=self._part, out=x)
+        x *= self.A
+        x += self.DC
+        if m is not None: m = PROFILER.lap(name + ".waveform", m, N=self.N, method=self.method)
+        if self.Noise is not None: 
+            if np.result_type(x, self.Noise._noise) == x.dtype: 
+                x += self.Noise._noise
+            else: 
+                # Note: Complex noise on a real tone. 
+                y = _empty(self.N, np.result_type(x, self.Noise._noise), self.shared)
+                np.add(self.Noise._noise, x, out=y)
+                x = y
+            if m is not None: PROFILER.lap(name + ".noise", m, N=self.N)
+        self.TimeSignal = x
+        return 
+
+    def filter(self, filt):
+        """ 
+        Return this signal filtered by 'filt' (FIR or IIR object). The filter state is updated.
+        """
+        return filt.filter(self)
+
+    def resample(self, new_Fs, **kwargs):
+        """ 
+        Return this signal resampled to 'new_Fs' (polyphase). See DSP.resample. 
+        """
+        return resample(self, new_Fs=new_Fs, **kwargs)
+
+    def decimate(self, q, **kwargs):
+        """ 
+        Return this signal decimated by the integer factor q. See DSP.decimate. 
+        """
+        return decimate(self, q, **kwargs)
+
+    def interpolate(self, p, **kwargs):
+        """ 
+        Return this signal interpolated by the integer factor p. See DSP.interpolate. 
+        """
+        return interpolate(self, p, **kwargs)
+
+    def analytic(self):
+        """ 
+        Return the analytic signal x + j*H{x} (complex signal). See DSP.hilbert. 
+        """
+        return hilbert(self)
+
+    def envelope(self):
+        """ 
+        Return the instantaneous amplitude. See DSP.envelope. 
+        """
+        return envelope(self)
+
+    def instPhase(self, unwrap=True):
+        """ 
+        Return the instantaneous phase (radians). See DSP.instPhase. 
+        """
+        return instPhase(self, unwrap=unwrap)
+
+    def instFreq(self):
+        """ 
+        Return the instantaneous frequency (Hz). See DSP.instFreq. 
+        """
+        return instFreq(self)
+
+    def ddc(self, Fc, q, **kwargs):
+        """ 
+        Return the complex baseband around Fc, decimated by q. See DSP.ddc. 
+        """
+        return ddc(self, Fc, q, **kwargs)
+
+    def channelize(self, M, oversample=1, **kwargs):
+        """ 
+        Return the M subbands of this signal as a SignalBank. See DSP.Channelizer. 
+        """
+        return channelize(self, M, oversample=oversample, **kwargs)
+
+    def stft(self, **kwargs):
+        """ 
+        Short-time Fourier transform; returns (freqs, times, Z). See DSP.stft. 
+        """
+        return stft(self, **kwargs)
+
+    def spectrogram(self, **kwargs):
+        """ 
+        Per-frame power spectral density; returns (freqs, times, Sxx). See DSP.spectrogram. 
+        """
+        return spectrogram(self, **kwargs)
+
+    def welch(self, chunk=1<<20, **kwargs):
+        """ 
+        Welch power spectral density; returns (freqs, Pxx). See DSP.welch. 
+
+        Lazy sin/cos signals (lazy=True) are estimated incrementally from 
+        signal.stream(chunk), so the full signal is never held in memory. The 
+        median average needs every periodogram at once, so for it the samples 
+        are generated in full and estimated in one shot. 
+        """
+        func = "signal.welch"
+
+        if "Fs" in kwargs: 
+            raise ValueError("ERROR: (%s): 'Fs' is taken from the signal and can not be passed."%(func))
+        if self.TimeSignal is None and self.lazy and self._part is not None: 
+            average = kwargs.pop("average", "mean")
+            if average == "mean": 
+                est = Welch(Fs=self.Fs, **kwargs)
+                for block in self.stream(chunk=chunk): 
+                    est.update(block)
+                return est.result()
+            x, start = None, 0
+            for block in self.stream(chunk=chunk): # Note: Blocks are a reused buffer; copy them out.
+                if x is None: 
+                    x = np.empty(int(self.N), dtype=block.dtype)
+                x[start:start + len(block)] = block
+                start += len(block)
+            return welch(x, Fs=self.Fs, average=average, **kwargs)
+        return welch(self, **kwargs)
+
+    # Persistence: 
+    # ============
+
+    @_timed("signal.save")
+    def save(self, path, chunk=1<<20):
+        """ 
+        Write the signal to 'path' in the compact on-disk format (see SIGFILE_FORMAT). 
+
+        Lazy sin/cos signals (lazy=True) are written block-by-block from signal.stream(), 
+        so captures larger than memory can be generated straight to disk. 
+        """
+        func = "signal.save"
+
+        x = self.TimeSignal
+        if x is None and not (self.lazy and self._part is not None): 
+            raise RuntimeError("ERROR: (%s): Signal has no samples to save."%(func))
+        if x is None: 
+            shape, dtype = (self.N,), self.dtype
+        else: 
+            shape, dtype = x.shape, x.dtype
+        if len(shape) not in (1, 2): 
+            raise ValueError("ERROR: (%s): Only 1-D or (channels, N) signals can be saved."%(func))
+
+        fo = float("nan") if self.Fo is None else float(self.Fo)
+        header = struct.pack(SIGFILE_FORMAT, SIGFILE_MAGIC, SIGFILE_VERSION, len(shape), 
+                             float(self.Fs), fo, float(self.A), float(self.DC), float(self.Phase), 
+                             shape[-1], 1 if len(shape) == 1 else shape[0], dtype.str.encode("ascii"))
+        with open(path, "wb") as f: 
+            f.write(header.ljust(SIGFILE_HEADER, b"\0"))
+            if x is None: 
+                for block in self.stream(chunk=chunk): 
+                    block.tofile(f)
+            else: 
+                # Note: Rows are written in chunks so memory-mapped inputs are never fully resident.
+                rows = x.reshape(-1, shape[-1])
+                for r in rows: 
+                    for start in range(0, shape[-1], chunk): 
+                        np.ascontiguousarray(r[start:start+chunk]).tofile(f)
+        if self.debug: PROFILER.event(func, True, shape=shape, dtype=dtype.str, path=path)
+        return 
+
+    @staticmethod
+    def load(path, mmap=True, mode="r"):
+        """ 
+        Read a signal written by signal.save(). 
+
+        Parameters: 
+        -----------
+        path : str 
+            File to read. 
+
+        mmap : bool, default: True
+            Memory-map the samples ('TimeSignal' is a numpy.memmap, so slicing only 
+            touches the pages needed) instead of reading them into memory. 
+
+        mode : str, default: "r" 
+            numpy.memmap mode ("r", "r+" or "c"). 
+
+        Return: 
+        -------
+          ret : signal
+        """
+        func = "signal.load"
+
+        with open(path, "rb") as f: 
+            raw = f.read(SIGFILE_HEADER)
+        if len(raw) < struct.calcsize(SIGFILE_FORMAT): 
+            raise RuntimeError("ERROR: (%s): %s is not a signal file (header too short)."%(func, path))
+        magic, version, ndim, Fs, Fo, A, DC, Phase, N, channels, dtype = struct.unpack_from(SIGFILE_FORMAT, raw)
+        if magic != SIGFILE_MAGIC: 
+            raise RuntimeError("ERROR: (%s): %s is not a signal file (bad magic)."%(func, path))
+        if version > SIGFILE_VERSION: 
+            raise RuntimeError("ERROR: (%s): %s has unsupported format version %d."%(func, path, version))
+
+        dtype = np.dtype(dtype.rstrip(b"\0").decode("ascii"))
+        shape = (N,) if ndim == 1 else (channels, N)
+        if mmap: 
+            x = np.memmap(path, dtype=dtype, mode=mode, offset=SIGFILE_HEADER, shape=shape)
+        else: 
+            x = np.fromfile(path, dtype=dtype, count=int(np.prod(shape)), offset=SIGFILE_HEADER).reshape(shape)
+
+        ret = signal.fromArray(x, Fs=Fs, A=A, DC=DC, Phase=Phase, lazy=mmap)
+        if not np.isnan(Fo): 
+            ret.Fo, ret.To = resolve_freq_and_period(f=Fo, p=None)
+        return ret
+
+    # Time axes:
+    # ==========
+
+    @property
+    def Ns(self):
+        """
+        Sample-index axis [0,1,2,...,N-1] (read-only, shared between signals of equal N).
+        """
+        if self._Ns is None and self.N is not None:
+            return _axis(self.N)
+        return self._Ns
+
+    @Ns.setter
+    def Ns(self, value):
+        self._Ns = value
+
+    @property
+    def nTs(self):
+        """
+        Time axis Ts*[0,1,2,...,N-1] (read-only, shared between signals of equal N and Ts).
+        """
+        if self._nTs is None and self.N is not None and self.Ts is not None:
+            return _axis(self.N, self.Ts)
+        return self._nTs
+
+    @nTs.setter
+    def nTs(self, value):
+        self._nTs = value
+
+    # Frequency domain:
+    # =================
+
+    @property
+    def TimeSignal(self):
+        return self._TimeSignal
+
+    @TimeSignal.setter
+    def TimeSignal(self, value):
+        # Assigning new samples invalidates any cached transform.
+        self._TimeSignal = value
+        self.invalidate()
+
+    @property
+    def FreqSignal(self):
+        """
+        Frequency domain signal. On first access the default transform is taken
+        (rfft for real-valued signals, fft otherwise) and cached.
+        """
+        if self._FreqSignal is not None:
+            return self._FreqSignal
+        if self._lastFT is None:
+            if self._TimeSignal is None:
+                return None
+            self.__transform(real=None, n=None, fast=False)
+        return self._fftCache[self._lastFT][0]
+
+    @FreqSignal.setter
+    def FreqSignal(self, value):
+        self._FreqSignal = value
+
+    @property
+    def qFT(self):
+        return (self._lastFT is not None) or (self._FreqSignal is not None)
+
+    @property
+    def nFs(self):
+        """
+        Frequency axis (Hz) of the current frequency domain signal.
+        """
+        if self._FreqSignal is None and self._lastFT is None:
+            self.FreqSignal # Note: triggers the default transform.
+        if self._lastFT is None:
+            return None
+        return self._fftCache[self._lastFT][1]
+
+    def invalidate(self):
+        """
+        Drop all cached transforms and the plotting pyramid. Must be called after 
+        modifying 'TimeSignal' in-place; re-assigning 'TimeSignal' does this automatically.
+        """
+        self._fftCache   = None # Note: Created by the first transform.
+        self._lastFT     = None
+        self._FreqSignal = None
+        self._pyramid    = None # Note: Min/max pyramid of the plotting layer (see DSPplot.Pyramid).
+
+    @_timed("signal.fft")
+    def __transform(self, real, n, fast):
+        x = self._TimeSignal
+        if x is None:
+            raise RuntimeError("ERROR: (%s): Signal has no time domain samples to transform."%("signal.fft"))
+        if real is None:
+            real = np.isrealobj(x)
+        if n is None:
+            n = x.shape[-1]
+        if fast:
+            n = next_fast_len(n)
+        key = ("rfft" if real else "fft", int(n))
+        if self._fftCache is None:
+            self._fftCache = {}
+        if key not in self._fftCache:
+            self._fftCache[key] = _transform(x, n=n, real=real, Ts=self.Ts)
+        self._lastFT     = key
+        self._FreqSignal = None
+        return self._fftCache[key][0]
+
+    def fft(self, n=None, fast=False):
+        """
+        Return the (two-sided) FFT of the signal and set it as 'FreqSignal'.
+
+        Parameters:
+        -----------
+        n : int, optional, default: N
+            FFT length. Shorter signals are zero-padded.
+
+        fast : bool, default: False
+            Zero-pad 'n' up to the next fast (5-smooth) FFT length.
+
+        The result and its frequency axis ('nFs') are cached until 'TimeSignal' changes.
+        """
+        return self.__transform(real=False, n=n, fast=fast)
+
+    def rfft(self, n=None, fast=False):
+        """
+        Return the one-sided FFT of a real-valued signal and set it as 'FreqSignal'.
+        See signal.fft for parameters.
+        """
+        if not np.isrealobj(self._TimeSignal):
+            raise ValueError("ERROR: (%s): rfft requires a real-valued signal."%("signal.rfft"))
+        return self.__transform(real=True, n=n, fast=fast)
+
+    # Overloaded operators:
+    # ====================
+
+    # Note: Arithmetic builds a lazy SignalExpr (see SignalExpr). Setting __array_ufunc__ 
+    #       to None makes numpy defer 'ndarray <op> signal' to the reflected operators.
+    __array_ufunc__ = None
+
+    def __add__(self, other): 
+        return SignalExpr("add", self, other) if _isOperand(other) else NotImplemented
+    def __radd__(self, other): 
+        return SignalExpr("add", other, self) if _isOperand(other) else NotImplemented
+    def __sub__(self, other): 
+        return SignalExpr("sub", self, other) if _isOperand(other) else NotImplemented
+    def __rsub__(self, other): 
+        return SignalExpr("sub", other, self) if _isOperand(other) else NotImplemented
+    def __mul__(self, other): 
+        return SignalExpr("mul", self, other) if _isOperand(other) else NotImplemented
+    def __rmul__(self, other): 
+        return SignalExpr("mul", other, self) if _isOperand(other) else NotImplemented
+    def __truediv__(self, other): 
+        return SignalExpr("div", self, other) if _isOperand(other) else NotImplemented
+    def __rtruediv__(self, other): 
+        return SignalExpr("div", other, self) if _isOperand(other) else NotImplemented
+    def __neg__(self): 
+        return SignalExpr("neg", self)
+    def __abs__(self): 
+        return SignalExpr("abs", self)
+
+    def __len__(self, domain = "time"): 
+        func = "len"
+        ret = None
+
+        if domain == "time": 
+            ret = len(self.TimeSignal)
+        elif domain == "freq":
+            ret = len(self.FreqSignal)
+        else: 
+            raise ValueError("ERROR: (%s): Arguement (%s) only takes the following options = %s"%(func,"domain",str(["time","freq"])))
+
+        return ret
+
+    # TODO: It doesnt really make sense to have an input arguement for 'domain' when the funciton is an operator [],
     # ----- example, the following will error
     def __getitem__(self, index, domain = "time"):
         func = "signal.__getitem__"
@@ -593,58 +1734,11 @@ class signal(object):
             NOTE: matplotlib.pyplot functions 'stem' and 'plot' contains different **kwargs
 
         """
-        func = "signal.__plot"
-
-        # for kw in kwargs: 
-        # other checks 
-
-        plt.figure()
-        plt.grid(True)
-
-        # Check domain
-        if (domain == "time"):  
-            # Check index: 
-            if (index == "time"): 
-                # Check Type: 
-                if (Type == "plot"):
-                    # Plot signal
-                    plt.plot(self.nTs, self.TimeSignal, **kwargs)
-                else: 
-                    plt.stem(self.nTs, self.TimeSignal, **kwargs)
-            else: 
-                # Check Type: 
-                if (Type == "plot"):
-                    # Plot signal
-                    plt.plot(self.Ns, self.TimeSignal, **kwargs)
-                else: 
-                    plt.stem(self.Ns, self.TimeSignal, **kwargs)
-            
-        # Check domain:
-        elif (domain == "freq"): 
-            if not self.qFT: 
-                raise RuntimeError("ERROR: (%s): The Fourier transform of the signal must be taken becomce plotting the frequency domain representation."%(func))
-            # Check index:
-            if (index == "freq"):  # self.nFs = freRes * [0,1,2,3, ... , N/2-1]
-                print("TODO: (%s):"%(func)) #plt.plot(self.freqRes*self.Ns[0:len(self.Ns)], self.FreqSignal, **kwargs)
-            else: # self.Ns -> [0,1,2,...N/2-1]
-                print("TODO: (%s)"%(func))
-
-        else: 
-            raise ValueError("ERROR: (%s): Arg(%s) only has the following options: %s"%(func,"index",str(["time","samples"])))
- 
-
-        if title:
-            plt.title(title) 
- 
-        plt.show()
-
-        return;
-       
-
-
+        # Note: The implementation lives in the (lazily imported) plotting layer.
+        import DSPplot
+        DSPplot.plotSignal(self, Type=Type, index=index, domain=domain, title=title, **kwargs)
+        return
 
-    
-   
     def tstem(self, index = "time", title="", **kwargs):
         #self.__stem(index=index, domain="time", title=title, **kwargs)
         self.__Plot(Type="stem", index=index, domain="time", title=title, **kwargs)
@@ -653,6 +1747,12 @@ class signal(object):
         #self.__plot(index=index, domain="time", title = title, **kwargs)
         self.__Plot(Type="plot", index=index, domain="time", title=title, **kwargs)
 
+    def fstem(self, index = "freq", title="", **kwargs):
+        self.__Plot(Type="stem", index=index, domain="freq", title=title, **kwargs)
+
+    def fplot(self, index = "freq", title="", **kwargs):
+        self.__Plot(Type="plot", index=index, domain="freq", title=title, **kwargs)
+
 
     # TODO: There might be a confusion between the 'name' of a signal and the 'type' 
     def setName(self,string):
@@ -662,70 +1762,2844 @@ class signal(object):
         
     
 class sin(signal):
+    _part = "sin" # Note: NCO output used by signal.stream().
+    __slots__ = ()
+
     def __init__(self, **kwargs):
-        super(sin, self).__init__(**kwargs)
-        
-        self.TimeSignal = ((self.A)*np.sin((self.Fo*2*np.pi)*self.nTs + self.Phase) + self.DC)   
-        
-        if self.Noise is not None:
-            self.TimeSignal = self.Noise._noise + self.TimeSignal
+        super(sin, self).__init__(**kwargs) # Note: Samples are generated by signal.__init__.
             
         self.freqRes = float(self.Fs)/float(self.N)
-        #self.__class__.__name__ = "Sine"
         self.setName("DSP.sine")
-        
+
+    @classmethod
+    def batch(cls, **kwargs):
+        """
+        Build a SignalBank of sine tones. See SignalBank for keyword arguments.
+        """
+        return SignalBank(Type="sin", **kwargs)
+
 class cos(signal):
-    def __init__(self, **kwargs):
-        super(cos, self).__init__(**kwargs)
-        
-        self.TimeSignal = ((self.A)*np.cos((self.Fo*2*np.pi)*self.nTs + self.Phase) + self.DC)   
-        
-        if self.Noise is not None:
-            self.TimeSignal = self.Noise._noise + self.TimeSignal
+    _part = "cos" # Note: NCO output used by signal.stream().
+    __slots__ = ()
 
+    def __init__(self, **kwargs):
+        super(cos, self).__init__(**kwargs) # Note: Samples are generated by signal.__init__.
+            
         self.freqRes = float(self.Fs)/float(self.N)
-        #self.__class__.__name__ = "Cosine" 
         self.setName("DSP.cosine")
 
-class Noise(object):    
-    def __init__(self, form, **kwargs):
-        func = "Noise.__init__"
-        debug = False 
-    
-        forms = { "awg" : "Additive Gaussian White Noise"} 
-    
-        self.form = None
-        self.mean = 0.0
-        self.std  = 0.0
-        self.size = 0
-        self._noise = None 
-    
+    @classmethod
+    def batch(cls, **kwargs):
+        """
+        Build a SignalBank of cosine tones. See SignalBank for keyword arguments.
+        """
+        return SignalBank(Type="cos", **kwargs)
 
-        # MSN: Becasue 'form' is a named value without a default, python-interupter will handle error. 
-        if form not in forms.keys(): 
-            raise RuntimeError("Must provide 'form' of noise. Options: \n%s"%(str(forms)))
-        if "debug" in kwargs: debug = kwargs["debug"]
-        for kw in kwargs:    
-            if kw == "mean":
-                if (debug): print("DEBUG: (%s): Setting amplitude of signal to %s"%(func, str(kwargs[kw])))
-                self.mean = float(kwargs[kw]) # TODO: Special care to type errors from user? 
-                continue 
-            if kw == "std":
-                if (debug): print("DEBUG: (%s): Setting amplitude of signal to %s"%(func, str(kwargs[kw])))
-                self.std = float(kwargs[kw]) # TODO: Special care to type errors from user? 
-                continue            
-            if kw == "size":
-                if (debug): print("DEBUG: (%s): Setting amplitude of signal to %s"%(func, str(kwargs[kw])))
-                self.size= int(kwargs[kw]) # TODO: Special care to type errors from user? 
-                continue   
+class cexp(signal):
+    """ 
+    Complex tone A*exp(j*(2*pi*Fo*t + Phase)) + DC: the cosine (I) as real part and 
+    the sine (Q) as imaginary part, generated together in one pass. 
+    """
+    _part = "complex" # Note: NCO output used by signal.stream().
+    __slots__ = ()
 
-        if form == "awg": 
-            self._noise = np.random.normal(self.mean, self.std, self.size) # Type = numpy.ndarray
-    def getNoise(self):
-        """ 
-        Return the noise signal. (numpy.ndarrary type) 
+    def __init__(self, **kwargs):
+        super(cexp, self).__init__(**kwargs) # Note: Samples are generated by signal.__init__.
+
+        self.freqRes = float(self.Fs)/float(self.N)
+        self.setName("DSP.cexp")
+
+
+class SignalBank(object):
+    """
+    Bank of sinusoidal tones sharing a single sampling frequency and length.
+
+    All channels are evaluated with one broadcasted numpy call over a shared
+    time-index array, producing a single 2-D array of shape (channels, N).
+    Individual channels are exposed as lightweight 'BankChannel' views which
+    behave like a 'signal' (getTime, __getitem__, __len__) without copying.
+
+    Parameters:
+    -----------
+    Type : str, default: "sin"
+        Waveform of every channel. Options: "sin", "cos".
+
+    A, DC, Phase : float or array_like, default: 1.0, 0.0, 0.0
+        Amplitude, DC-level and phase-shift (radians) per channel.
+
+    Fo, To : float or array_like
+        Fundamental frequency or period per channel (one must be given).
+
+    Fs, Ts : float
+        Shared sampling frequency or period (one must be given).
+
+    N : int
+        Shared number of samples.
+
+    Noise : Noise, optional
+        Noise object whose samples, shape (N,) or (channels, N), are added to the bank.
+
+    dtype : numpy dtype, default: float64
+        Sample precision (np.float32 or np.float64). float32 banks are computed 
+        channel by channel in float64 and rounded on output.
+
+    Useage example:
+    ---------------
+      >> bank = DSP.sin.batch(A=[1.0, 2.0], Fo=[1e3, 2e3], Fs=48e3, N=1024)
+      >> bank.TimeSignal.shape  -> (2, 1024)
+      >> bank[1].getTime()      -> view into row 1 of bank.TimeSignal
+    """
+    def __init__(self, Type="sin", A=1.0, DC=0.0, Fo=None, To=None, Phase=0.0,
+                 Fs=None, Ts=None, N=None, Noise=None, dtype=float, debug=False):
+        func = "SignalBank.__init__"
+
+        waves = {"sin" : np.sin, "cos" : np.cos}
+        if Type not in waves:
+            raise ValueError("ERROR: (%s): Arguement (%s) only takes the following options = %s"%(func,"Type",str(list(waves.keys()))))
+        if Fo is None and To is None:
+            raise RuntimeError("Must provide fundamental period or frequency")
+        if Fo is None:
+            Fo = 1.0 / np.asarray(To, dtype=float)
+        if N is None:
+            raise ValueError("Must provide the number of samples 'N=<int>' to create signal bank.")
+
+        self.Type  = Type
+        self.debug = debug
+        self.Fs, self.Ts = resolve_freq_and_period(f=Fs, p=Ts)
+        self.N = int(N)
+        self.A, self.DC, self.Fo, self.Phase = [np.array(x, dtype=float) for x in
+                                                np.broadcast_arrays(np.atleast_1d(A), np.atleast_1d(DC),
+                                                                    np.atleast_1d(Fo), np.atleast_1d(Phase))]
+        if self.A.ndim != 1:
+            raise ValueError("ERROR: (%s): Channel parameters must be scalars or 1-D arrays."%(func))
+        self.To = 1.0 / self.Fo
+        self.channels = len(self.A)
+        self.dtype = _sampleDtype(dtype, Type)
+
+        self.Ns  = _axis(self.N)
+        self.nTs = _axis(self.N, self.Ts)
+
+        if self.dtype == np.dtype(float): 
+            # One allocation, one transcendental call: A*wave(2*pi*Fo*nTs + Phase) + DC
+            out = np.multiply.outer(2*np.pi*self.Fo, self.nTs)
+            out += self.Phase[:, None]
+            waves[Type](out, out=out)
+            out *= self.A[:, None]
+            out += self.DC[:, None]
+        else: 
+            out = np.empty((self.channels, self.N), dtype=self.dtype)
+            row = np.empty(self.N)
+            for i in range(self.channels): 
+                np.multiply(2*np.pi*self.Fo[i], self.nTs, out=row)
+                row += self.Phase[i]
+                waves[Type](row, out=row)
+                row *= self.A[i]
+                row += self.DC[i]
+                out[i] = row
+        if Noise is not None:
+            out += Noise._noise
+        self.Noise = Noise
+        self.TimeSignal = out
+        self.freqRes = float(self.Fs)/float(self.N)
+
+        if self.debug:
+            PROFILER.event(func, True, Type=self.Type, channels=self.channels, N=self.N, Fs=self.Fs)
+        return
+
+    @classmethod
+    def fromArray(cls, x, Fo, Fs=None, Ts=None, debug=False):
         """
-        return self._noise
+        Wrap existing samples of shape (channels, N) in a bank (no copy is made), 
+        e.g. the subbands of a Channelizer. 'Fo' (scalar or per channel) is the 
+        frequency each channel is centered on.
+        """
+        func = "SignalBank.fromArray"
+
+        x = np.asarray(x)
+        if x.ndim != 2:
+            raise ValueError("ERROR: (%s): Samples must have shape (channels, N)."%(func))
+        ret = cls.__new__(cls)
+        ret.Type  = "array"
+        ret.debug = debug
+        ret.Fs, ret.Ts = resolve_freq_and_period(f=Fs, p=Ts)
+        ret.channels, ret.N = x.shape
+        ret.Fo = np.array(np.broadcast_to(np.asarray(Fo, dtype=float), (ret.channels,)))
+        with np.errstate(divide="ignore"):
+            ret.To = 1.0 / ret.Fo
+        ret.A, ret.DC, ret.Phase = np.ones(ret.channels), np.zeros(ret.channels), np.zeros(ret.channels)
+        ret.dtype = x.dtype
+        ret.Ns  = _axis(ret.N)
+        ret.nTs = _axis(ret.N, ret.Ts)
+        ret.Noise = None
+        ret.TimeSignal = x
+        ret.freqRes = float(ret.Fs)/float(ret.N) if ret.N else None
+        return ret
+
+    def getTime(self):
+        """
+        Return time domain signals (numpy.ndarray type, shape (channels, N))
+        """
+        return self.TimeSignal
+
+    def channel(self, index):
+        """
+        Return a BankChannel view of channel 'index'.
+        """
+        return BankChannel(self, index)
+
+    def __len__(self):
+        return self.channels
+
+    def __getitem__(self, index):
+        return self.channel(index)
+
+    def __iter__(self):
+        for i in range(self.channels):
+            yield BankChannel(self, i)
+
+
+class BankChannel(signal):
+    """
+    Zero-copy view of a single channel of a SignalBank.
+
+    NOTE: signal.__init__ is intentionally skipped; all settings are taken
+    from the owning bank and 'TimeSignal', 'nTs' and 'Ns' reference the bank's arrays.
+    """
+    __slots__ = ("bank", "index")
+
+    def __init__(self, bank, index):
+        self._signal__defaults()
+        self.debug = bank.debug
+        self.A     = float(bank.A[index])
+        self.DC    = float(bank.DC[index])
+        self.Fs    = bank.Fs
+        self.Ts    = bank.Ts
+        self.Fo    = float(bank.Fo[index])
+        self.To    = float(bank.To[index])
+        self.N     = bank.N
+        self.M     = None
+        self.Ns    = bank.Ns
+        self.nTs   = bank.nTs
+        self.Phase = float(bank.Phase[index])
+
+        self.dtype = bank.dtype
+
+        self.Noise        = bank.Noise
+        self.TimeSignal   = bank.TimeSignal[index]
+        self.freqRes      = bank.freqRes
+
+        self.bank  = bank
+        self.index = index
+        return
+
+class SignalExpr(signal):
+    """ 
+    Lazy arithmetic expression over signals. 
+
+    Built by the overloaded operators of signal (+, -, *, /, unary -, abs); operands 
+    may be signals (including lazy sin/cos and other expressions), Noise objects, 
+    ndarrays whose last axis has length N, and scalars. All signal operands must 
+    share 'Fs' and 'N'. 
+
+    Nothing is computed until the samples are needed (SignalExpr.evaluate(), 
+    getTime() or 'TimeSignal'). Evaluation is fused and block-wise: every block of 
+    'chunk' samples is pushed through the whole expression tree using numpy out= 
+    buffers, reusing a handful of chunk-sized scratch buffers (the left operand of 
+    each node is computed in place), so a ten-term mix allocates no length-N 
+    intermediates. SignalExpr.stream() evaluates block-by-block without ever 
+    materializing the result. 
+
+    Useage example: 
+    ---------------
+      >> mix = 0.5*x1 + x2 - 2.0*x3 + noise   # nothing computed yet 
+      >> y = mix.getTime()                    # one fused pass 
+    """
+    ops = {"add" : np.add, "sub" : np.subtract, "mul" : np.multiply, "div" : np.true_divide, 
+           "neg" : np.negative, "abs" : np.absolute}
+    __slots__ = ("op", "args", "shape")
+
+    def __init__(self, op, *args):
+        func = "SignalExpr.__init__"
+
+        self._signal__defaults()
+        self.op   = op
+        self.args = args
+        self.__class__.name = "DSP.SignalExpr"
+
+        dtypes = []
+        lead   = ()
+        for a in args: 
+            if isinstance(a, signal): 
+                if self.Fs is None: 
+                    self.Fs, self.Ts, self.N = a.Fs, a.Ts, a.N
+                    self.Fo, self.To = a.Fo, a.To
+                elif not np.isclose(a.Fs, self.Fs, rtol=1e-12, atol=0.0): 
+                    raise ValueError("ERROR: (%s): Operands have different sampling frequencies (%s, %s)."%(func, str(self.Fs), str(a.Fs)))
+                shape, dtype = _operandLayout(a)
+            elif isinstance(a, Noise): 
+                shape, dtype = (a.size,), a.dtype
+            elif isinstance(a, np.ndarray) and a.ndim: 
+                shape, dtype = a.shape, a.dtype
+            else: 
+                dtypes.append(a) # Note: Scalar, kept as a value for weak (python scalar) promotion.
+                continue 
+            dtypes.append(dtype)
+            lead = np.broadcast_shapes(lead, shape[:-1])
+            if self.N is None: 
+                self.N = shape[-1]
+            elif shape[-1] != self.N: 
+                raise ValueError("ERROR: (%s): Operands have different lengths (%d, %d)."%(func, self.N, shape[-1]))
+
+        self.shape = lead
+        self.dtype = np.result_type(*dtypes)
+        if op == "abs": 
+            self.dtype = np.zeros(0, dtype=self.dtype).real.dtype
+        elif op == "div": 
+            self.dtype = np.result_type(self.dtype, 1.0)
+        return 
+
+    @property
+    def TimeSignal(self):
+        if self._TimeSignal is None: 
+            self.evaluate()
+        return self._TimeSignal
+
+    @TimeSignal.setter
+    def TimeSignal(self, value):
+        self._TimeSignal = value
+        self.invalidate()
+
+    @_timed("SignalExpr.evaluate")
+    def evaluate(self, chunk=65536):
+        """ 
+        Materialize the expression into 'TimeSignal' (one fused, block-wise pass). 
+        """
+        if self._TimeSignal is None: 
+            out = np.empty(self.shape + (self.N,), dtype=self.dtype)
+            for block in self.__blocks(chunk, out): 
+                pass
+            self.TimeSignal = out
+        return self
+
+    def stream(self, chunk=65536):
+        """ 
+        Evaluate the expression block-by-block without materializing it. 
+
+        NOTE: The yielded array is a preallocated working buffer that is 
+              overwritten on the next iteration; copy it to keep it.
+        """
+        if self._TimeSignal is not None: 
+            for start in range(0, self.N, chunk): 
+                yield self._TimeSignal[..., start:start+chunk]
+            return 
+        for block in self.__blocks(chunk): 
+            yield block
+
+    def __blocks(self, chunk, result=None):
+        scratch = {}
+        iters   = {}
+        for start in range(0, self.N, chunk): 
+            n = min(chunk, self.N - start)
+            if result is not None: 
+                out = result[..., start:start+n]
+            else: 
+                out = _scratch(scratch, 0, self.dtype, self.shape, chunk)[..., :n]
+            self.__block(start, n, out, scratch, iters, 1, chunk)
+            yield out
+
+    def __block(self, start, n, out, scratch, iters, level, chunk):
+        """ 
+        Evaluate samples [start, start+n) of this node into 'out'. Scratch slots >= 'level' are free. 
+        """
+        vals = []
+        free = level
+        for i, a in enumerate(self.args): 
+            if isinstance(a, SignalExpr) and a._TimeSignal is None: 
+                if i == 0 and a.dtype == self.dtype: 
+                    buf = out # Note: Left operand is computed in place.
+                else: 
+                    buf = _scratch(scratch, free, a.dtype, a.shape, chunk)[..., :n]
+                    free += 1
+                a.__block(start, n, buf, scratch, iters, free, chunk)
+                vals.append(buf)
+            else: 
+                vals.append(_operandBlock(a, start, n, iters, chunk))
+        self.ops[self.op](*vals, out=out)
+        return out
+
+
+def _operandLayout(a): 
+    """ 
+    (shape, dtype) of a signal operand without evaluating it. 
+    """
+    if isinstance(a, SignalExpr) and a._TimeSignal is None: 
+        return a.shape + (a.N,), a.dtype
+    if a._TimeSignal is not None: 
+        return a._TimeSignal.shape, a._TimeSignal.dtype
+    return (a.N,), np.dtype(float) if a.dtype is None else a.dtype
+
+def _operandBlock(a, start, n, iters, chunk): 
+    """ 
+    Samples [start, start+n) of a leaf operand: a view for arrays, the stream block for lazy operands. 
+    """
+    if isinstance(a, signal) and a._TimeSignal is not None: 
+        return a._TimeSignal[..., start:start+n]
+    if isinstance(a, Noise) and a._noise is not None: 
+        return a._noise[..., start:start+n]
+    if isinstance(a, (signal, Noise)): 
+        # Note: Lazy operand; a shared operand is streamed once and its block reused.
+        key = id(a)
+        if key not in iters: 
+            gen = a.stream(chunk=chunk)
+            iters[key] = [gen, None, None]
+        entry = iters[key]
+        if entry[1] != start: 
+            entry[1], entry[2] = start, next(entry[0])
+        return entry[2]
+    if isinstance(a, np.ndarray) and a.ndim: 
+        return a[..., start:start+n]
+    return a
+
+def _scratch(scratch, level, dtype, shape, chunk): 
+    key = (level, np.dtype(dtype), shape)
+    if key not in scratch: 
+        scratch[key] = np.empty(shape + (chunk,), dtype=dtype)
+    return scratch[key]
+
+
+class Noise(object):    
+    """ 
+    Noise source. 
+
+    Forms: 
+      - "awg"     : Additive white Gaussian noise, N(mean, std**2). 
+      - "cawg"    : Complex AWGN; real and imaginary parts each have variance std**2/2. 
+      - "uniform" : White, uniform on mean +/- sqrt(3)*std (standard deviation 'std'). 
+      - "pink"    : 1/f noise (white noise through a 3-pole/3-zero pinking filter), 
+                    scaled to standard deviation ~ 'std'. 
+      - "brown"   : 1/f**2 noise (random walk starting at 'mean'); 'std' is the step size. 
+
+    Samples are drawn from per-instance numpy Generators (bit generator "PCG64" or 
+    "SFC64"). The index space is split into segments of Noise.segment samples and 
+    segment k draws from its own child SeedSequence (spawn key k), so sample n only 
+    depends on the seed and n: large sizes are filled in parallel by 'threads' 
+    threads into one preallocated buffer, and Noise.stream() replays '_noise' exactly, 
+    independent of the thread count and chunk size. 
+
+    Keyword arguments: 
+    ------------------
+      mean, std, size : float, float, int 
+      seed    : int, SeedSequence or numpy.random.Generator (default: fresh entropy) 
+      bitgen  : str, default: "PCG64". Options: "PCG64", "SFC64". 
+      threads : int, default: all cores for large sizes 
+      lazy    : bool, default: False. Do not generate '_noise' (see Noise.stream). 
+      dtype   : numpy dtype, default: float64. Sample precision, np.float32 or np.float64 
+                (complex64/complex128 for "cawg"). float32 samples are drawn natively. 
+      shared  : bool, default: False. Generate '_noise' in shared memory; the Noise then 
+                pickles without its samples (see Shared memory). 
+    """
+    forms   = {"awg"     : "Additive Gaussian White Noise", 
+               "cawg"    : "Complex Additive Gaussian White Noise", 
+               "uniform" : "Uniform White Noise", 
+               "pink"    : "Pink (1/f) Noise", 
+               "brown"   : "Brown (1/f^2) Noise"} 
+    bitgens = ["PCG64", "SFC64"] # Note: Names in numpy.random (resolved on use; numpy.random is slow to import).
+    segment = 1 << 18 # Note: Samples per independently seeded segment.
+
+    # Pinking filter (Julius O. Smith III, "Spectral Audio Signal Processing"). 
+    _pinkB = [0.049922035, -0.095993537, 0.050612699, -0.004408786]
+    _pinkA = [1.0, -2.494956002, 2.017265875, -0.522189400]
+    _pinkGain = None
+
+    def __init__(self, form, **kwargs):
+        func = "Noise.__init__"
+        debug = False 
+    
+        self.form = None
+        self.mean = 0.0
+        self.std  = 0.0
+        self.size = 0
+        self.seed = None    # Note: Seed (or SeedSequence / Generator) of the instance. Replayed by Noise.stream().
+        self.bitgen  = "PCG64"
+        self.threads = None
+        self.lazy = False   # Note: If True, '_noise' is not generated (see Noise.stream).
+        self.precision = np.dtype(float) # Note: Real sample precision (see Noise.dtype).
+        self.shared = False # Note: If True, '_noise' is allocated in shared memory (see signal.share).
+        self._noise = None 
+    
+
+        # MSN: Becasue 'form' is a named value without a default, python-interupter will handle error. 
+        if form not in self.forms.keys(): 
+            raise RuntimeError("Must provide 'form' of noise. Options: \n%s"%(str(self.forms)))
+        if "debug" in kwargs: debug = kwargs["debug"]
+        for kw in kwargs:    
+            if kw == "mean":
+                if (debug): PROFILER.event(func, True, mean=kwargs[kw])
+                self.mean = float(kwargs[kw]) # TODO: Special care to type errors from user? 
+                continue 
+            if kw == "std":
+                if (debug): PROFILER.event(func, True, std=kwargs[kw])
+                self.std = float(kwargs[kw]) # TODO: Special care to type errors from user? 
+                continue            
+            if kw == "size":
+                if (debug): PROFILER.event(func, True, size=kwargs[kw])
+                self.size= int(kwargs[kw]) # TODO: Special care to type errors from user? 
+                continue   
+            if kw == "seed":
+                self.seed = kwargs[kw]
+                continue
+            if kw == "bitgen":
+                self.bitgen = str(kwargs[kw])
+                continue
+            if kw == "threads":
+                self.threads = None if kwargs[kw] is None else int(kwargs[kw])
+                continue
+            if kw == "lazy":
+                self.lazy = bool(kwargs[kw])
+                continue
+            if kw == "dtype":
+                self.precision = np.zeros(0, dtype=kwargs[kw]).real.dtype
+                continue
+            if kw == "shared":
+                self.shared = bool(kwargs[kw])
+                continue
+
+        self.form = form
+        self.debug = debug
+        if isinstance(self.seed, np.random.Generator): 
+            # Note: Derive the instance entropy from the caller's generator (advances it, like a draw).
+            name = type(self.seed.bit_generator).__name__
+            if name in self.bitgens and "bitgen" not in kwargs: 
+                self.bitgen = name
+            self._seedSeq = np.random.SeedSequence(self.seed.integers(0, 2**63, size=4).tolist())
+        elif isinstance(self.seed, np.random.SeedSequence):
+            self._seedSeq = self.seed
+        else: 
+            self._seedSeq = np.random.SeedSequence(self.seed)
+        if self.bitgen not in self.bitgens: 
+            raise ValueError("ERROR: (%s): Arguement (%s) only takes the following options = %s"%(func,"bitgen",str(self.bitgens)))
+        if self.precision not in (np.dtype(np.float32), np.dtype(np.float64)): 
+            raise ValueError("ERROR: (%s): Arguement (%s) only takes the following options = %s"%(func,"dtype",str(["float32","float64"])))
+
+        if not self.lazy: 
+            self._noise = self.generate() # Type = numpy.ndarray
+
+    @classmethod
+    def fromSNR(cls, target, snr, form="awg", **kwargs):
+        """ 
+        Noise of the length of 'target' scaled to a signal-to-noise ratio of 'snr' dB. 
+
+        The signal power is mean(|x|**2) of the target's samples (A**2/2 + DC**2 for 
+        lazy sin/cos, A**2 + DC**2 for lazy cexp). 
+        """
+        func = "Noise.fromSNR"
+
+        if form == "brown": 
+            raise ValueError("ERROR: (%s): Brown noise is not stationary; its SNR is undefined."%(func))
+        x = target._TimeSignal if isinstance(target, signal) else np.asarray(target)
+        if x is None: 
+            power = target.A**2 * (1.0 if target._part == "complex" else 0.5) + target.DC**2
+            size  = target.N
+        else: 
+            power = np.mean(np.abs(x)**2)
+            size  = x.shape[-1]
+        kwargs.setdefault("size", size)
+        return cls(form, std=np.sqrt(power / 10.0**(float(snr)/10.0)), **kwargs)
+
+    @property
+    def dtype(self): 
+        return np.result_type(self.precision, np.complex64) if self.form == "cawg" else self.precision
+
+    def __rng(self, k): 
+        """ 
+        Generator of segment k. 
+        """
+        seq = np.random.SeedSequence(entropy=self._seedSeq.entropy, spawn_key=tuple(self._seedSeq.spawn_key) + (k,), 
+                                     pool_size=self._seedSeq.pool_size)
+        return np.random.Generator(getattr(np.random, self.bitgen)(seq))
+
+    def __draw(self, rng, out): 
+        """ 
+        Fill 'out' with the next len(out) unit white samples drawn from 'rng'. 
+        """
+        if self.form == "uniform": 
+            rng.random(out=out, dtype=out.dtype)
+        elif self.form == "cawg": 
+            rng.standard_normal(out=out.view(self.precision), dtype=self.precision)
+        else: 
+            rng.standard_normal(out=out, dtype=out.dtype)
+        return out
+
+    def __pinkFilter(self): 
+        """ 
+        Streaming IIR (second-order sections) of the pinking filter, normalized to unit noise gain. 
+        """
+        if Noise._pinkGain is None: 
+            zeros, poles = np.sort_complex(np.roots(self._pinkB)), np.sort_complex(np.roots(self._pinkA))
+            sos = []
+            for z, p in ((zeros[:2], poles[:2]), (zeros[2:], poles[2:])): 
+                b, a = np.real(np.poly(z)), np.real(np.poly(p))
+                sos.append(np.concatenate([np.pad(b, (0, 3 - len(b))), np.pad(a, (0, 3 - len(a)))]))
+            sos = np.array(sos)
+            sos[0, :3] *= self._pinkB[0]
+            h = IIR(sos).filter(np.eye(1, 1 << 16)[0])
+            Noise._pinkSOS, Noise._pinkGain = sos, np.sqrt(np.sum(h**2))
+        return IIR(Noise._pinkSOS)
+
+    def __shape(self, out, state): 
+        """ 
+        Turn unit white samples in 'out' into samples of the noise form (in-place). 
+        'state' carries the filter / integrator state of pink and brown noise between blocks. 
+        """
+        if self.form == "uniform": 
+            out -= 0.5
+            out *= 2.0*np.sqrt(3.0)*self.std
+        elif self.form == "cawg": 
+            out *= self.std/np.sqrt(2.0)
+        elif self.form == "pink": 
+            if "filter" not in state: 
+                state["filter"] = self.__pinkFilter()
+            out *= self.std/Noise._pinkGain
+            out[...] = state["filter"].filter(out)
+        elif self.form == "brown": 
+            out *= self.std
+            np.cumsum(out, out=out)
+            out += state.get("carry", 0.0)
+            state["carry"] = out[-1] if len(out) else state.get("carry", 0.0)
+        else: 
+            out *= self.std
+        out += self.mean
+        return out
+
+    @_timed("Noise.generate")
+    def generate(self, size=None): 
+        """ 
+        Generate 'size' (default: Noise.size) samples in one preallocated buffer. 
+        Segments are drawn in parallel across threads (numpy releases the GIL while filling). 
+        """
+        if size is None: 
+            size = self.size
+        out = _empty(size, self.dtype, self.shared)
+        nseg = -(-size // self.segment)
+        threads = self.threads
+        if threads is None: 
+            threads = min(os.cpu_count() or 1, nseg) if nseg > 2 else 1
+
+        def fill(k): 
+            self.__draw(self.__rng(k), out[k*self.segment:(k + 1)*self.segment])
+        if threads > 1: 
+            import concurrent.futures # Note: Imported on demand to keep the core import fast.
+            with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as pool: 
+                list(pool.map(fill, range(nseg)))
+        else: 
+            for k in range(nseg): 
+                fill(k)
+        if self.debug: PROFILER.event("Noise.generate", True, size=size, segments=nseg, threads=threads)
+        return self.__shape(out, {})
+
+    def stream(self, chunk=65536, size=None):
+        """ 
+        Generate the noise block-by-block. 
+
+        Yields contiguous blocks of at most 'chunk' samples, 'size' samples in total 
+        (default: Noise.size). The blocks are drawn from the same per-segment 
+        generators as '_noise', so their concatenation matches '_noise' (exactly for 
+        the white forms; to floating-point rounding for "pink" and "brown"). Memory use is O(chunk). 
+
+        NOTE: The yielded array is a preallocated working buffer that is 
+              overwritten on the next iteration; copy it to keep it.
+        """
+        if size is None: 
+            size = self.size
+        chunk = int(chunk)
+        buf   = np.empty(min(chunk, size), dtype=self.dtype)
+        state = {}
+        k, used, rng = -1, self.segment, None
+        start = 0 
+        while start < size: 
+            n = min(chunk, size - start)
+            out = buf[:n]
+            filled = 0
+            while filled < n: 
+                if used == self.segment: 
+                    k, used = k + 1, 0
+                    rng = self.__rng(k)
+                m = min(n - filled, self.segment - used)
+                self.__draw(rng, out[filled:filled + m])
+                filled += m
+                used   += m
+            yield self.__shape(out, state)
+            start += n
+        return 
+
+    def getNoise(self):
+        """ 
+        Return the noise signal. (numpy.ndarrary type) 
+        """
+        return self._noise
+
+    def __getstate__(self): 
+        state = dict(self.__dict__)
+        state["_noise"] = _shareRef(self._noise) # Note: Shared samples travel as a segment descriptor.
+        return state
+
+    def __setstate__(self, state): 
+        state["_noise"] = _shareAttach(state["_noise"])
+        self.__dict__.update(state)
+
+# Shared memory:
+# ==============
+# Sample buffers in multiprocessing.shared_memory, for handing large signals to worker 
+# processes without copying. An array allocated by sharedEmpty() (or a signal/Noise 
+# built with shared=True, see signal.share) keeps its segment alive through its 'base'; 
+# the segment is closed when the last array viewing it is gone and unlinked when that 
+# happens in the process that created it. Pickling a shared signal, Noise or SharedRing 
+# sends a descriptor (segment name, offset, shape, strides, dtype) instead of the samples, 
+# and unpickling maps the same segment again (once per process). 
+#
+#   >> x = DSP.sin(Fo=1e3, Fs=1e6, N=1<<26, shared=True)
+#   >> pool.map(work, [x]*16)   # each worker maps the 512 MB buffer; nothing is copied 
+#
+# NOTE: Keep the signal alive in the creating process until the workers have attached 
+#       (e.g. until pool.map returns): the creator's last reference unlinks the segment. 
+
+_SHM_SEGMENTS = weakref.WeakValueDictionary() # Note: Segment name -> mapped _Segment of this process.
+
+def _closeSegment(shm, owner): 
+    try: 
+        shm.close()
+    except BufferError: 
+        pass # Note: Still exported (e.g. a raw memoryview); the mapping goes with the process.
+    if owner: 
+        try: 
+            shm.unlink()
+        except FileNotFoundError: 
+            pass
+
+class _Segment(object): 
+    """ 
+    One mapped shared memory segment (created, or attached by name). 
+    """
+    def __init__(self, size=None, name=None): 
+        from multiprocessing import shared_memory # Note: Imported on demand to keep the core import fast.
+        self.owner = name is None
+        self.shm   = shared_memory.SharedMemory(name=name, create=self.owner, size=max(1, int(size or 0)))
+        self.name  = self.shm.name
+        probe = np.frombuffer(self.shm.buf, dtype=np.uint8)
+        self.address = probe.ctypes.data
+        self.size    = probe.size
+        del probe # Note: No buffer export may outlive this, or the segment could never be closed.
+        _SHM_SEGMENTS[self.name] = self
+        weakref.finalize(self, _closeSegment, self.shm, self.owner)
+
+    @classmethod
+    def attach(cls, name): 
+        seg = _SHM_SEGMENTS.get(name)
+        return seg if seg is not None else cls(name=name)
+
+    def array(self, shape, dtype, offset=0, strides=None): 
+        """ 
+        ndarray over the segment whose 'base' keeps the segment mapped. 
+        """
+        return np.asarray(_SegmentView(self, shape, dtype, offset, strides))
+
+class _SegmentView(object): 
+    __slots__ = ("segment", "__array_interface__")
+    def __init__(self, segment, shape, dtype, offset, strides): 
+        self.segment = segment
+        self.__array_interface__ = {"shape" : tuple(int(n) for n in shape), "typestr" : np.dtype(dtype).str, 
+                                    "data" : (segment.address + int(offset), False), 
+                                    "strides" : None if strides is None else tuple(strides), "version" : 3}
+
+class _SharedRef(tuple): 
+    """ 
+    Pickled stand-in of a shared array: (segment name, offset, shape, strides, dtype). 
+    """
+    __slots__ = ()
+
+def sharedEmpty(shape, dtype=float): 
+    """ 
+    Return an uninitialized ndarray in a new shared memory segment (see Shared memory). 
+    """
+    dtype = np.dtype(dtype)
+    shape = (int(shape),) if np.ndim(shape) == 0 else tuple(int(n) for n in shape)
+    seg = _Segment(size=int(np.prod(shape))*dtype.itemsize)
+    return seg.array(shape, dtype)
+
+def _segmentOf(x): 
+    """ 
+    The _Segment an ndarray (or view) lives in, or None. 
+    """
+    while isinstance(x, np.ndarray): 
+        x = x.base
+    return x.segment if isinstance(x, _SegmentView) else None
+
+def isShared(x): 
+    """ 
+    True if ndarray 'x' lives in shared memory. 
+    """
+    return _segmentOf(x) is not None
+
+def _shareRef(x): 
+    """ 
+    _SharedRef of a shared ndarray, or the array itself when it is not shared. 
+    """
+    seg = _segmentOf(x)
+    if seg is None: 
+        return x
+    return _SharedRef((seg.name, x.__array_interface__["data"][0] - seg.address, x.shape, x.strides, x.dtype.str))
+
+def _shareAttach(ref): 
+    """ 
+    Inverse of _shareRef. 
+    """
+    if not isinstance(ref, _SharedRef): 
+        return ref
+    name, offset, shape, strides, dtype = ref
+    return _Segment.attach(name).array(shape, dtype, offset, strides)
+
+def _empty(shape, dtype, shared=False): 
+    return sharedEmpty(shape, dtype) if shared else np.empty(shape, dtype=dtype)
+
+
+class SharedRing(object): 
+    """ 
+    Single-producer / single-consumer ring buffer of samples in shared memory, for 
+    streaming blocks between processes. Pickle it (e.g. as a Process argument) to 
+    hand the other end to a worker. 
+
+    Blocks are written and read along the last (time) axis; the leading 'shape' 
+    (e.g. (channels,)) is fixed. The write and read counters live in the segment 
+    next to the samples and each is advanced by one side only, so no lock is needed; 
+    a full (empty) ring makes write (read) wait, polling every 'poll' seconds. 
+
+    Parameters: 
+    -----------
+    capacity : int 
+        Samples per channel held by the ring. 
+
+    dtype : numpy dtype, default: float64 
+
+    shape : tuple, default: () 
+        Leading (channel) shape of the blocks. 
+
+    Fs : float, optional 
+        If given, read() returns signals with this sampling frequency. 
+
+    Useage example:
+    ---------------
+      >> ring = DSP.SharedRing(1 << 20, dtype=np.complex64, Fs=1e6)
+      >> Process(target=consumer, args=(ring,)).start()  # consumer: while (x := ring.read(4096)).N: ...
+      >> for block in capture: ring.write(block)
+      >> ring.close()
+    """
+    def __init__(self, capacity, dtype=float, shape=(), Fs=None, poll=1e-4, _name=None): 
+        self.capacity = int(capacity)
+        self.dtype    = np.dtype(dtype)
+        self.shape    = tuple(int(n) for n in shape)
+        self.Fs       = None if Fs is None else SItoString(Fs)
+        self.poll     = float(poll)
+        count = int(np.prod(self.shape))*self.capacity
+        if _name is None: 
+            seg = _Segment(size=64 + count*self.dtype.itemsize)
+        else: 
+            seg = _Segment.attach(_name)
+        self._segment = seg
+        self._header  = seg.array((4,), np.int64) # Note: [written, read, closed, unused]; 64-byte header.
+        self._data    = seg.array(self.shape + (self.capacity,), self.dtype, offset=64)
+        if _name is None: 
+            self._header[:] = 0
+
+    def __reduce__(self): 
+        return (SharedRing, (self.capacity, self.dtype.str, self.shape, self.Fs, self.poll, self._segment.name))
+
+    def __len__(self): 
+        """ 
+        Samples available to read. 
+        """
+        return int(self._header[0] - self._header[1])
+
+    @property
+    def space(self): 
+        return self.capacity - len(self)
+
+    @property
+    def closed(self): 
+        return bool(self._header[2])
+
+    def close(self): 
+        """ 
+        Mark the end of the stream (producer side); read() drains what is left. 
+        """
+        self._header[2] = 1
+
+    def __wait(self, ready, timeout, func): 
+        import time
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not ready(): 
+            if deadline is not None and time.monotonic() >= deadline: 
+                raise TimeoutError("ERROR: (%s): Timed out after %s s."%(func, str(timeout)))
+            time.sleep(self.poll)
+
+    def write(self, x, timeout=None): 
+        """ 
+        Append a block (signal or ndarray of shape shape + (n,)), waiting for space. 
+        """
+        func = "SharedRing.write"
+
+        x, like = _asBlock(x)
+        if x.shape[:-1] != self.shape: 
+            raise ValueError("ERROR: (%s): Block shape %s does not match the ring %s."%(func, str(x.shape), str(self.shape)))
+        if self.closed: 
+            raise RuntimeError("ERROR: (%s): The ring is closed."%(func))
+        n, done = x.shape[-1], 0
+        while done < n: 
+            self.__wait(lambda: self.space > 0, timeout, func)
+            w = int(self._header[0])
+            m = min(n - done, self.space)
+            start = w % self.capacity
+            first = min(m, self.capacity - start)
+            self._data[..., start:start + first] = x[..., done:done + first]
+            self._data[..., :m - first] = x[..., done + first:done + m]
+            self._header[0] = w + m # Note: Published after the samples are in place.
+            done += m
+        return n
+
+    def read(self, n, timeout=None): 
+        """ 
+        Return the next n samples (fewer only at the end of a closed stream), waiting 
+        for the producer. An ndarray, or a signal when the ring has an Fs. 
+        """
+        func = "SharedRing.read"
+
+        n = int(n)
+        self.__wait(lambda: len(self) >= n or self.closed, timeout, func)
+        r = int(self._header[1])
+        m = min(n, len(self))
+        out = np.empty(self.shape + (m,), dtype=self.dtype)
+        start = r % self.capacity
+        first = min(m, self.capacity - start)
+        out[..., :first] = self._data[..., start:start + first]
+        out[..., first:] = self._data[..., :m - first]
+        self._header[1] = r + m
+        if self.Fs is None: 
+            return out
+        return signal.fromArray(out, Fs=self.Fs)
+
+
+# Filtering:
+# ==========
+
+def _asBlock(x):
+    """ 
+    Split a filter input into its samples and the signal (or None) its settings come from.
+    """
+    if isinstance(x, signal): 
+        return np.asarray(x.getTime()), x
+    return np.asarray(x), None
+
+def _asOutput(y, like):
+    """ 
+    Wrap filter output 'y' the same way as the input it was computed from.
+    """
+    if like is None: 
+        return y
+    return signal.fromArray(y, like=like)
+
+
+def firwin(numtaps, cutoff, Fs=2.0, window="hamming"):
+    """ 
+    Design a linear-phase low-pass FIR filter with the window method. 
+
+    Parameters: 
+    -----------
+    numtaps : int
+        Number of taps (filter length). 
+
+    cutoff : float
+        Cutoff frequency (-6 dB), in the same units as 'Fs'. 
+
+    Fs : float, default: 2.0 
+        Sampling frequency. The default normalizes 'cutoff' to Nyquist. 
+
+    window : str, default: "hamming"
+        Options: "hamming", "hann", "blackman", "rect" (see getWindow).
+
+    Return: 
+    -------
+      taps : numpy.ndarray, normalized to unity gain at DC.
+    """
+    func = "firwin"
+
+    fc = float(cutoff)/float(Fs) # Note: cycles/sample
+    if not (0.0 < fc < 0.5): 
+        raise ValueError("ERROR: (%s): Cutoff must lie between 0 and Fs/2."%(func))
+
+    n = np.arange(int(numtaps)) - (int(numtaps) - 1)/2.0
+    taps = 2*fc*np.sinc(2*fc*n) * getWindow(window, int(numtaps))
+    return taps / taps.sum()
+
+
+def biquad(kind, fo, Fs, Q=1.0/np.sqrt(2.0)):
+    """ 
+    Design a single second-order section (RBJ audio-EQ cookbook). 
+
+    Parameters: 
+    -----------
+    kind : str
+        Options: "lowpass", "highpass", "bandpass", "notch".
+
+    fo : float
+        Corner (or center) frequency. 
+
+    Fs : float 
+        Sampling frequency. 
+
+    Q : float, default: 1/sqrt(2) 
+        Quality factor. 
+
+    Return: 
+    -------
+      sos : numpy.ndarray, [b0, b1, b2, a0, a1, a2] normalized so that a0 = 1. 
+    """
+    func = "biquad"
+
+    w0 = 2*np.pi*float(fo)/float(Fs)
+    c  = np.cos(w0)
+    alpha = np.sin(w0)/(2.0*Q)
+    if kind == "lowpass": 
+        b = [(1 - c)/2, 1 - c, (1 - c)/2]
+    elif kind == "highpass":
+        b = [(1 + c)/2, -(1 + c), (1 + c)/2]
+    elif kind == "bandpass":
+        b = [alpha, 0.0, -alpha]
+    elif kind == "notch":
+        b = [1.0, -2*c, 1.0]
+    else: 
+        raise ValueError("ERROR: (%s): Arguement (%s) only takes the following options = %s"%(func,"kind",str(["lowpass","highpass","bandpass","notch"])))
+    a = [1 + alpha, -2*c, 1 - alpha]
+    return np.array(b + a) / a[0]
+
+
+class FIR(object):
+    """ 
+    Streaming FIR filter with persistent state. 
+
+    Each call to FIR.filter() continues where the previous one stopped (the last 
+    len(taps)-1 input samples of every channel are carried as state), so filtering 
+    a long stream block-by-block gives the same output as filtering it at once. 
+
+    Parameters: 
+    -----------
+    taps : array_like 
+        Filter coefficients. 
+
+    method : str, default: "auto" 
+        Convolution method. Options: 
+          - "direct" : Time-domain multiply-accumulate, O(N*taps). 
+          - "ols"    : FFT overlap-save. 
+          - "ola"    : FFT overlap-add. 
+          - "auto"   : Pick "direct" or "ols" per call from the tap count and block size. 
+
+    nfft : int, optional
+        FFT length of the FFT methods (default: chosen from the tap count). 
+
+    Input may be a signal or an ndarray whose last axis is time; leading axes are 
+    independent channels, e.g. a (channels, N) stack is filtered in one call. 
+    """
+    methods = ["auto", "direct", "ols", "ola"]
+
+    def __init__(self, taps, method="auto", nfft=None, debug=False):
+        func = "FIR.__init__"
+
+        self.taps = np.asarray(taps)
+        if self.taps.ndim != 1 or len(self.taps) == 0: 
+            raise ValueError("ERROR: (%s): 'taps' must be a non-empty 1-D array."%(func))
+        if method not in self.methods: 
+            raise ValueError("ERROR: (%s): Arguement (%s) only takes the following options = %s"%(func,"method",str(self.methods)))
+        if nfft is not None and nfft < 2*len(self.taps) - 1: 
+            raise ValueError("ERROR: (%s): 'nfft' must be at least 2*len(taps)-1."%(func))
+        self.method = method
+        self.nfft   = nfft
+        self.debug  = debug
+        self._H     = {} # Note: Cache of taps spectra, keyed by (nfft, real).
+        self.reset()
+
+    def reset(self): 
+        """ 
+        Clear the filter state (start a new stream). 
+        """
+        self.state = None
+
+    def fftLength(self, L):
+        """ 
+        FFT length used for a block of L samples. 
+        """
+        if self.nfft: 
+            return self.nfft
+        M = len(self.taps)
+        # Note: ~8x the filter length keeps the overlap overhead small; never longer than one segment needs.
+        return next_fast_len(max(2*M - 1, min(8*M, L + M - 1)))
+
+    def choose(self, L): 
+        """ 
+        Return the convolution method used for a block of L samples. 
+        """
+        if self.method != "auto": 
+            return self.method
+        M = len(self.taps)
+        if M <= 32: 
+            return "direct"
+        nfft = self.fftLength(L)
+        costDirect = float(L)*M
+        costFFT    = 3.0*np.ceil(float(L)/(nfft - M + 1))*nfft*np.log2(nfft)
+        return "direct" if costDirect <= costFFT else "ols"
+
+    @_timed("FIR.filter")
+    def filter(self, x): 
+        """ 
+        Filter the next block of samples. Returns the same type as the input. 
+        """
+        func = "FIR.filter"
+
+        x, like = _asBlock(x)
+        M = len(self.taps)
+        L = x.shape[-1]
+        if self.state is None: 
+            self.state = np.zeros(x.shape[:-1] + (M - 1,), dtype=np.result_type(x, self.taps))
+        elif self.state.shape[:-1] != x.shape[:-1]: 
+            raise ValueError("ERROR: (%s): Channel shape %s does not match the filter state %s."%(func, str(x.shape[:-1]), str(self.state.shape[:-1])))
+
+        xx = np.concatenate([self.state, x], axis=-1)
+        method = self.choose(L)
+        if self.debug: PROFILER.event(func, True, L=L, taps=M, method=method)
+        if L == 0: 
+            y = np.zeros(x.shape, dtype=np.result_type(x, self.taps))
+        elif method == "direct": 
+            y = self.__direct(xx, L)
+        elif method == "ols":
+            y = self.__ols(xx, L)
+        else: 
+            y = self.__ola(xx, L)
+
+        self.state = xx[..., xx.shape[-1] - (M - 1):].copy()
+        return _asOutput(y, like)
+
+    def __spectrum(self, nfft, real):
+        key = (nfft, real)
+        if key not in self._H: 
+            self._H[key] = np.fft.rfft(self.taps, nfft) if real else np.fft.fft(self.taps, nfft)
+        return self._H[key]
+
+    def __conv(self, frames, nfft):
+        """ 
+        Circular convolution of every frame (last axis) with the taps. 
+        """
+        real = np.isrealobj(frames) and np.isrealobj(self.taps)
+        if real: 
+            return np.fft.irfft(np.fft.rfft(frames, nfft) * self.__spectrum(nfft, True), nfft)
+        return np.fft.ifft(np.fft.fft(frames, nfft) * self.__spectrum(nfft, False), nfft)
+
+    def __direct(self, xx, L):
+        M = len(self.taps)
+        y   = np.zeros(xx.shape[:-1] + (L,), dtype=np.result_type(xx, self.taps))
+        tmp = np.empty_like(y)
+        for k in range(M): 
+            np.multiply(xx[..., M-1-k : M-1-k+L], self.taps[k], out=tmp)
+            y += tmp
+        return y
+
+    def __ols(self, xx, L):
+        M = len(self.taps)
+        nfft = self.fftLength(L)
+        step = nfft - M + 1
+        nseg = -(-L // step)
+        pad  = nseg*step + M - 1 - xx.shape[-1]
+        if pad > 0: 
+            xx = np.concatenate([xx, np.zeros(xx.shape[:-1] + (pad,), dtype=xx.dtype)], axis=-1)
+        # Zero-copy (..., nseg, nfft) frame matrix; one batched FFT over all segments.
+        frames = np.lib.stride_tricks.sliding_window_view(xx, nfft, axis=-1)[..., ::step, :]
+        y = self.__conv(frames, nfft)[..., M-1:]
+        return y.reshape(y.shape[:-2] + (nseg*step,))[..., :L]
+
+    def __ola(self, xx, L):
+        M = len(self.taps)
+        nfft = self.fftLength(L)
+        B  = nfft - M + 1 # Note: B >= M since nfft >= 2M-1. 
+        T  = xx.shape[-1]
+        nb = -(-T // B)
+        xp = np.zeros(xx.shape[:-1] + (nb*B,), dtype=xx.dtype)
+        xp[..., :T] = xx
+        yb = self.__conv(xp.reshape(xx.shape[:-1] + (nb, B)), nfft)
+        full = np.zeros(xx.shape[:-1] + (nb + 1, B), dtype=yb.dtype)
+        full[..., :nb, :] += yb[..., :B]
+        full[..., 1:, :M-1] += yb[..., B:B+M-1]
+        full = full.reshape(xx.shape[:-1] + ((nb + 1)*B,))
+        return full[..., M-1:M-1+L]
+
+
+class IIR(object):
+    """ 
+    Streaming IIR filter implemented as a cascade of second-order sections (SOS). 
+
+    Each section is a direct-form I biquad whose last two inputs and outputs are 
+    carried as state, so filtering a long stream block-by-block gives the same 
+    output (to within floating-point rounding) as filtering it at once. 
+
+    The recursion is evaluated block-wise: within a block of B samples the output 
+    of a section is its zero-state response (an FFT convolution with the section's 
+    impulse response truncated to B, which is exact inside the block) plus the 
+    zero-input response to the carried state. This avoids a per-sample Python loop 
+    and works on (channels, N) stacks in one call. 
+
+    Parameters: 
+    -----------
+    sos : array_like, shape (sections, 6)
+        Rows of [b0, b1, b2, a0, a1, a2] (see biquad()). 
+
+    block : int, default: 4096 
+        Internal block length of the recursion. 
+    """
+    def __init__(self, sos, block=4096, debug=False):
+        func = "IIR.__init__"
+
+        sos = np.atleast_2d(np.asarray(sos, dtype=float))
+        if sos.ndim != 2 or sos.shape[1] != 6: 
+            raise ValueError("ERROR: (%s): 'sos' must have shape (sections, 6)."%(func))
+        if np.any(sos[:, 3] == 0): 
+            raise ValueError("ERROR: (%s): Leading denominator coefficient a0 must be non-zero."%(func))
+        self.sos   = sos / sos[:, 3:4]
+        self.block = int(block)
+        self.debug = debug
+        self._resp = {} # Note: Cache of (impulse-response spectrum, zero-input responses), keyed by (section, B).
+        self.reset()
+
+    def reset(self): 
+        """ 
+        Clear the filter state (start a new stream). 
+        """
+        self.state = None # Note: shape (..., sections, 4) = [x[n-1], x[n-2], y[n-1], y[n-2]]
+
+    def __responses(self, k, B, nfft):
+        key = (k, B)
+        if key not in self._resp: 
+            a1, a2 = self.sos[k, 4], self.sos[k, 5]
+            resp = np.zeros((3, B))
+            # Rows: impulse response, response to y[-1] = 1, response to y[-2] = 1.
+            for r, (x0, y1, y2) in enumerate(((1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0))): 
+                v = x0 - a1*y1 - a2*y2
+                resp[r, 0] = v
+                y2, y1 = y1, v
+                for n in range(1, B): 
+                    v = -a1*y1 - a2*y2
+                    resp[r, n] = v
+                    y2, y1 = y1, v
+            self._resp[key] = (np.fft.rfft(resp[0], nfft), np.fft.fft(resp[0], nfft), resp[1], resp[2])
+        return self._resp[key]
+
+    def __recursive(self, w, k, y1, y2): 
+        L = w.shape[-1]
+        B = min(self.block, L)
+        nfft = next_fast_len(2*B - 1)
+        Hr, Hc, g1, g2 = self.__responses(k, B, nfft)
+        nb = -(-L // B)
+        wp = np.zeros(w.shape[:-1] + (nb*B,), dtype=w.dtype)
+        wp[..., :L] = w
+        wp = wp.reshape(w.shape[:-1] + (nb, B))
+        if np.isrealobj(w): 
+            zs = np.fft.irfft(np.fft.rfft(wp, nfft) * Hr, nfft)[..., :B]
+        else: 
+            zs = np.fft.ifft(np.fft.fft(wp, nfft) * Hc, nfft)[..., :B]
+        for b in range(nb): 
+            yb = zs[..., b, :]
+            yb += g1 * y1[..., None]
+            yb += g2 * y2[..., None]
+            y2 = yb[..., -2] if B > 1 else y1
+            y1 = yb[..., -1]
+        return zs.reshape(w.shape[:-1] + (nb*B,))[..., :L]
+
+    @_timed("IIR.filter")
+    def filter(self, x): 
+        """ 
+        Filter the next block of samples. Returns the same type as the input. 
+        """
+        func = "IIR.filter"
+
+        x, like = _asBlock(x)
+        lead = x.shape[:-1]
+        nsec = len(self.sos)
+        if self.state is None: 
+            self.state = np.zeros(lead + (nsec, 4), dtype=np.result_type(x, float))
+        elif self.state.shape[:-2] != lead: 
+            raise ValueError("ERROR: (%s): Channel shape %s does not match the filter state %s."%(func, str(lead), str(self.state.shape[:-2])))
+        if x.shape[-1] == 0: 
+            return _asOutput(np.zeros(x.shape, dtype=self.state.dtype), like)
+
+        y = x
+        for k in range(nsec): 
+            b0, b1, b2 = self.sos[k, :3]
+            st = self.state[..., k, :]
+            xx = np.concatenate([st[..., 1:2], st[..., 0:1], y], axis=-1) # x[n-2], x[n-1], x[n], ...
+            w  = b0*xx[..., 2:] + b1*xx[..., 1:-1] + b2*xx[..., :-2]
+            yn = self.__recursive(w, k, st[..., 2], st[..., 3])
+            ext = np.concatenate([st[..., 3:4], st[..., 2:3], yn], axis=-1) # y[n-2], y[n-1], y[n], ...
+            self.state[..., k, :] = np.stack([xx[..., -1], xx[..., -2], ext[..., -1], ext[..., -2]], axis=-1)
+            y = yn
+        if self.debug: PROFILER.event(func, True, L=x.shape[-1], sections=nsec)
+        return _asOutput(y, like)
+
+
+# Convolution and correlation:
+# ============================
+
+class Kernel(object):
+    """ 
+    Convolution kernel (or correlation template) whose spectra are cached. 
+
+    Pass a Kernel instead of an array to convolve()/correlate() when the same kernel 
+    is applied to many inputs (e.g. a matched-filter template): the kernel FFT for 
+    each transform length is computed once and reused. 
+
+    Parameters: 
+    -----------
+    h : array_like or signal 
+        Kernel samples (1-D). 
+
+    method : str, default: "auto" 
+        Options: 
+          - "direct" : Time-domain multiply-accumulate, O(L*M). 
+          - "fft"    : One FFT of the whole (zero-padded) input. 
+          - "ola"    : FFT overlap-add in blocks of ~8x the kernel length (long inputs, short kernels). 
+          - "auto"   : Cheapest of the three for the input length (see Kernel.choose). 
+    """
+    methods = ["auto", "direct", "fft", "ola"]
+
+    def __init__(self, h, method="auto", debug=False): 
+        func = "Kernel.__init__"
+
+        self.Fs = None
+        if isinstance(h, signal): 
+            self.Fs = h.Fs
+            h = h.getTime()
+        self.h = np.asarray(h)
+        if self.h.ndim != 1 or len(self.h) == 0: 
+            raise ValueError("ERROR: (%s): The kernel must be a non-empty 1-D array."%(func))
+        if method not in self.methods: 
+            raise ValueError("ERROR: (%s): Arguement (%s) only takes the following options = %s"%(func,"method",str(self.methods)))
+        self.method = method
+        self.debug  = debug
+        self._H     = {} # Note: Cache of kernel spectra, keyed by (nfft, real, flip).
+        self._FIR   = {} # Note: Block convolvers (direct / overlap-add), keyed by (method, flip).
+
+    def __len__(self): 
+        return len(self.h)
+
+    def taps(self, flip=False): 
+        """ 
+        Kernel samples; with flip=True the conjugated, time-reversed kernel (correlation). 
+        """
+        return np.conj(self.h[::-1]) if flip else self.h
+
+    def choose(self, L): 
+        """ 
+        Return the method used for an input of L samples. 
+        """
+        if self.method != "auto": 
+            return self.method
+        M = len(self.h)
+        if M <= 32 or L <= 32: 
+            return "direct"
+        n = next_fast_len(L + M - 1)
+        nfft = next_fast_len(max(2*M - 1, min(8*M, L + M - 1)))
+        costs = {"direct" : float(L)*M, 
+                 "fft"    : 3.0*n*np.log2(n), 
+                 "ola"    : 2.0*np.ceil(float(L + M - 1)/(nfft - M + 1))*nfft*np.log2(nfft)}
+        return min(costs, key=costs.get)
+
+    def spectrum(self, nfft, real, flip=False): 
+        """ 
+        Cached FFT (rfft if 'real') of the (flipped) kernel, zero-padded to nfft. 
+        """
+        key = (int(nfft), bool(real), bool(flip))
+        if key not in self._H: 
+            h = self.taps(flip)
+            self._H[key] = np.fft.rfft(h, nfft) if real else np.fft.fft(h, nfft)
+        return self._H[key]
+
+    @_timed("Kernel.full")
+    def full(self, x, flip=False): 
+        """ 
+        Full linear convolution (length L+M-1) of 'x' (ndarray, last axis is time) 
+        with the (flipped) kernel. 
+        """
+        M = len(self.h)
+        L = x.shape[-1]
+        method = self.choose(L)
+        if self.debug: PROFILER.event("Kernel.full", True, L=L, M=M, method=method)
+        if method == "fft": 
+            n = next_fast_len(L + M - 1)
+            real = np.isrealobj(x) and np.isrealobj(self.h)
+            if real: 
+                return np.fft.irfft(np.fft.rfft(x, n) * self.spectrum(n, True, flip), n)[..., :L + M - 1]
+            return np.fft.ifft(np.fft.fft(x, n) * self.spectrum(n, False, flip), n)[..., :L + M - 1]
+        # Note: A zero-state FIR over x plus M-1 trailing zeros is the full convolution; 
+        #       its taps spectra stay cached between calls.
+        key = (method, bool(flip))
+        if key not in self._FIR: 
+            self._FIR[key] = FIR(self.taps(flip), method=method)
+        fir = self._FIR[key]
+        fir.reset()
+        xx = np.concatenate([x, np.zeros(x.shape[:-1] + (M - 1,), dtype=x.dtype)], axis=-1)
+        return fir.filter(xx)
+
+
+def _lagged(x, h, mode, flip, Fs, func): 
+    """ 
+    Shared body of convolve() and correlate(). 
+    """
+    modes = ["full", "same", "valid"]
+    if mode not in modes: 
+        raise ValueError("ERROR: (%s): Arguement (%s) only takes the following options = %s"%(func,"mode",str(modes)))
+    x, like = _asBlock(x)
+    if not isinstance(h, Kernel): 
+        h = Kernel(h)
+    if Fs is None: 
+        Fs = like.Fs if like is not None else h.Fs
+    if Fs is None: 
+        Fs = 1.0
+    elif h.Fs is not None and not np.isclose(h.Fs, Fs, rtol=1e-12, atol=0.0): 
+        raise ValueError("ERROR: (%s): Input and kernel have different sampling frequencies (%s, %s)."%(func, str(Fs), str(h.Fs)))
+
+    L, M = x.shape[-1], len(h)
+    y = h.full(x, flip=flip)
+    # Note: Same output lengths and alignment as numpy.convolve/numpy.correlate.
+    if mode == "full": 
+        start, n = 0, L + M - 1
+    elif mode == "same": 
+        n = max(L, M)
+        start = (L + M - 1 - n)//2
+        if flip and L < M: 
+            start = -(-(L + M - 1 - n)//2) # Note: numpy.correlate centres the other way when the template is longer.
+    else: 
+        start, n = min(L, M) - 1, abs(L - M) + 1
+    lag0 = start - (M - 1) if flip else start
+    return LagSignal(y[..., start:start + n], lag0=lag0, Fs=Fs, like=like)
+
+
+def convolve(x, h, mode="full", Fs=None): 
+    """ 
+    Linear convolution of 'x' with the kernel 'h'. 
+
+    Parameters: 
+    -----------
+    x : signal or numpy.ndarray 
+        Input; the last axis is time, leading axes are channels (batched). 
+
+    h : array_like, signal or Kernel 
+        1-D kernel. Pass a Kernel to reuse its cached spectra (and choose the method). 
+
+    mode : str, default: "full" 
+        Options: "full", "same", "valid" (as numpy.convolve). 
+
+    Fs : float, optional 
+        Sampling frequency; taken from the signals when not given (1.0 for ndarrays). 
+
+    Return: 
+    -------
+      ret : LagSignal. 'lags' holds the output sample positions relative to the start of 'x'. 
+    """
+    return _lagged(x, h, mode, False, Fs, "convolve")
+
+
+def correlate(x, template, mode="full", Fs=None): 
+    """ 
+    Cross-correlation r[k] = sum_n x[n+k]*conj(template[n]) (as numpy.correlate). 
+
+    Parameters: 
+    -----------
+    x : signal or numpy.ndarray 
+        Input; the last axis is time, leading axes are channels (batched). 
+
+    template : array_like, signal or Kernel 
+        1-D template. Pass a Kernel to reuse its cached spectra. 
+
+    mode : str, default: "full" 
+        Options: "full", "same", "valid". 
+
+    Fs : float, optional 
+        Sampling frequency; taken from the signals when not given (1.0 for ndarrays). 
+
+    Return: 
+    -------
+      ret : LagSignal. 'lags' are in samples, 'tau' in seconds; LagSignal.delay() is the 
+            lag of the correlation peak (e.g. the delay of 'x' relative to 'template'). 
+
+    Useage example: 
+    ---------------
+      >> r = DSP.correlate(rx, tx)     # rx: delayed copy of tx 
+      >> r.delay()                     -> delay in seconds 
+    """
+    return _lagged(x, template, mode, True, Fs, "correlate")
+
+
+class LagSignal(signal): 
+    """ 
+    Samples indexed by lag: the result of convolve(), correlate() and Correlator. 
+
+    Sample i is at lag 'lag0'+i. 'lags' (samples) and 'tau' (seconds) are the lag 
+    axes; 'Ns' and 'nTs' follow them so plots are drawn against the lag. 
+    """
+    __slots__ = ("lag0",)
+
+    def __init__(self, y, lag0=0, Fs=1.0, like=None): 
+        self._signal__defaults()
+        if like is not None: 
+            self.A, self.DC, self.Phase = like.A, like.DC, like.Phase
+            self.Fo, self.To = like.Fo, like.To
+        self.Fs, self.Ts = resolve_freq_and_period(f=Fs, p=None)
+        self.lag0  = int(lag0)
+        self.N     = y.shape[-1]
+        self.dtype = y.dtype
+        self.TimeSignal = y
+        self.freqRes = float(self.Fs)/float(self.N) if self.N else None
+        self.__class__.name = "DSP.LagSignal"
+
+    @property
+    def lags(self): 
+        return self.lag0 + _axis(self.N)
+
+    @property
+    def tau(self): 
+        return self.lags * self.Ts
+
+    @property
+    def Ns(self): 
+        return self.lags if self._Ns is None else self._Ns
+    Ns = Ns.setter(signal.Ns.fset)
+
+    @property
+    def nTs(self): 
+        return self.tau if self._nTs is None else self._nTs
+    nTs = nTs.setter(signal.nTs.fset)
+
+    def delay(self): 
+        """ 
+        Lag (seconds) of the largest |value|, refined by parabolic interpolation 
+        between samples. One value per channel for batched results. 
+        """
+        mag = np.abs(self.TimeSignal)
+        k = np.argmax(mag, axis=-1)
+        frac = np.zeros(np.shape(k))
+        inner = (k > 0) & (k < self.N - 1)
+        if np.any(inner): 
+            kk = np.clip(k, 1, max(1, self.N - 2))
+            a = np.take_along_axis(mag, (kk - 1)[..., None], axis=-1)[..., 0]
+            b = np.take_along_axis(mag, kk[..., None], axis=-1)[..., 0]
+            c = np.take_along_axis(mag, (kk + 1)[..., None], axis=-1)[..., 0]
+            den = a - 2*b + c
+            with np.errstate(divide="ignore", invalid="ignore"): 
+                frac = np.where(inner & (den != 0), 0.5*(a - c)/den, 0.0)
+        return (self.lag0 + k + frac) * self.Ts
+
+
+class Correlator(object): 
+    """ 
+    Streaming cross-correlator: slides a fixed template over chunked input. 
+
+    Each call to Correlator.update() continues where the previous one stopped and 
+    returns the correlation at every lag whose window is complete, i.e. the 'valid' 
+    correlation of everything seen so far, emitted incrementally: 
+
+      concatenate(update(b) for b in blocks) == correlate(concatenate(blocks), template, mode="valid") 
+
+    Parameters: 
+    -----------
+    template : array_like, signal or Kernel 
+        1-D template. 
+
+    Fs : float, optional 
+        Sampling frequency; taken from the template or the input signals when not given. 
+
+    method : str, default: "auto" 
+        FIR method used per block ("auto", "direct", "ols", "ola"; see FIR). 
+    """
+    def __init__(self, template, Fs=None, method="auto", debug=False): 
+        if not isinstance(template, Kernel): 
+            template = Kernel(template)
+        self.template = template
+        self.Fs    = Fs if Fs is not None else template.Fs
+        self.debug = debug
+        self.fir   = FIR(template.taps(flip=True), method=method, debug=debug)
+        self.reset()
+
+    def reset(self): 
+        """ 
+        Start a new stream. 
+        """
+        self.fir.reset()
+        self.seen = 0 # Note: Input samples consumed.
+        self.lag  = 0 # Note: Lag of the first output of the next update().
+
+    @_timed("Correlator.update")
+    def update(self, x): 
+        """ 
+        Correlate the next block of samples. Returns a LagSignal (or an ndarray for 
+        ndarray input) with the newly completed lags. 
+        """
+        x, like = _asBlock(x)
+        M = len(self.template)
+        y = self.fir.filter(x)
+        skip = max(0, min(x.shape[-1], M - 1 - self.seen)) # Note: Outputs before the first full window.
+        self.seen += x.shape[-1]
+        y = y[..., skip:]
+        lag0 = self.lag
+        self.lag += y.shape[-1]
+        if like is None: 
+            return y
+        Fs = self.Fs if self.Fs is not None else like.Fs
+        return LagSignal(y, lag0=lag0, Fs=Fs, like=like)
+
+
+# Resampling:
+# ===========
+
+class Resampler(object):
+    """ 
+    Streaming polyphase resampler with persistent state. 
+
+    The anti-aliasing/anti-imaging low-pass filter is split into 'up' polyphase 
+    branches and each output sample is computed from the single branch it needs, 
+    so the zero-stuffed samples are never multiplied and the samples discarded 
+    by decimation are never computed. 
+
+    Rational rates (up/down) use exact integer bookkeeping. Other ratios use a 
+    bank of 'phases' branches with linear interpolation between adjacent branches. 
+    The filter delay is compensated so that output sample m lines up with input 
+    time m/ratio; the last outputs are therefore emitted by Resampler.flush(). 
+
+    Parameters: 
+    -----------
+    up, down : int 
+        Rational rate change up/down. 
+
+    ratio : float 
+        New rate over old rate (used instead of up/down). Ratios that are exactly 
+        representable with a denominator <= 1000 are handled as rational. 
+
+    halflen : int, default: 10 
+        Half length of the filter, in input (or output, when decimating) samples. 
+
+    window : str, default: "hamming" 
+        Filter design window (see firwin). 
+
+    phases : int, default: 256 
+        Branches of the polyphase bank for non-rational ratios. 
+
+    Input may be a signal or an ndarray whose last axis is time; leading axes are channels. 
+    """
+    def __init__(self, up=None, down=None, ratio=None, halflen=10, window="hamming", phases=256, debug=False):
+        func = "Resampler.__init__"
+
+        if ratio is None: 
+            if up is None or down is None: 
+                raise ValueError("ERROR: (%s): Must provide either 'up' and 'down' or 'ratio'."%(func))
+            ratio = Fraction(int(up), int(down))
+        elif not isinstance(ratio, Fraction): 
+            approx = Fraction(float(ratio)).limit_denominator(1000)
+            if abs(float(approx) - float(ratio)) <= 1e-12*float(ratio): 
+                ratio = approx
+        if ratio <= 0: 
+            raise ValueError("ERROR: (%s): Rate ratio must be positive."%(func))
+
+        self.ratio    = ratio
+        self.rational = isinstance(ratio, Fraction)
+        if self.rational: 
+            self.up, self.down = ratio.numerator, ratio.denominator
+        else: 
+            self.up, self.down = int(phases), int(phases)/float(ratio)
+        self.debug = debug
+
+        # Prototype filter in the upsampled domain (gain 'up' so each branch has unity DC gain).
+        rate = max(self.up, self.down)
+        if rate > 1: 
+            numtaps = 2*int(halflen)*int(np.ceil(rate)) + 1
+            self.taps = firwin(numtaps, 0.5/rate, Fs=1.0, window=window) * self.up
+        else: 
+            self.taps = np.ones(1)
+        self.delay = (len(self.taps) - 1)//2
+
+        # Polyphase matrix: Hp[p, j] = taps[p + j*up] for p = 0..up (row 'up' is used by interpolation).
+        self.K = -(-len(self.taps) // self.up)
+        hpad = np.zeros(self.K*self.up + 1)
+        hpad[:len(self.taps)] = self.taps
+        self.Hp = hpad[np.arange(self.up + 1)[:, None] + self.up*np.arange(self.K)[None, :]]
+        self.reset()
+
+    def reset(self): 
+        """ 
+        Clear the resampler state (start a new stream). 
+        """
+        self.state = None # Note: Last K-1 input samples of every channel.
+        self.nin   = 0    # Note: Input samples consumed. 
+        self.m     = 0    # Note: Index of the next output sample. 
+
+    def __positions(self, ms): 
+        """ 
+        Input sample index, branch and interpolation fraction of output samples 'ms'. 
+        """
+        if self.rational: 
+            t = ms*self.down + self.delay
+            return t // self.up, t % self.up, None
+        t = ms*self.down + self.delay
+        q = np.floor(t)
+        return (q // self.up).astype(np.int64), (q % self.up).astype(np.int64), t - q
+
+    def __process(self, x, limit=None): 
+        H = self.K - 1
+        lead = x.shape[:-1]
+        if self.state is None: 
+            self.state = np.zeros(lead + (H,), dtype=np.result_type(x, float))
+        xx = np.concatenate([self.state, x], axis=-1)
+        ninNew = self.nin + x.shape[-1]
+
+        # Outputs whose newest input sample has arrived: n0 <= ninNew - 1. 
+        mEnd = int(np.ceil((ninNew*self.up - self.delay)/float(self.down))) + 1
+        if limit is not None: 
+            mEnd = min(mEnd, limit)
+        ms = np.arange(self.m, max(self.m, mEnd), dtype=np.int64)
+        n0, p, frac = self.__positions(ms)
+        keep = np.searchsorted(n0, ninNew - 1, side="right")
+        ms, n0, p = ms[:keep], n0[:keep], p[:keep]
+
+        if frac is None: 
+            G = self.Hp[p]
+        else: 
+            frac = frac[:keep, None]
+            G = self.Hp[p]*(1.0 - frac) + self.Hp[p + 1]*frac
+        base = n0 - (self.nin - H)
+        y = np.zeros(lead + (len(ms),), dtype=np.result_type(xx, float))
+        for j in range(self.K): 
+            y += G[:, j] * xx[..., base - j]
+
+        if len(ms): 
+            self.m = int(ms[-1]) + 1
+        self.nin   = ninNew
+        self.state = xx[..., xx.shape[-1] - H:].copy()
+        return y
+
+    @_timed("Resampler.filter")
+    def filter(self, x): 
+        """ 
+        Resample the next block of samples. Returns the same type as the input. 
+        """
+        x, like = _asBlock(x)
+        y = self.__process(x)
+        if like is None: 
+            return y
+        return signal.fromArray(y, Fs=like.Fs*float(self.ratio), like=like)
+
+    def flush(self): 
+        """ 
+        Emit the outputs still held back by the filter delay and reset the stream. 
+        In total ceil(inputs*ratio) samples are produced per channel. 
+        """
+        if self.state is None: 
+            return np.zeros(0)
+        if self.rational: 
+            total = -(-self.nin*self.up // self.down)
+        else: 
+            total = int(np.ceil(self.nin*self.up/float(self.down)))
+        pad = np.zeros(self.state.shape[:-1] + (self.delay//self.up + 2,), dtype=self.state.dtype)
+        y = self.__process(pad, limit=total)
+        self.reset()
+        return y
+
+
+def resample(x, new_Fs=None, Fs=None, up=None, down=None, **kwargs): 
+    """ 
+    Resample a signal or ndarray (last axis is time) in one shot. 
+
+    Parameters: 
+    -----------
+    x : signal or numpy.ndarray 
+
+    new_Fs : float 
+        Target sampling frequency (with 'Fs', or the signal's Fs). 
+
+    up, down : int 
+        Rational rate change, instead of 'new_Fs'. 
+
+    **kwargs : Resampler keyword arguments. 
+
+    Return: 
+    -------
+      ret : Same type as 'x'. Signals get consistent 'Fs', 'Ts', 'N', 'Ns' and 'nTs'. 
+    """
+    func = "resample"
+
+    x, like = _asBlock(x)
+    if new_Fs is not None: 
+        if Fs is None: 
+            if like is None: 
+                raise ValueError("ERROR: (%s): 'Fs' is required to resample an ndarray to 'new_Fs'."%(func))
+            Fs = like.Fs
+        rs = Resampler(ratio=float(new_Fs)/float(Fs), **kwargs)
+    else: 
+        rs = Resampler(up=up, down=down, **kwargs)
+    y = np.concatenate([rs.filter(x), rs.flush()], axis=-1)
+    if like is None: 
+        return y
+    return signal.fromArray(y, Fs=like.Fs*float(rs.ratio) if new_Fs is None else new_Fs, like=like)
+
+
+def decimate(x, q, **kwargs): 
+    """ 
+    Low-pass filter and keep every q-th sample (polyphase; see resample). 
+    """
+    return resample(x, up=1, down=int(q), **kwargs)
+
+
+def interpolate(x, p, **kwargs): 
+    """ 
+    Increase the sampling rate by the integer factor p (polyphase; see resample). 
+    """
+    return resample(x, up=int(p), down=1, **kwargs)
+
+
+# Complex baseband:
+# =================
+
+def hilbert(x, n=None): 
+    """ 
+    Analytic signal x + j*H{x} of a real signal or ndarray (last axis is time), 
+    computed with one FFT: the negative frequencies are zeroed and the positive 
+    ones doubled. 
+
+    Parameters: 
+    -----------
+    x : signal or numpy.ndarray 
+        Real samples. Leading axes are channels (a stack is transformed in one call). 
+
+    n : int, optional, default: N 
+        FFT length (the input is zero-padded or truncated). 
+
+    Return: 
+    -------
+      ret : Complex samples, same type as 'x'. 
+
+    NOTE: The FFT treats the block as periodic; use Analytic for chunked streams. 
+    """
+    func = "hilbert"
+
+    x, like = _asBlock(x)
+    if not np.isrealobj(x): 
+        raise ValueError("ERROR: (%s): The Hilbert transform requires real-valued samples."%(func))
+    if n is None: 
+        n = x.shape[-1]
+    n = int(n)
+    # Note: The one-sided spectrum (rfft) is all that is needed; it is weighted in place.
+    X = np.fft.rfft(x, n, axis=-1)
+    X[..., 1:(n + 1)//2] *= 2.0
+    Z = np.zeros(x.shape[:-1] + (n,), dtype=X.dtype)
+    Z[..., :X.shape[-1]] = X
+    z = np.fft.ifft(Z, n, axis=-1)
+    return _asOutput(z, like)
+
+def _analytic(x): 
+    """ 
+    Complex samples of 'x' (analytic signal of real input) and the source signal. 
+    """
+    x, like = _asBlock(x)
+    if np.isrealobj(x): 
+        return hilbert(x), like
+    return x, like
+
+def envelope(x): 
+    """ 
+    Instantaneous amplitude |x + j*H{x}| (real input) or |x| (complex input). 
+    Returns the same type as 'x'. 
+    """
+    z, like = _analytic(x)
+    return _asOutput(np.abs(z), like)
+
+def instPhase(x, unwrap=True): 
+    """ 
+    Instantaneous phase (radians) of the analytic signal of 'x' (or of complex 'x'), 
+    unwrapped along time unless unwrap=False. Returns the same type as 'x'. 
+    """
+    z, like = _analytic(x)
+    phi = np.angle(z)
+    if unwrap: 
+        phi = np.unwrap(phi, axis=-1)
+    return _asOutput(phi, like)
+
+def instFreq(x, Fs=None): 
+    """ 
+    Instantaneous frequency (Hz; cycles/sample without 'Fs') between adjacent samples, 
+    from the phase of z[n]*conj(z[n-1]) (no unwrapping needed). N-1 values per channel. 
+    """
+    func = "instFreq"
+
+    z, like = _analytic(x)
+    if Fs is None: 
+        Fs = like.Fs if like is not None else 1.0
+    f = np.angle(z[..., 1:]*np.conj(z[..., :-1])) * (float(Fs)/(2*np.pi))
+    return _asOutput(f, like)
+
+
+def hilbertTaps(numtaps=65, window="hamming"): 
+    """ 
+    Design a type-III FIR Hilbert transformer (odd 'numtaps'). Every other tap is zero. 
+
+    Return: 
+    -------
+      taps : numpy.ndarray, h[k] = 2/(pi*(k-c)) for odd k-c, c = (numtaps-1)/2, times the window. 
+    """
+    func = "hilbertTaps"
+
+    numtaps = int(numtaps)
+    if numtaps < 3 or numtaps % 2 == 0: 
+        raise ValueError("ERROR: (%s): 'numtaps' must be an odd integer >= 3."%(func))
+    k = np.arange(numtaps) - (numtaps - 1)//2
+    h = np.zeros(numtaps)
+    odd = (k % 2) != 0
+    h[odd] = 2.0/(np.pi*k[odd])
+    return h * getWindow(window, numtaps)
+
+
+class Analytic(object): 
+    """ 
+    Streaming analytic signal: x[n-D] + j*H{x}[n-D], D = (numtaps-1)/2, with an FIR 
+    Hilbert transformer (see hilbertTaps) and persistent state, so chunked streams 
+    and channel stacks give the same result as one long block. 
+
+    The output lags the input by 'delay' = D samples. The band edges (below about 
+    2*Fs/numtaps and above Fs/2 minus that) are not fully suppressed; longer filters 
+    narrow them. 
+
+    Parameters: 
+    -----------
+    numtaps : int, default: 65 
+        Odd Hilbert transformer length. 
+
+    window : str, default: "hamming" 
+        Design window (see getWindow). 
+
+    method : str, default: "auto" 
+        FIR convolution method (see FIR). 
+    """
+    def __init__(self, numtaps=65, window="hamming", method="auto", debug=False): 
+        h = hilbertTaps(numtaps, window)
+        self.delay = (len(h) - 1)//2
+        taps = 1j*h
+        taps[self.delay] = 1.0 # Note: The real part is the input delayed to match the transformer.
+        self.taps  = taps
+        self.debug = debug
+        self._fir  = FIR(taps, method=method, debug=debug)
+
+    def reset(self): 
+        """ 
+        Clear the filter state (start a new stream). 
+        """
+        self._fir.reset()
+
+    @_timed("Analytic.filter")
+    def filter(self, x): 
+        """ 
+        Analytic signal of the next block of real samples. Returns the same type as the input. 
+        """
+        return self._fir.filter(x)
+
+
+class DDC(object): 
+    """ 
+    Streaming digital downconverter: mixing by an NCO at -Fc, low-pass filtering and 
+    decimation by q fused into a single block-wise pass. 
+
+    Every block is mixed straight into a reusable working buffer behind the filter 
+    history, and only every q-th filter output is computed (polyphase, M/q 
+    multiply-adds per input sample). The working set is 'chunk' samples per channel, 
+    so the mixed samples stay in cache and no full-length intermediate is allocated. 
+    The state (oscillator phase, filter history, decimation phase) persists between 
+    calls, so a stream filtered block-by-block matches one long block exactly. 
+
+    Output sample m is the filter output at input sample m*q; the low-pass filter 
+    delays the baseband by (len(taps)-1)/2 input samples. 
+
+    Parameters: 
+    -----------
+    Fc : float or array_like 
+        Center frequency moved to 0 Hz. An array gives one DDC per channel: a single 
+        stream (shape (N,)) is then downconverted to every Fc at once, a stack 
+        (shape (channels, N)) channel by channel. 
+
+    Fs : float 
+        Input sampling frequency. 
+
+    q : int 
+        Decimation factor; the output rate is Fs/q. 
+
+    taps : array_like, optional 
+        Low-pass filter. Default: firwin(2*halflen*q + 1, bandwidth/2, Fs). 
+
+    bandwidth : float, optional, default: Fs/q 
+        Two-sided bandwidth kept around Fc (default filter only). 
+
+    halflen : int, default: 8 
+        Half length of the default filter in output samples. 
+
+    window : str, default: "hamming" 
+        Default filter design window. 
+
+    method : str, default: "lut" 
+        NCO method for a scalar Fc (see NCO). Per-channel Fc arrays use exact phasors. 
+
+    chunk : int, optional 
+        Input samples per channel per pass (default: about 64k samples over all channels). 
+
+    Useage example:
+    ---------------
+      >> ddc = DSP.DDC(Fc=[1e6, 2e6, 3e6], Fs=20e6, q=16)
+      >> for block in source: 
+      >>     bb = ddc.filter(block)        # (3, len(block)/16) complex baseband at 1.25 MHz
+    """
+    def __init__(self, Fc, Fs, q, taps=None, bandwidth=None, halflen=8, window="hamming", method="lut", chunk=None, debug=False): 
+        func = "DDC.__init__"
+
+        self.Fs = SItoString(Fs)
+        self.q  = int(q)
+        if self.q < 1: 
+            raise ValueError("ERROR: (%s): Arguement (%s) must be a positive integer."%(func, "q"))
+        Fc = np.asarray(Fc, dtype=float)
+        if Fc.ndim > 1: 
+            raise ValueError("ERROR: (%s): 'Fc' must be a scalar or 1-D array."%(func))
+        self.Fc = Fc
+        if taps is None: 
+            bandwidth = self.Fs/self.q if bandwidth is None else SItoString(bandwidth)
+            if bandwidth >= self.Fs: 
+                taps = np.ones(1)
+            else: 
+                taps = firwin(2*int(halflen)*self.q + 1, bandwidth/2.0, Fs=self.Fs, window=window)
+        self.taps = np.asarray(taps)
+        if self.taps.ndim != 1 or len(self.taps) == 0: 
+            raise ValueError("ERROR: (%s): 'taps' must be a non-empty 1-D array."%(func))
+        self._rtaps = self.taps[::-1].copy()
+        self.method = method
+        self.chunk  = chunk
+        self.debug  = debug
+        self.w      = -2*np.pi*self.Fc/self.Fs # Note: Oscillator phase increment per sample (radians).
+        self.reset()
+
+    def reset(self): 
+        """ 
+        Restart the oscillator and clear the filter state (start a new stream). 
+        """
+        self._nco  = NCO(Fo=-float(self.Fc), Fs=self.Fs, method=self.method) if self.Fc.ndim == 0 else None
+        self._phi  = np.zeros(self.Fc.shape)
+        self._ramp = None
+        self._buf  = None # Note: (..., M-1 + chunk) working buffer; its head holds the filter history.
+        self._skip = 0    # Note: Input samples until the next output sample.
+        self.nin   = 0
+
+    def __oscillator(self, n, out): 
+        """ 
+        Next n oscillator samples into 'out' (shape (n,) or (channels, n)). 
+        """
+        if self._nco is not None: 
+            return self._nco.generate(n, part="complex", out=out)
+        # Note: Per-channel ramps exp(j*w*k) are computed once; each block is the ramp 
+        #       rotated by the exactly tracked start phase (one complex multiply per sample).
+        if self._ramp is None or self._ramp.shape[-1] < n: 
+            self._ramp = np.exp(1j*np.multiply.outer(self.w, _axis(max(n, out.shape[-1]))))
+        np.multiply(self._ramp[:, :n], np.exp(1j*self._phi)[:, None], out=out)
+        self._phi = (self._phi + self.w*n) % (2*np.pi)
+        return out
+
+    @_timed("DDC.filter")
+    def filter(self, x): 
+        """ 
+        Downconvert the next block of samples. Returns the same type as the input 
+        (signals at Fs/q). 
+        """
+        func = "DDC.filter"
+
+        x, like = _asBlock(x)
+        M, q = len(self.taps), self.q
+        L = x.shape[-1]
+        lead = x.shape[:-1]
+        if self.Fc.ndim: 
+            if lead not in ((), self.Fc.shape): 
+                raise ValueError("ERROR: (%s): Input shape %s does not match %d channels."%(func, str(x.shape), len(self.Fc)))
+            lead = self.Fc.shape
+        dtype = np.result_type(x.dtype, np.complex64)
+        chunk = self.chunk or max(M, (1 << 18)//max(1, int(np.prod(lead))))
+        if self._buf is None: 
+            self._buf = np.zeros(lead + (M - 1 + chunk,), dtype=dtype)
+        elif self._buf.shape[:-1] != lead: 
+            raise ValueError("ERROR: (%s): Channel shape %s does not match the DDC state %s."%(func, str(lead), str(self._buf.shape[:-1])))
+        buf = self._buf
+        chunk = buf.shape[-1] - (M - 1)
+        lo  = np.empty(self.Fc.shape + (chunk,), dtype=complex if self._nco is not None else buf.dtype)
+
+        total = max(0, -(-(L - self._skip) // q))
+        y   = np.empty(lead + (total,), dtype=buf.dtype)
+        real = np.isrealobj(self.taps)
+        if real: 
+            rtaps = self._rtaps.astype(buf.real.dtype)
+            bufIQ = buf.view(rtaps.dtype).reshape(buf.shape + (2,))
+            yIQ   = y.view(rtaps.dtype).reshape(y.shape + (2,))
+        else: 
+            rtaps = self._rtaps.astype(buf.dtype)
+        if self.debug: PROFILER.event(func, True, L=L, channels=int(np.prod(lead)), taps=M, q=q, chunk=chunk)
+        done = 0
+        for start in range(0, L, chunk): 
+            n = min(chunk, L - start)
+            mixed = buf[..., M - 1:M - 1 + n]
+            np.multiply(x[..., start:start + n], self.__oscillator(n, lo[..., :n]), out=mixed)
+            # Note: Outputs at buffer positions i0, i0+q, ... < M-1+n; tap j reads the strided slice j samples back.
+            i0  = M - 1 + self._skip
+            cnt = max(0, -(-(M - 1 + n - i0) // q))
+            if cnt and real: 
+                # Note: Zero-copy (..., cnt, I/Q, M) view of the samples under every output, so a 
+                #       real filter is a single real matmul over both parts of all outputs.
+                s = bufIQ.strides
+                frames = np.lib.stride_tricks.as_strided(bufIQ[..., i0 - (M - 1):, :], shape=lead + (cnt, 2, M), 
+                                                         strides=s[:-2] + (s[-2]*q, s[-1], s[-2]), writeable=False)
+                np.matmul(frames, rtaps, out=yIQ[..., done:done + cnt, :])
+            elif cnt: 
+                frames = np.lib.stride_tricks.sliding_window_view(buf[..., :i0 + (cnt - 1)*q + 1], M, axis=-1)
+                np.matmul(frames[..., i0 - (M - 1)::q, :], rtaps, out=y[..., done:done + cnt])
+            done += cnt
+            self._skip = i0 + cnt*q - (M - 1 + n)
+            buf[..., :M - 1] = buf[..., n:n + M - 1] # Note: Keep the last M-1 mixed samples as history.
+        self.nin += L
+        if like is None: 
+            return y
+        return signal.fromArray(y, Fs=like.Fs/float(q), like=like)
+
+
+def ddc(x, Fc, q, Fs=None, **kwargs): 
+    """ 
+    Downconvert a signal or ndarray (last axis is time) in one shot: mix by -Fc, 
+    low-pass filter and decimate by q. See DDC for keyword arguments. 
+
+    Return: 
+    -------
+      ret : Complex baseband at Fs/q, same type as 'x'. 
+    """
+    func = "ddc"
+
+    if Fs is None: 
+        if not isinstance(x, signal): 
+            raise ValueError("ERROR: (%s): 'Fs' is required to downconvert an ndarray."%(func))
+        Fs = x.Fs
+    return DDC(Fc, Fs, q, **kwargs).filter(x)
+
+
+# Channelizer:
+# ============
+
+def _polyphaseTaps(taps, M): 
+    """ 
+    Zero-pad a prototype filter to a whole number of M-sample branches. 
+    """
+    taps = np.asarray(taps, dtype=float)
+    P = -(-len(taps) // M)
+    out = np.zeros(P*M)
+    out[:len(taps)] = taps
+    return out
+
+
+class Channelizer(object): 
+    """ 
+    Streaming polyphase FFT analysis filter bank: splits a stream into M uniformly 
+    spaced subbands centered on k*Fs/M (k = 0..M-1; see Channelizer.centers), each 
+    decimated by D = M/oversample. 
+
+    Channel k is exactly the output of DDC(Fc=k*Fs/M, q=D, taps=prototype): mixed 
+    to baseband, low-pass filtered and decimated. Instead of M filters, every output 
+    sample block costs one pass of the prototype over the newest len(taps) inputs 
+    (folded into M polyphase branches) and one M-point FFT. The filter history, the 
+    decimation phase and the FFT rotation carry across streamed blocks. 
+
+    Parameters: 
+    -----------
+    M : int 
+        Number of channels. 
+
+    oversample : int, default: 1 
+        1: critically sampled (D = M, every channel at Fs/M). 2 (or any divisor of M): 
+        channels at oversample*Fs/M, which keeps the band edges free of aliasing and 
+        lets Synthesizer reconstruct the input. 
+
+    taps : array_like, optional 
+        Low-pass prototype. Default: firwin(2*halflen*M + 1, Fs/(2*M), Fs). 
+
+    halflen : int, default: 8 
+        Half length of the default prototype in branches (taps per branch ~ 2*halflen). 
+
+    window : str, default: "hamming" 
+        Default prototype design window. 
+
+    Fs : float, optional 
+        Input sampling frequency (metadata of ndarray inputs; signals carry their own). 
+
+    Input may be a signal or an ndarray whose last axis is time; the output adds a 
+    channel axis before time: (..., M, N/D). A 1-D signal gives a SignalBank whose 
+    channels carry their center frequency as 'Fo' and Fs/D as 'Fs'. 
+
+    Useage example:
+    ---------------
+      >> ch = DSP.Channelizer(64, oversample=2)
+      >> bank = ch.filter(x)          # x: signal at Fs -> 64 subbands at Fs/32
+      >> bank[5].Fo, bank[5].Fs        -> 5*Fs/64, Fs/32
+      >> y = ch.synthesizer().filter(bank)  # ~ x delayed by ch.delay + synthesizer.delay
+    """
+    def __init__(self, M, oversample=1, taps=None, halflen=8, window="hamming", Fs=None, debug=False): 
+        func = "Channelizer.__init__"
+
+        self.M = int(M)
+        oversample = int(oversample)
+        if self.M < 2: 
+            raise ValueError("ERROR: (%s): Arguement (%s) must be an integer >= 2."%(func, "M"))
+        if oversample < 1 or self.M % oversample: 
+            raise ValueError("ERROR: (%s): 'oversample' must be a positive divisor of M = %d."%(func, self.M))
+        self.oversample = oversample
+        self.D = self.M // oversample
+        if taps is None: 
+            taps = firwin(2*int(halflen)*self.M + 1, 0.5/self.M, Fs=1.0, window=window)
+        self.prototype = np.asarray(taps, dtype=float)
+        self.delay = (len(self.prototype) - 1)/2.0 # Note: Group delay in input samples (linear phase prototype).
+        self.taps  = _polyphaseTaps(self.prototype, self.M)
+        self.P     = len(self.taps) // self.M
+        # Note: Branch matrix of the time-reversed prototype, matching the (P, M) windows of the input.
+        self._branches = self.taps[::-1].reshape(self.P, self.M).copy()
+        self.Fs    = None if Fs is None else SItoString(Fs)
+        self.debug = debug
+        self.reset()
+
+    def reset(self): 
+        """ 
+        Clear the filter state (start a new stream). 
+        """
+        self.state = None # Note: Last len(taps)-1 input samples of every channel.
+        self._skip = 0    # Note: Input samples until the next output block.
+        self.m     = 0    # Note: Index of the next output block.
+
+    def centers(self, Fs=None): 
+        """ 
+        Center frequency of every channel: k*Fs/M, channels above M/2 as negative frequencies. 
+        """
+        Fs = self.Fs if Fs is None else Fs
+        return np.fft.fftfreq(self.M, 1.0/(1.0 if Fs is None else Fs))
+
+    def synthesizer(self, **kwargs): 
+        """ 
+        Return the matching Synthesizer (same M and oversampling). 
+        """
+        return Synthesizer(self.M, oversample=self.oversample, halflen=(self.P - 1)//2 if self.P > 1 else 1, **kwargs)
+
+    @_timed("Channelizer.filter")
+    def filter(self, x): 
+        """ 
+        Split the next block of samples into subbands. Returns an ndarray of shape 
+        (..., M, outputs), or a SignalBank for a 1-D signal input. 
+        """
+        func = "Channelizer.filter"
+
+        x, like = _asBlock(x)
+        M, D = self.M, self.D
+        L = len(self.taps)
+        lead = x.shape[:-1]
+        if self.state is None: 
+            self.state = np.zeros(lead + (L - 1,), dtype=np.result_type(x, float))
+        elif self.state.shape[:-1] != lead: 
+            raise ValueError("ERROR: (%s): Channel shape %s does not match the filter state %s."%(func, str(lead), str(self.state.shape[:-1])))
+        xx = np.concatenate([self.state, x], axis=-1)
+        n  = x.shape[-1]
+        K  = max(0, -(-(n - self._skip) // D))
+        if self.debug: PROFILER.event(func, True, L=n, channels=M, decimation=D, blocks=K)
+
+        if K: 
+            # Note: Window of the newest L inputs of every output block, zero-copy, split into 
+            #       P branches of M samples; weighting and folding is a single einsum.
+            i0 = self._skip # Note: xx[..., i0:i0+L] ends at the first output's input sample.
+            frames = np.lib.stride_tricks.sliding_window_view(xx[..., i0:i0 + (K - 1)*D + L], L, axis=-1)[..., ::D, :]
+            frames = frames.reshape(lead + (K, self.P, M))
+            V = np.einsum("...kpr,pr->...kr", frames, self._branches)
+            # Note: v[r] = V[M-1-r]; block m is rotated by (m*D) mod M before the FFT so the 
+            #       mixing phase refers to absolute input time.
+            s = ((self.m + np.arange(K))*D) % M
+            idx = (M - 1) - (np.arange(M)[None, :] + s[:, None]) % M
+            Z = np.take_along_axis(V, np.broadcast_to(idx, V.shape[:-2] + idx.shape), axis=-1)
+            Y = np.fft.ifft(Z, axis=-1, norm="forward")
+            y = np.ascontiguousarray(np.swapaxes(Y, -1, -2))
+        else: 
+            y = np.zeros(lead + (M, 0), dtype=complex)
+        self._skip = self._skip + K*D - n
+        self.m    += K
+        self.state = xx[..., xx.shape[-1] - (L - 1):].copy()
+
+        if like is None: 
+            return y
+        if y.ndim != 2: 
+            return y
+        return SignalBank.fromArray(y, Fo=self.centers(like.Fs), Fs=like.Fs/float(D), debug=self.debug)
+
+
+class Synthesizer(object): 
+    """ 
+    Streaming polyphase FFT synthesis filter bank, the inverse of Channelizer: every 
+    block of M subband samples is one M-point FFT, then the interpolation filter 
+    (folded into polyphase branches) overlap-adds D = M/oversample output samples 
+    per block. The overlap tail and the FFT rotation carry across streamed blocks. 
+
+    With oversample >= 2 and the default filters the bank reconstructs the input 
+    of the matching Channelizer up to a delay (Channelizer.delay + Synthesizer.delay) 
+    and a small ripple (rms error ~3e-3 of the input for the default halflen=8). A critically sampled bank (oversample=1) 
+    is not alias-free: expect distortion near the channel edges. 
+
+    Parameters: 
+    -----------
+    M : int 
+        Number of channels. 
+
+    oversample : int, default: 1 
+        As in Channelizer. 
+
+    taps : array_like, optional 
+        Interpolation filter. Default: D*firwin(2*halflen*M + 1, Fs/(2*D), Fs) 
+        (D*Channelizer's prototype when critically sampled). 
+
+    halflen, window : See Channelizer. 
+
+    Input is an ndarray (..., M, blocks) or a SignalBank from Channelizer; the output 
+    is complex (..., blocks*D) samples (a signal at D times the channel rate for a SignalBank). 
+    """
+    def __init__(self, M, oversample=1, taps=None, halflen=8, window="hamming", debug=False): 
+        func = "Synthesizer.__init__"
+
+        self.M = int(M)
+        oversample = int(oversample)
+        if self.M < 2: 
+            raise ValueError("ERROR: (%s): Arguement (%s) must be an integer >= 2."%(func, "M"))
+        if oversample < 1 or self.M % oversample: 
+            raise ValueError("ERROR: (%s): 'oversample' must be a positive divisor of M = %d."%(func, self.M))
+        self.oversample = oversample
+        self.D = self.M // oversample
+        if taps is None: 
+            if self.D == 1: 
+                taps = np.ones(1)
+            else: 
+                taps = self.D*firwin(2*int(halflen)*self.M + 1, 0.5/self.D, Fs=1.0, window=window)
+        self.prototype = np.asarray(taps, dtype=float)
+        self.delay = (len(self.prototype) - 1)/2.0
+        self.taps  = _polyphaseTaps(self.prototype, self.M)
+        self.J     = len(self.taps) // self.D # Note: Output blocks touched by one input block.
+        self._branches = self.taps.reshape(self.J, self.D)
+        self.debug = debug
+        self.reset()
+
+    def reset(self): 
+        """ 
+        Clear the overlap tail (start a new stream). 
+        """
+        self.tail = None # Note: (..., J-1, D) partial sums of the next output blocks.
+        self.m    = 0    # Note: Index of the next input block.
+
+    @_timed("Synthesizer.filter")
+    def filter(self, y): 
+        """ 
+        Reconstruct the next blocks of subband samples. 
+        """
+        func = "Synthesizer.filter"
+
+        bank = y if isinstance(y, SignalBank) else None
+        y = np.asarray(y.getTime() if bank is not None else y)
+        M, D, J = self.M, self.D, self.J
+        if y.ndim < 2 or y.shape[-2] != M: 
+            raise ValueError("ERROR: (%s): Input must have shape (..., %d, blocks), got %s."%(func, M, str(y.shape)))
+        lead, K = y.shape[:-2], y.shape[-1]
+        if self.tail is None: 
+            self.tail = np.zeros(lead + (J - 1, D), dtype=complex)
+        elif self.tail.shape[:-2] != lead: 
+            raise ValueError("ERROR: (%s): Channel shape %s does not match the synthesis state %s."%(func, str(lead), str(self.tail.shape[:-2])))
+        if self.debug: PROFILER.event(func, True, blocks=K, channels=M, interpolation=D)
+
+        # Note: w_m[r] = sum_k y_k[m] exp(j*2*pi*k*r/M), periodic in r with period M, as O = M/D 
+        #       runs of D samples; output block b = m + j takes run (b mod O) of w_m times branch j.
+        W = np.fft.ifft(np.swapaxes(y, -1, -2), axis=-1, norm="forward")
+        W = W.reshape(lead + (K, M // D, D))
+        out = np.zeros(lead + (K + J - 1, D), dtype=complex)
+        out[..., :J - 1, :] = self.tail
+        ms = self.m + np.arange(K)
+        rows = np.arange(K)
+        for j in range(J): 
+            runs = W[..., rows, (ms + j) % (M // D), :]
+            out[..., j:j + K, :] += runs * self._branches[j]
+        self.tail = out[..., K:, :].copy()
+        self.m   += K
+        x = out[..., :K, :].reshape(lead + (K*D,))
+
+        if bank is None: 
+            return x
+        return signal.fromArray(x, Fs=bank.Fs*D)
+
+
+def channelize(x, M, oversample=1, Fs=None, **kwargs): 
+    """ 
+    Split a signal or ndarray (last axis is time) into M subbands in one shot. 
+    See Channelizer for keyword arguments. 
+    """
+    return Channelizer(M, oversample=oversample, Fs=Fs, **kwargs).filter(x)
+
+
+# Spectral estimation:
+# ====================
+
+_WINDOW_CACHE = {}
+
+def getWindow(window, n, sym=True):
+    """ 
+    Return a (cached, read-only) window of length n. 
+
+    Parameters: 
+    -----------
+    window : str or array_like 
+        Options: "hamming", "hann", "blackman", "rect". An array of length n is returned as-is. 
+
+    n : int 
+        Window length. 
+
+    sym : bool, default: True
+        Symmetric window (filter design). Use False for the periodic window used in spectral analysis. 
+    """
+    func = "getWindow"
+
+    if not isinstance(window, str): 
+        w = np.asarray(window, dtype=float)
+        if w.shape != (n,): 
+            raise ValueError("ERROR: (%s): Window array must have length %d."%(func, n))
+        return w
+    key = (window, int(n), bool(sym))
+    if key not in _WINDOW_CACHE: 
+        windows = {"hamming" : np.hamming, "hann" : np.hanning, "blackman" : np.blackman, "rect" : np.ones}
+        if window not in windows: 
+            raise ValueError("ERROR: (%s): Arguement (%s) only takes the following options = %s"%(func,"window",str(list(windows.keys()))))
+        w = windows[window](int(n)) if sym else windows[window](int(n) + 1)[:-1]
+        w.flags.writeable = False
+        _WINDOW_CACHE[key] = w
+    return _WINDOW_CACHE[key]
+
+
+def _frames(x, nperseg, step):
+    """ 
+    Zero-copy (..., frames, nperseg) view of x (last axis) with hop 'step'. 
+    """
+    return np.lib.stride_tricks.sliding_window_view(x, nperseg, axis=-1)[..., ::step, :]
+
+
+def _medianBias(n):
+    """ 
+    Bias of the median of n chi-square(2) periodogram estimates relative to their mean. 
+    """
+    k = np.arange(1, (n - 1)//2 + 1)
+    return 1.0 + np.sum(1.0/(2*k + 1) - 1.0/(2*k))
+
+
+class Welch(object):
+    """ 
+    Incremental Welch power spectral density estimator. 
+
+    Samples are fed with Welch.update() in blocks of any size (e.g. from signal.stream() 
+    or a memory-mapped capture); the frames that straddle block boundaries are carried 
+    over, so the result equals a one-shot Welch estimate over the concatenated input. 
+    Frames are built zero-copy with stride tricks and transformed with one batched FFT 
+    per group of frames. Memory use is O(nperseg * batch). 
+
+    Parameters: 
+    -----------
+    Fs : float, default: 1.0 
+        Sampling frequency. 
+
+    nperseg : int, default: 256 
+        Frame length. 
+
+    noverlap : int, default: nperseg//2 
+        Overlap between frames. 
+
+    window : str or array_like, default: "hann" 
+        Window (see getWindow). 
+
+    nfft : int, default: nperseg 
+        FFT length (frames are zero-padded). 
+
+    detrend : bool, default: True 
+        Remove the mean of every frame. 
+
+    batch : int, optional 
+        Frames transformed per FFT call (default: about 1M samples worth). 
+
+    Useage example: 
+    ---------------
+      >> est = DSP.Welch(Fs=x.Fs, nperseg=1024) 
+      >> for block in x.stream(chunk=65536): 
+      >>     est.update(block) 
+      >> freqs, Pxx = est.result() 
+    """
+    def __init__(self, Fs=1.0, nperseg=256, noverlap=None, window="hann", nfft=None, detrend=True, batch=None, debug=False):
+        func = "Welch.__init__"
+
+        self.Fs       = float(Fs)
+        self.nperseg  = int(nperseg)
+        self.noverlap = self.nperseg//2 if noverlap is None else int(noverlap)
+        if not (0 <= self.noverlap < self.nperseg): 
+            raise ValueError("ERROR: (%s): 'noverlap' must satisfy 0 <= noverlap < nperseg."%(func))
+        self.step     = self.nperseg - self.noverlap
+        self.nfft     = self.nperseg if nfft is None else int(nfft)
+        self.window   = getWindow(window, self.nperseg, sym=False)
+        self.detrend  = detrend
+        self.batch    = batch if batch else max(1, (1 << 20)//self.nfft)
+        self.debug    = debug
+        self.reset()
+
+    def reset(self): 
+        """ 
+        Clear the accumulated estimate and carried samples. 
+        """
+        self._tail   = None # Note: Samples not yet consumed by a complete frame.
+        self._sum    = None # Note: Sum of the periodograms of all frames. 
+        self._real   = True
+        self.nframes = 0
+
+    def periodograms(self, frames, real=True): 
+        """ 
+        Density-scaled periodograms of a (..., frames, nperseg) frame matrix. 
+        """
+        buf = np.multiply(frames, self.window)
+        if self.detrend: 
+            buf -= frames.mean(axis=-1, keepdims=True) * self.window
+        if real: 
+            X = np.fft.rfft(buf, self.nfft, axis=-1)
+        else: 
+            X = np.fft.fft(buf, self.nfft, axis=-1)
+        P = X.real**2
+        P += X.imag**2
+        P *= 1.0/(self.Fs*np.sum(self.window**2))
+        if real: 
+            # One-sided: fold the energy of the negative frequencies (not DC / Nyquist). 
+            P[..., 1:(self.nfft + 1)//2] *= 2.0
+        return P
+
+    @_timed("Welch.update")
+    def update(self, x): 
+        """ 
+        Accumulate the next block of samples (signal or ndarray, last axis is time). 
+        """
+        func = "Welch.update"
+
+        x, like = _asBlock(x)
+        if self._tail is None: 
+            self._real = np.isrealobj(x)
+            self._tail = np.zeros(x.shape[:-1] + (0,), dtype=x.dtype)
+        elif self._tail.shape[:-1] != x.shape[:-1]: 
+            raise ValueError("ERROR: (%s): Channel shape %s does not match earlier blocks %s."%(func, str(x.shape[:-1]), str(self._tail.shape[:-1])))
+        elif self._real and not np.isrealobj(x): 
+            raise ValueError("ERROR: (%s): Cannot mix real and complex blocks."%(func))
+
+        xx = np.concatenate([self._tail, x], axis=-1) if self._tail.shape[-1] else x
+        n  = xx.shape[-1]
+        k  = (n - self.nperseg)//self.step + 1 if n >= self.nperseg else 0
+        if k: 
+            frames = _frames(xx, self.nperseg, self.step)
+            for start in range(0, k, self.batch): 
+                P = self.periodograms(frames[..., start:min(k, start + self.batch), :], real=self._real).sum(axis=-2)
+                self._sum = P if self._sum is None else self._sum + P
+            self.nframes += k
+        self._tail = xx[..., k*self.step:].copy()
+        if self.debug: PROFILER.event(func, True, block=x.shape[-1], frames=k, total=self.nframes)
+        return self
+
+    def freqs(self): 
+        """ 
+        Frequency axis (Hz) of the estimate. 
+        """
+        if self._real: 
+            return np.fft.rfftfreq(self.nfft, d=1.0/self.Fs)
+        return np.fft.fftfreq(self.nfft, d=1.0/self.Fs)
+
+    def result(self): 
+        """ 
+        Return (freqs, Pxx), the mean periodogram of all frames seen so far (units^2/Hz). 
+        """
+        func = "Welch.result"
+
+        if not self.nframes: 
+            raise RuntimeError("ERROR: (%s): Not enough samples for a single frame of %d."%(func, self.nperseg))
+        return self.freqs(), self._sum / self.nframes
+
+
+def stft(x, Fs=None, nperseg=256, noverlap=None, window="hann", nfft=None, detrend=False):
+    """ 
+    Short-time Fourier transform of a signal or ndarray (last axis is time). 
+
+    Frames are built zero-copy with stride tricks, windowed and transformed with one 
+    batched FFT (rfft for real input). Only frames that lie fully inside the input are used. 
+    Parameters are as for Welch. 
+
+    Return: 
+    -------
+      (freqs, times, Z) : Z has shape (..., frames, freqs) and is scaled by 1/sum(window), 
+                          so a tone of amplitude A shows up with magnitude A/2. 
+                          'times' are the frame centers in seconds. 
+    """
+    func = "stft"
+
+    x, like = _asBlock(x)
+    if Fs is None: 
+        Fs = like.Fs if like is not None else 1.0
+    est = Welch(Fs=Fs, nperseg=nperseg, noverlap=noverlap, window=window, nfft=nfft, detrend=detrend)
+    if x.shape[-1] < est.nperseg: 
+        raise ValueError("ERROR: (%s): Input is shorter than one frame (%d)."%(func, est.nperseg))
+    frames = _frames(x, est.nperseg, est.step)
+    buf = np.multiply(frames, est.window)
+    if detrend: 
+        buf -= frames.mean(axis=-1, keepdims=True) * est.window
+    real = np.isrealobj(x)
+    Z  = np.fft.rfft(buf, est.nfft, axis=-1) if real else np.fft.fft(buf, est.nfft, axis=-1)
+    Z *= 1.0/np.sum(est.window)
+    est._real = real
+    times = (np.arange(frames.shape[-2])*est.step + est.nperseg/2.0)/est.Fs
+    return est.freqs(), times, Z
+
+
+def spectrogram(x, Fs=None, nperseg=256, noverlap=None, window="hann", nfft=None, detrend=True):
+    """ 
+    Spectrogram (per-frame power spectral density, units^2/Hz) of a signal or ndarray. 
+
+    Return: 
+    -------
+      (freqs, times, Sxx) : Sxx has shape (..., frames, freqs). See stft. 
+    """
+    func = "spectrogram"
+
+    x, like = _asBlock(x)
+    if Fs is None: 
+        Fs = like.Fs if like is not None else 1.0
+    est = Welch(Fs=Fs, nperseg=nperseg, noverlap=noverlap, window=window, nfft=nfft, detrend=detrend)
+    if x.shape[-1] < est.nperseg: 
+        raise ValueError("ERROR: (%s): Input is shorter than one frame (%d)."%(func, est.nperseg))
+    est._real = np.isrealobj(x)
+    frames = _frames(x, est.nperseg, est.step)
+    times  = (np.arange(frames.shape[-2])*est.step + est.nperseg/2.0)/est.Fs
+    return est.freqs(), times, est.periodograms(frames, real=est._real)
+
+
+def welch(x, Fs=None, nperseg=256, noverlap=None, window="hann", nfft=None, detrend=True, average="mean"):
+    """ 
+    Welch power spectral density estimate of a signal or ndarray (last axis is time). 
+
+    Parameters are as for Welch; 'average' is "mean" or "median" (bias corrected). 
+
+    Return: 
+    -------
+      (freqs, Pxx) : Pxx in units^2/Hz, one-sided for real input. 
+    """
+    func = "welch"
+
+    if average == "mean": 
+        x, like = _asBlock(x)
+        if Fs is None: 
+            Fs = like.Fs if like is not None else 1.0
+        est = Welch(Fs=Fs, nperseg=nperseg, noverlap=noverlap, window=window, nfft=nfft, detrend=detrend)
+        return est.update(x).result()
+    elif average == "median": 
+        freqs, times, Sxx = spectrogram(x, Fs=Fs, nperseg=nperseg, noverlap=noverlap, window=window, nfft=nfft, detrend=detrend)
+        return freqs, np.median(Sxx, axis=-2) / _medianBias(Sxx.shape[-2])
+    raise ValueError("ERROR: (%s): Arguement (%s) only takes the following options = %s"%(func,"average",str(["mean","median"])))
+
+
+# Tone detection:
+# ===============
+
+class ToneDetector(object):
+    """ 
+    Bank of single-frequency DFT detectors: the value of a handful of DFT bins, 
+    tracked over many channels without computing full FFTs. 
+
+    Methods: 
+      - "goertzel" : Block Goertzel over consecutive, non-overlapping windows of N 
+                     samples. ToneDetector.update() returns the value of every window 
+                     completed by the call; window j equals np.fft.fft(x[j*N:(j+1)*N]) 
+                     at the target bins. 
+      - "sdft"     : Sliding DFT over the last N samples, one output per input sample: 
+                     output n equals np.fft.fft(x[n-N+1:n+1]) at the target bins (the 
+                     window is zero-filled before the first N samples). 
+
+    Both keep their state between calls, so a stream may be fed per sample or per 
+    block of any size. The Goertzel recursion s[n] = x[n] + 2*cos(w)*s[n-1] - s[n-2] 
+    is advanced a whole block at a time from its closed form (Chebyshev polynomials 
+    U_m(cos(w))), so a block of B samples costs two (B x bins) matrix products 
+    instead of B python-level steps. The sliding DFT is recomputed exactly from its 
+    history every N samples, so rounding errors do not accumulate. Target 
+    frequencies need not be integer bins (Fs/N multiples). 
+
+    Parameters: 
+    -----------
+    freqs : float, list of float, signal(s) or SignalBank 
+        Target frequencies (Hz). For signals and banks their 'Fo' is used. 
+
+    Fs : float 
+        Sampling frequency. 
+
+    N : int 
+        Window length (samples). 
+
+    method : str, default: "goertzel" 
+        Options: "goertzel", "sdft". 
+
+    Input blocks are signals or ndarrays whose last axis is time; leading axes are 
+    channels. Outputs have shape (..., bins, outputs). 
+
+    Useage example: 
+    ---------------
+      >> det = DSP.ToneDetector([x1, x2], Fs=48e3, N=480) 
+      >> for block in capture: 
+      >>     X = det.update(block)       # (bins, windows completed) 
+      >>     P = np.abs(X)**2 
+    """
+    methods = ["goertzel", "sdft"]
+
+    def __init__(self, freqs, Fs, N, method="goertzel", debug=False): 
+        func = "ToneDetector.__init__"
+
+        if method not in self.methods: 
+            raise ValueError("ERROR: (%s): Arguement (%s) only takes the following options = %s"%(func,"method",str(self.methods)))
+        if isinstance(freqs, (signal, SignalBank)): 
+            freqs = [freqs]
+        freqs = np.concatenate([np.atleast_1d(f.Fo if isinstance(f, (signal, SignalBank)) else f) for f in freqs]).astype(float)
+        if freqs.ndim != 1 or len(freqs) == 0: 
+            raise ValueError("ERROR: (%s): At least one target frequency is required."%(func))
+        self.freqs  = freqs
+        self.Fs     = float(Fs)
+        self.N      = int(N)
+        self.method = method
+        self.debug  = debug
+        if self.N < 1: 
+            raise ValueError("ERROR: (%s): Arguement (%s) must be a positive integer."%(func, "N"))
+        self.w = 2*np.pi*self.freqs/self.Fs # Note: Radians per sample.
+
+        if method == "goertzel": 
+            # Note: U[m+1] = U_m(cos(w)) = sin((m+1)*w)/sin(w) for m = -1..N (limit m+1 / (-1)**m*(m+1) at w = 0, pi).
+            m = np.arange(-1, self.N + 1)[:, None]
+            s = np.sin(self.w)
+            with np.errstate(divide="ignore", invalid="ignore"): 
+                U = np.sin((m + 1)*self.w) / s
+            edge = np.abs(s) < 1e-12
+            U[:, edge] = (m + 1)*np.cos(m*self.w[edge])
+            self._U = U
+            self._out = np.exp(-1j*self.w), np.exp(-1j*self.w*(self.N - 1))
+        else: 
+            t = np.arange(-self.N, 0)[:, None]
+            self._hist = np.exp(-1j*self.w*t) # Note: Phasors of the history window, relative to the next sample.
+        self._ph = {} # Note: Cache of per-block-length phasors (sdft).
+        self.reset()
+
+    @property
+    def bins(self): 
+        """ 
+        Target frequencies as (fractional) DFT bin indices of an N-point window. 
+        """
+        return self.freqs * self.N / self.Fs
+
+    def reset(self): 
+        """ 
+        Clear the detector state (start a new stream). 
+        """
+        self.state = None # Note: goertzel: (s[n-1], s[n-2]); sdft: (history, running sum).
+        self.pos   = 0    # Note: goertzel: samples into the current window; sdft: samples since the last exact refresh.
+
+    @_timed("ToneDetector.update")
+    def update(self, x): 
+        """ 
+        Feed the next block of samples (a single sample is a block of length 1). 
+
+        Return: 
+        -------
+          X : numpy.ndarray, complex, shape (..., bins, outputs). "goertzel": one output 
+              per window completed by this call (possibly none); "sdft": one per sample. 
+        """
+        func = "ToneDetector.update"
+
+        x, like = _asBlock(x)
+        if like is not None and not np.isclose(like.Fs, self.Fs, rtol=1e-12, atol=0.0): 
+            raise ValueError("ERROR: (%s): Signal sampling frequency %s does not match the detector (%s)."%(func, str(like.Fs), str(self.Fs)))
+        if self.state is not None and self.state[0].shape[:-1] != x.shape[:-1]: 
+            raise ValueError("ERROR: (%s): Channel shape %s does not match the detector state."%(func, str(x.shape[:-1])))
+        if self.method == "goertzel": 
+            return self.__goertzel(x)
+        return self.__sdft(x)
+
+    def __goertzel(self, x): 
+        K, N = len(self.w), self.N
+        if self.state is None: 
+            zero = np.zeros(x.shape[:-1] + (K,), dtype=np.result_type(x, float))
+            self.state = (zero, zero.copy())
+        out = []
+        start, L = 0, x.shape[-1]
+        while start < L: 
+            B = min(L - start, N - self.pos)
+            xb = x[..., start:start + B]
+            U  = self._U
+            s1, s2 = self.state
+            # Note: s[B-1] = U_B*s1 - U_{B-1}*s2 + sum_k U_{B-1-k}*x[k]; s[B-2] likewise (U row m+1 holds U_m).
+            n1 = U[B + 1]*s1 - U[B]*s2 + xb @ U[B:0:-1]
+            n2 = U[B]*s1 - U[B - 1]*s2 + xb @ U[B - 1::-1]
+            self.state = (n1, n2)
+            self.pos += B
+            start += B
+            if self.pos == N: 
+                # Note: X = (s[N-1] - exp(-jw)*s[N-2]) * exp(-jw*(N-1)), then start the next window.
+                out.append((n1 - self._out[0]*n2) * self._out[1])
+                self.state = (np.zeros_like(n1), np.zeros_like(n2))
+                self.pos = 0
+        if self.debug: PROFILER.event("ToneDetector.update", True, L=L, windows=len(out))
+        if not out: 
+            return np.zeros(x.shape[:-1] + (K, 0), dtype=complex)
+        return np.stack(out, axis=-1)
+
+    def __phasors(self, B): 
+        if B not in self._ph: 
+            t = np.arange(B)[:, None]
+            self._ph[B] = (np.exp(-1j*self.w*t), np.exp(-1j*self.w*(t - self.N)), 
+                           np.exp(1j*self.w*(t - self.N + 1)), np.exp(1j*self.w*B))
+        return self._ph[B]
+
+    def __sdft(self, x): 
+        K, N, B = len(self.w), self.N, x.shape[-1]
+        if self.state is None: 
+            self.state = (np.zeros(x.shape[:-1] + (N,), dtype=np.result_type(x, float)), 
+                          np.zeros(x.shape[:-1] + (K,), dtype=complex))
+        hist, R = self.state
+        if B == 0: 
+            return np.zeros(x.shape[:-1] + (K, 0), dtype=complex)
+        new, old, rot, step = self.__phasors(B)
+        xx = np.concatenate([hist, x], axis=-1)
+        # Note: Running sum R_i = R + sum_{t<=i} (x[t]*exp(-jwt) - x[t-N]*exp(-jw(t-N))), phases relative to the block start.
+        d = x[..., :, None]*new - xx[..., :B, None]*old
+        np.cumsum(d, axis=-2, out=d)
+        d += R[..., None, :]
+        hist = xx[..., xx.shape[-1] - N:]
+        self.pos += B
+        if self.pos >= N: 
+            R = hist @ self._hist # Note: Exact refresh from the history window.
+            self.pos = 0
+        else: 
+            R = d[..., -1, :]*step
+        d *= rot
+        self.state = (hist.copy(), R)
+        return np.swapaxes(d, -1, -2)
+
 
 if __name__ == "__main__":
 
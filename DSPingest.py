@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Asyncio ingest of live sample streams (sockets, files, FIFOs) into DSP signal blocks.
+
+Raw binary samples are read with readinto() into a small pool of preallocated
+byte buffers, converted in one vectorized pass per block (int16 or float32, real
+or interleaved I/Q) into signals carrying the stream's Fs, and handed through a
+bounded queue to a chain of processing stages:
+
+  >> import asyncio, DSP, DSPingest
+  >> async def main():
+  >>     source = await DSPingest.SocketSource.tcp("127.0.0.1", 5000)
+  >>     ddc = DSP.DDC(250e3, 2e6, 8)   # Note: One DDC for the stream keeps its phase and history.
+  >>     ingest = DSPingest.Ingest(source, Fs=2e6, fmt="int16iq", block=65536,
+  >>                               stages=[ddc.filter, detect], policy="block")
+  >>     stats = await ingest.run()
+  >>     print(stats["throughput"], stats["latency_mean"], stats["dropped"])
+  >> asyncio.run(main())
+
+Backpressure: with policy="block" the reader stops reading while the queue is
+full, so the kernel buffers fill and a TCP sender is slowed down. With
+"drop-newest" or "drop-oldest" the reader keeps up with the source and discards
+blocks (counted in 'dropped') when the stages lag behind.
+
+UDP datagrams are concatenated into one sample stream: datagram boundaries are
+not kept, and a datagram that straddles the end of a block is split across the
+two blocks without losing any bytes. Senders should keep whole samples in each
+datagram.
+
+Stages are callables taking and returning a signal (or None to end the chain for
+that block); coroutine functions are awaited. Stateful stages (DDC, FIR, IIR,
+Resampler, ...) are created once and their filter() method is passed, so the
+state carries across blocks. Blocking, CPU-heavy stages can be
+wrapped with Ingest.threaded() to run in the default executor.
+
+LoopbackSource synthesizes a tone plus noise in any of the raw formats (paced at
+Fs or as fast as possible), and serveLoopback() serves it over local TCP, so the
+whole path can be exercised without hardware.
+"""
+
+import time
+import socket
+import asyncio
+import numpy as np
+
+import DSP
+
+
+# Raw formats:
+# ============
+# Note: name -> (sample dtype on the wire, interleaved I/Q, scale to full scale 1.0).
+FORMATS = {"int16"     : (np.dtype("<i2"), False, 1.0/32768),
+           "float32"   : (np.dtype("<f4"), False, None),
+           "int16iq"   : (np.dtype("<i2"), True,  1.0/32768),
+           "float32iq" : (np.dtype("<f4"), True,  None)}
+
+
+def _format(fmt):
+    func = "DSPingest.format"
+
+    if fmt not in FORMATS:
+        raise ValueError("ERROR: (%s): Arguement (%s) only takes the following options = %s"%(func,"fmt",str(list(FORMATS.keys()))))
+    return FORMATS[fmt]
+
+def sampleBytes(fmt):
+    """
+    Bytes per (complex, for I/Q formats) sample of a raw format.
+    """
+    dtype, iq, scale = _format(fmt)
+    return dtype.itemsize*(2 if iq else 1)
+
+def convert(raw, fmt, out=None):
+    """
+    Convert raw bytes (bytes, bytearray or memoryview; whole samples) of format 'fmt'
+    into float32 samples (complex64 for I/Q formats) scaled to full scale 1.0, in one pass.
+    """
+    dtype, iq, scale = _format(fmt)
+    x = np.frombuffer(raw, dtype=dtype)
+    n = len(x)//2 if iq else len(x)
+    if out is None:
+        out = np.empty(n, dtype=np.complex64 if iq else np.float32)
+    flat = out.view(np.float32) # Note: I/Q pairs are the interleaved floats of complex64.
+    if scale is None:
+        flat[...] = x
+    else:
+        np.multiply(x, np.float32(scale), out=flat)
+    return out
+
+
+# Sources:
+# ========
+# Note: A source has 'async readinto(view) -> bytes read' (0 at the end of the stream) and close().
+
+class SocketSource(object):
+    """
+    TCP or UDP socket source (non-blocking, read with loop.sock_recv_into).
+
+    Datagram sockets receive every datagram whole into a staging buffer of 'bufsize'
+    bytes (at least 65536, the largest UDP payload), and the part that does not fit
+    into the current block is carried into the next one.
+    """
+    def __init__(self, sock, bufsize=65536):
+        sock.setblocking(False)
+        self.sock = sock
+        self.datagram = sock.type == socket.SOCK_DGRAM
+        self.staging = bytearray(max(int(bufsize), 65536)) if self.datagram else None
+        self.pending = memoryview(b"") # Note: Received datagram bytes not yet handed out.
+
+    @classmethod
+    async def tcp(cls, host, port):
+        """
+        Connect to a TCP sender.
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        await asyncio.get_running_loop().sock_connect(sock, (host, int(port)))
+        return cls(sock)
+
+    @classmethod
+    def udp(cls, host, port, rcvbuf=1 << 22):
+        """
+        Receive UDP datagrams on (host, port). Datagrams are concatenated into blocks
+        (a datagram may span two blocks; none of it is lost). An empty datagram ends
+        the stream.
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, int(rcvbuf))
+        sock.bind((host, int(port)))
+        return cls(sock)
+
+    async def readinto(self, view):
+        if not self.datagram:
+            return await asyncio.get_running_loop().sock_recv_into(self.sock, view)
+        if not len(self.pending):
+            # Note: A receive shorter than the datagram would truncate it, so receive it whole.
+            n = await asyncio.get_running_loop().sock_recv_into(self.sock, self.staging)
+            self.pending = memoryview(self.staging)[:n]
+            if not n:
+                return 0
+        n = min(len(view), len(self.pending))
+        view[:n] = self.pending[:n]
+        self.pending = self.pending[n:]
+        return n
+
+    def close(self):
+        self.sock.close()
+
+
+class FileSource(object):
+    """
+    File or FIFO source. Reads (and the open of a FIFO, which waits for a writer)
+    run in the default executor, so they never block the event loop.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    async def readinto(self, view):
+        loop = asyncio.get_running_loop()
+        if self.file is None:
+            self.file = await loop.run_in_executor(None, lambda: open(self.path, "rb", buffering=0))
+        return await loop.run_in_executor(None, self.file.readinto, view)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+class LoopbackSource(object):
+    """
+    Stand-in source for testing without hardware: a tone A*exp(j*2*pi*Fo*t) (or its
+    real part for real formats) plus white Gaussian noise, written straight into
+    the reader's buffers in raw format 'fmt'.
+
+    Parameters:
+    -----------
+    Fs : float
+        Sampling frequency.
+
+    fmt : str, default: "int16iq"
+        Raw format (see FORMATS).
+
+    Fo, A, std : float, default: Fs/8, 0.5, 0.01
+        Tone frequency, amplitude and noise standard deviation (full scale 1.0).
+
+    N : int, optional
+        Total samples; endless when not given.
+
+    realtime : bool, default: True
+        Pace the samples at Fs (otherwise as fast as they are read).
+
+    chunk : int, default: 4096
+        Largest number of samples produced per readinto call.
+
+    seed : int, optional
+        Noise seed.
+    """
+    def __init__(self, Fs, fmt="int16iq", Fo=None, A=0.5, std=0.01, N=None, realtime=True, chunk=4096, seed=None):
+        self.Fs  = DSP.SItoString(Fs)
+        self.fmt = fmt
+        self.dtype, self.iq, self.scale = _format(fmt)
+        self.Fo  = self.Fs/8.0 if Fo is None else DSP.SItoString(Fo)
+        self.A, self.std = float(A), float(std)
+        self.N   = None if N is None else int(N)
+        self.realtime = realtime
+        self.chunk = int(chunk)
+        self.nco = DSP.NCO(Fo=self.Fo, Fs=self.Fs)
+        self.rng = np.random.default_rng(seed)
+        self.sent  = 0
+        self.start = None
+
+    async def readinto(self, view):
+        n = min(len(view)//sampleBytes(self.fmt), self.chunk)
+        if self.N is not None:
+            n = min(n, self.N - self.sent)
+        if n <= 0:
+            return 0
+        if self.realtime:
+            if self.start is None:
+                self.start = time.perf_counter()
+            wait = self.start + (self.sent + n)/self.Fs - time.perf_counter()
+            if wait > 0:
+                await asyncio.sleep(wait)
+        z = self.nco.generate(n, part="complex" if self.iq else "cos")
+        z *= self.A
+        if self.iq:
+            z = z.view(float)
+        z += self.rng.standard_normal(z.shape)*(self.std/np.sqrt(2.0) if self.iq else self.std)
+        dst = np.frombuffer(view, dtype=self.dtype, count=len(z))
+        if self.scale is None:
+            dst[...] = z
+        else:
+            np.clip(np.round(z/self.scale), -32768, 32767, out=z)
+            dst[...] = z
+        self.sent += n
+        return n*sampleBytes(self.fmt)
+
+    def close(self):
+        pass
+
+
+async def serveLoopback(host="127.0.0.1", port=0, bufsize=1 << 16, **kwargs):
+    """
+    Serve a LoopbackSource (keyword arguments) to every TCP client on (host, port);
+    port 0 picks a free port (see server.sockets[0].getsockname()). Returns the asyncio server.
+    """
+    async def client(reader, writer):
+        source = LoopbackSource(**kwargs)
+        buf = bytearray(bufsize - bufsize % sampleBytes(source.fmt))
+        try:
+            while True:
+                n = await source.readinto(memoryview(buf))
+                if n == 0:
+                    break
+                writer.write(memoryview(buf)[:n])
+                await writer.drain() # Note: Waits while the client applies backpressure.
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+    return await asyncio.start_server(client, host, port)
+
+
+# Ingest:
+# =======
+
+class Ingest(object):
+    """
+    Asyncio reader -> bounded queue -> stage chain for one raw sample stream.
+
+    Parameters:
+    -----------
+    source : object
+        SocketSource, FileSource, LoopbackSource or any object with
+        'async readinto(view)' and 'close()'.
+
+    Fs : float
+        Sampling frequency of the stream (set on every block).
+
+    fmt : str, default: "int16iq"
+        Raw format (see FORMATS).
+
+    block : int, default: 65536
+        Samples per block (the last block of a stream may be shorter).
+
+    stages : list of callables, optional
+        Processing chain; stage(signal) -> signal or None (drop). Coroutine
+        functions are awaited.
+
+    sink : callable, optional
+        Called (or awaited) with the output of the last stage.
+
+    queue : int, default: 8
+        Blocks held between the reader and the stages.
+
+    policy : str, default: "block"
+        When the queue is full: "block" (backpressure), "drop-newest" (discard the
+        new block) or "drop-oldest" (discard the oldest queued block).
+
+    buffers : int, default: 4
+        Preallocated raw read buffers (recycled after each conversion).
+    """
+    policies = ["block", "drop-newest", "drop-oldest"]
+
+    def __init__(self, source, Fs, fmt="int16iq", block=65536, stages=None, sink=None,
+                 queue=8, policy="block", buffers=4, debug=False):
+        func = "Ingest.__init__"
+
+        if policy not in self.policies:
+            raise ValueError("ERROR: (%s): Arguement (%s) only takes the following options = %s"%(func,"policy",str(self.policies)))
+        self.source = source
+        self.Fs     = DSP.SItoString(Fs)
+        self.fmt    = fmt
+        self.width  = sampleBytes(fmt)
+        self.block  = int(block)
+        self.stages = list(stages or [])
+        self.sink   = sink
+        self.queue  = int(queue)
+        self.policy = policy
+        self.debug  = debug
+        self._free  = [bytearray(self.block*self.width) for k in range(max(1, int(buffers)))]
+        self._stop  = False
+        self.reset()
+
+    def reset(self):
+        """
+        Zero the counters.
+        """
+        self.counters = {"blocks_in" : 0, "blocks_out" : 0, "samples_in" : 0, "bytes_in" : 0,
+                         "dropped" : 0, "dropped_samples" : 0, "latency_sum" : 0.0, "latency_max" : 0.0,
+                         "queue_max" : 0, "start" : None, "stop" : None}
+
+    @staticmethod
+    def threaded(stage):
+        """
+        Wrap a blocking stage so it runs in the default executor (numpy releases the GIL).
+        """
+        async def run(x):
+            return await asyncio.get_running_loop().run_in_executor(None, stage, x)
+        return run
+
+    def stop(self):
+        """
+        Ask the reader to finish after the current block.
+        """
+        self._stop = True
+
+    def stats(self):
+        """
+        Counters plus derived rates: 'throughput' (input samples/s), 'latency_mean' and
+        'latency_max' (s from the end of a block's read to the end of its chain).
+        """
+        c = dict(self.counters)
+        start, stop = c.pop("start"), c.pop("stop")
+        elapsed = ((stop or time.perf_counter()) - start) if start is not None else 0.0
+        c["elapsed"] = elapsed
+        c["throughput"] = c["samples_in"]/elapsed if elapsed > 0 else 0.0
+        c["latency_mean"] = c["latency_sum"]/c["blocks_out"] if c["blocks_out"] else 0.0
+        return c
+
+    async def __fill(self, buf):
+        """
+        Read until the buffer holds a whole block or the stream ends; returns the bytes read.
+        """
+        view, filled = memoryview(buf), 0
+        while filled < len(buf):
+            n = await self.source.readinto(view[filled:])
+            if not n:
+                break
+            filled += n
+        return filled
+
+    async def __reader(self, queue):
+        c = self.counters
+        while not self._stop:
+            buf = self._free.pop() if self._free else bytearray(self.block*self.width)
+            n = await self.__fill(buf)
+            n -= n % self.width # Note: A torn sample at the end of the stream is discarded.
+            if n == 0:
+                self._free.append(buf)
+                break
+            x = convert(memoryview(buf)[:n], self.fmt)
+            self._free.append(buf)
+            ready = time.perf_counter()
+            c["blocks_in"] += 1
+            c["samples_in"] += len(x)
+            c["bytes_in"] += n
+            item = (DSP.signal.fromArray(x, Fs=self.Fs), ready)
+            await asyncio.sleep(0) # Note: Lets the stages run even when the source never waits.
+            if queue.full() and self.policy != "block":
+                if self.policy == "drop-newest":
+                    c["dropped"] += 1
+                    c["dropped_samples"] += len(x)
+                    continue
+                old = queue.get_nowait()
+                c["dropped"] += 1
+                c["dropped_samples"] += old[0].N
+            await queue.put(item)
+            c["queue_max"] = max(c["queue_max"], queue.qsize())
+            if n < len(buf):
+                break
+        await queue.put(None) # Note: End of stream (if the stages fail first, run() cancels the reader instead).
+
+    async def __consumer(self, queue):
+        c = self.counters
+        prof = DSP.PROFILER
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            x, ready = item
+            for k, stage in enumerate(self.stages):
+                if x is None:
+                    break
+                m = prof.mark() if prof.enabled else None
+                x = stage(x)
+                if asyncio.iscoroutine(x):
+                    x = await x
+                if m is not None: prof.lap("Ingest.stage%d"%(k), m)
+            if x is not None and self.sink is not None:
+                out = self.sink(x)
+                if asyncio.iscoroutine(out):
+                    await out
+            latency = time.perf_counter() - ready
+            c["blocks_out"] += 1
+            c["latency_sum"] += latency
+            c["latency_max"] = max(c["latency_max"], latency)
+            if prof.enabled:
+                prof.record("Ingest.latency", int(latency*1e9))
+
+    async def run(self):
+        """
+        Ingest until the source ends (or stop() is called); returns stats().
+        """
+        func = "Ingest.run"
+
+        self._stop = False
+        self.counters["start"] = time.perf_counter()
+        queue = asyncio.Queue(maxsize=max(1, self.queue))
+        tasks = [asyncio.ensure_future(self.__reader(queue)), asyncio.ensure_future(self.__consumer(queue))]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # Note: A failing stage (or reader, or a cancelled run) must not leave the other task behind.
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.counters["stop"] = time.perf_counter()
+            self.source.close()
+        stats = self.stats()
+        if self.debug or DSP.PROFILER.enabled:
+            DSP.PROFILER.event(func, self.debug, blocks=stats["blocks_in"], dropped=stats["dropped"],
+                               throughput=stats["throughput"], latency_mean=stats["latency_mean"])
+        return stats
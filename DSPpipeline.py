@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dataflow pipelines: signal processing stages declared as a DAG over block streams
+and run concurrently in a thread pool.
+
+Every stage is called once per block (in block order for the default, stateful
+stages) with the outputs of its input stages for that block; sources are iterables
+(or callables returning one) yielding the blocks:
+
+  >> import DSP, DSPpipeline
+  >> def blocks():
+  >>     nco = DSP.NCO(Fo=1e3, Fs=1e6)
+  >>     for k in range(1000):
+  >>         yield DSP.signal.fromArray(nco.generate(65536), Fs=1e6)
+  >> p = DSPpipeline.Pipeline(workers=16, queue=4)
+  >> p.add("gen", blocks)
+  >> p.add("noise", lambda x, out: np.add(x.TimeSignal, DSP.Noise("awg", std=0.1, size=x.N).getNoise(), out=out),
+  >>       inputs="gen", parallel=True, buffer=(65536, complex))
+  >> p.add("ddc", DSP.DDC(125e3, 1e6, 16).filter, inputs="noise")
+  >> p.add("fft", np.fft.fft, inputs="ddc", parallel=True)
+  >> p.add("detect", lambda X: np.argmax(np.abs(X)), inputs="fft", collect=True, parallel=True)
+  >> results = p.run()             # -> {"detect" : [one result per block]}
+  >> p.stats()["bottleneck"]       # -> name of the busiest stage
+
+Stages run on a shared thread pool; NumPy releases the GIL inside its kernels, so
+stages (and, with parallel=True, several blocks of one stage) use several cores at
+once. A stage may only run ahead of each consumer by 'queue' blocks, which bounds
+memory and applies backpressure up to the sources. A stage declared with 'buffer'
+writes into buffers recycled through a BufferPool (passed as 'out'); a buffer goes
+back to the pool once every consumer of that block has returned, so stages must
+not keep references to their inputs (copy what is needed).
+
+A stage returning None drops the block: its consumers are skipped for that block.
+"""
+
+import os
+import time
+import queue
+import threading
+import concurrent.futures
+import numpy as np
+
+import DSP
+
+
+_MISSING = object() # Note: Inbox slot of an input that has not delivered the block yet.
+
+
+class BufferPool(object):
+    """
+    Pool of equally shaped sample buffers, recycled instead of reallocated per block.
+
+    Parameters:
+    -----------
+    shape : int or tuple
+        Buffer shape (the last axis is time).
+
+    dtype : numpy dtype, default: float64
+
+    size : int, default: 0
+        Buffers preallocated. The pool grows when it runs empty (see 'allocated').
+
+    shared : bool, default: False
+        Allocate the buffers in shared memory (see DSP.sharedEmpty).
+    """
+    def __init__(self, shape, dtype=float, size=0, shared=False):
+        self.shape  = tuple(np.atleast_1d(shape).astype(int).tolist())
+        self.dtype  = np.dtype(dtype)
+        self.shared = shared
+        self.allocated = 0
+        self._free = []
+        self._lock = threading.Lock()
+        for k in range(int(size)):
+            self.put(self.__new())
+
+    def __new(self):
+        self.allocated += 1
+        return DSP._empty(self.shape, self.dtype, self.shared)
+
+    def get(self):
+        """
+        Take a buffer (contents undefined).
+        """
+        with self._lock:
+            if self._free:
+                return self._free.pop()
+            return self.__new()
+
+    def put(self, buf):
+        """
+        Return a buffer to the pool.
+        """
+        with self._lock:
+            self._free.append(buf)
+
+    def __len__(self):
+        return len(self._free)
+
+
+class _Node(object):
+    """
+    One stage of a pipeline and its scheduling state.
+    """
+    def __init__(self, name, fn, inputs, parallel, pool, collect):
+        self.name, self.fn, self.inputs = name, fn, inputs
+        self.parallel, self.pool, self.collect = parallel, pool, collect
+        self.consumers = []
+
+    def start(self):
+        self.next     = 0     # Note: Next block to dispatch (serial stages and sources).
+        self.inflight = 0
+        self.done     = 0     # Note: Blocks finished.
+        self.end      = None  # Note: Number of blocks once known.
+        self.inbox    = {}    # Note: block -> [input values], _MISSING while not delivered.
+        self.filled   = {}    # Note: block -> number of inputs present.
+        self.queued   = [0]*len(self.inputs) # Note: Per input, blocks delivered but not yet dispatched.
+        self.refs     = {}    # Note: block -> pool buffer while running, then [buffer, consumers still running].
+        self.results  = {}
+        self.calls, self.busy, self.longest, self.dropped = 0, 0, 0, 0
+        if not self.inputs:
+            self.iterator = iter(self.fn() if callable(self.fn) else self.fn)
+
+
+class Pipeline(object):
+    """
+    DAG of processing stages over block streams, run on a thread pool.
+
+    Parameters:
+    -----------
+    workers : int, optional, default: all cores
+        Threads of the pool.
+
+    queue : int, default: 4
+        Blocks a stage may run ahead of each of its consumers (per edge).
+    """
+    def __init__(self, workers=None, queue=4, debug=False):
+        self.workers = (os.cpu_count() or 1) if workers is None else max(1, int(workers))
+        self.queue   = max(1, int(queue))
+        self.debug   = debug
+        self.nodes   = {}
+        self.order   = []
+        self.elapsed = 0.0
+
+    def add(self, name, fn, inputs=(), parallel=False, buffer=None, collect=False, shared=False):
+        """
+        Add a stage.
+
+        Parameters:
+        -----------
+        name : str
+            Stage name (unique).
+
+        fn : callable or iterable
+            Source (no inputs): an iterable of blocks, or a callable returning one.
+            Stage: fn(*inputs) -> block, with one argument per input stage (in the
+            order of 'inputs'), plus out=<buffer> when 'buffer' is given.
+
+        inputs : str or list of str
+            Names of the stages (already added) feeding this stage.
+
+        parallel : bool, default: False
+            The stage keeps no state between blocks, so several blocks may be processed
+            at once. Otherwise (e.g. DSP.DDC.filter, stateful filters) blocks are
+            processed one at a time, in order.
+
+        buffer : tuple, optional
+            (shape, dtype) of an output buffer taken from a BufferPool for every call.
+
+        collect : bool, default: False
+            Keep the outputs of this stage; run() returns them.
+
+        shared : bool, default: False
+            Allocate the 'buffer' pool in shared memory.
+
+        Return:
+        -------
+          name : str
+        """
+        func = "Pipeline.add"
+
+        if name in self.nodes:
+            raise ValueError("ERROR: (%s): Stage (%s) already exists."%(func, name))
+        inputs = [inputs] if isinstance(inputs, str) else list(inputs)
+        for src in inputs:
+            if src not in self.nodes:
+                raise ValueError("ERROR: (%s): Input (%s) of stage (%s) is not a stage; add it first."%(func, src, name))
+        if not inputs and buffer is not None:
+            raise ValueError("ERROR: (%s): Sources take no 'buffer'."%(func))
+        if inputs and not callable(fn):
+            raise ValueError("ERROR: (%s): Stage (%s) must be callable."%(func, name))
+        pool = None
+        if buffer is not None:
+            pool = BufferPool(buffer[0], buffer[1] if len(buffer) > 1 else float, shared=shared)
+        node = _Node(name, fn, inputs, bool(parallel) and bool(inputs), pool, collect)
+        for src in inputs:
+            self.nodes[src].consumers.append(node)
+        self.nodes[name] = node
+        self.order.append(node) # Note: Inputs are added first, so this is a topological order.
+        return name
+
+    def __room(self, node):
+        """
+        True when 'node' may start another block without exceeding any consumer queue.
+        """
+        for c in node.consumers:
+            if c.queued[c.inputs.index(node.name)] + node.inflight >= self.queue:
+                return False
+        return True
+
+    def __ready(self, node):
+        """
+        Blocks of 'node' whose inputs are all present and that may be dispatched now.
+        """
+        if node.parallel:
+            return sorted(k for k, n in node.filled.items() if n == len(node.inputs))
+        if node.inflight == 0 and node.filled.get(node.next, 0) == len(node.inputs):
+            return [node.next]
+        return []
+
+    def __run(self, node, k, args, buf):
+        """
+        Worker: one call of a stage; returns (node, block, result, ns, start, exception).
+        """
+        start = time.perf_counter_ns()
+        try:
+            if not node.inputs:
+                try:
+                    ret = next(node.iterator)
+                except StopIteration:
+                    return node, k, StopIteration, time.perf_counter_ns() - start, start, None
+            elif buf is not None:
+                ret = node.fn(*args, out=buf)
+            else:
+                ret = node.fn(*args)
+        except BaseException as exc:
+            return node, k, None, time.perf_counter_ns() - start, start, exc
+        return node, k, ret, time.perf_counter_ns() - start, start, None
+
+    def __deliver(self, node, k, value):
+        """
+        Hand the output of block k of 'node' to its consumers (or store it).
+        """
+        buf = node.refs.pop(k, None)
+        if node.collect and value is not None:
+            node.results[k] = value
+            buf = None # Note: The buffer now belongs to the result and leaves the pool.
+        if buf is not None:
+            if node.consumers:
+                node.refs[k] = [buf, len(node.consumers)]
+            else:
+                node.pool.put(buf)
+        for c in node.consumers:
+            if c.end is not None and k >= c.end:
+                self.__unref(node, k) # Note: Past the end of a join with a shorter input.
+                continue
+            i = c.inputs.index(node.name)
+            if k not in c.inbox:
+                c.inbox[k] = [_MISSING]*len(c.inputs)
+            c.inbox[k][i] = value
+            c.filled[k] = c.filled.get(k, 0) + 1
+            c.queued[i] += 1
+
+    def __unref(self, src, k):
+        """
+        One consumer of block k of 'src' is done with it: return its pooled buffer after the last.
+        """
+        ref = src.refs.get(k)
+        if ref is not None:
+            ref[1] -= 1
+            if ref[1] == 0:
+                src.pool.put(ref[0])
+                del src.refs[k]
+
+    def __release(self, node, k):
+        """
+        Block k of 'node' was consumed by its stage: return pooled input buffers.
+        """
+        for src in node.inputs:
+            self.__unref(self.nodes[src], k)
+
+    def __finish(self, node):
+        """
+        Propagate the end of the streams: a stage ends with the shortest of its inputs,
+        which is known as soon as any input has ended. Blocks past the end that other
+        inputs already delivered are discarded, freeing their queue slots.
+        """
+        if not node.inputs:
+            return
+        ends = [self.nodes[src].end for src in node.inputs]
+        ends = [e for e in ends if e is not None]
+        if not ends or (node.end is not None and node.end <= min(ends)):
+            return
+        node.end = min(ends)
+        for k in [k for k in node.inbox if k >= node.end]:
+            args = node.inbox.pop(k)
+            del node.filled[k]
+            for i, a in enumerate(args):
+                if a is not _MISSING:
+                    node.queued[i] -= 1
+                    self.__unref(self.nodes[node.inputs[i]], k)
+
+    def run(self):
+        """
+        Run until every source is exhausted and all blocks went through the graph.
+
+        Return:
+        -------
+          results : dict, {stage name : [outputs, in block order]} of the 'collect' stages.
+        """
+        func = "Pipeline.run"
+
+        if not self.order:
+            return {}
+        for node in self.order:
+            node.start()
+        events = queue.Queue()
+        prof = DSP.PROFILER
+        budget = 2*self.workers # Note: Calls in flight; enough to keep every worker busy.
+        running, failed = 0, None
+        t0 = time.perf_counter()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="DSPpipeline") as pool:
+            while True:
+                # Dispatch: upstream first, as far as the queues and the budget allow.
+                progress = failed is None
+                while progress:
+                    progress = False
+                    for node in self.order:
+                        self.__finish(node)
+                        if not node.inputs:
+                            while node.end is None and node.inflight == 0 and running < budget and self.__room(node):
+                                node.inflight += 1
+                                running += 1
+                                pool.submit(self.__run, node, node.next, None, None).add_done_callback(lambda f: events.put(f.result()))
+                                node.next += 1
+                                progress = True
+                            continue
+                        for k in self.__ready(node):
+                            if running >= budget or not self.__room(node):
+                                break
+                            args = node.inbox.pop(k)
+                            del node.filled[k]
+                            for i in range(len(node.inputs)):
+                                node.queued[i] -= 1
+                            if not node.parallel:
+                                node.next += 1
+                            progress = True
+                            if any(a is None for a in args):
+                                # Note: Dropped upstream; the block is skipped here too.
+                                self.__release(node, k)
+                                node.dropped += 1
+                                node.done += 1
+                                self.__deliver(node, k, None)
+                                continue
+                            buf = node.pool.get() if node.pool is not None else None
+                            node.inflight += 1
+                            running += 1
+                            pool.submit(self.__run, node, k, args, buf).add_done_callback(lambda f: events.put(f.result()))
+                            if buf is not None:
+                                node.refs[k] = buf
+
+                if running == 0:
+                    if failed is not None or all(n.end is not None and n.done >= n.end for n in self.order):
+                        break
+                    # Note: Nothing is running and nothing could be dispatched, so no event will come.
+                    waiting = [n.name for n in self.order if n.end is None or n.done < n.end]
+                    raise RuntimeError("ERROR: (%s): Deadlock; stages %s can not make progress."%(func, str(waiting)))
+
+                node, k, ret, ns, start, exc = events.get()
+                running -= 1
+                node.inflight -= 1
+                if exc is not None:
+                    if failed is None:
+                        failed = (node.name, k, exc)
+                    continue
+                if ret is StopIteration:
+                    node.end = k
+                    continue
+                node.calls += 1
+                node.busy += ns
+                node.longest = max(node.longest, ns)
+                if prof.enabled:
+                    prof.record("Pipeline.%s"%(node.name), ns, start=start, block=k)
+                if node.inputs:
+                    self.__release(node, k)
+                node.done += 1
+                if ret is None:
+                    node.dropped += 1
+                self.__deliver(node, k, ret)
+
+        self.elapsed = time.perf_counter() - t0
+        if failed is not None:
+            raise RuntimeError("ERROR: (%s): Stage (%s) failed on block %d: %r"%(func, failed[0], failed[1], failed[2])) from failed[2]
+        if self.debug or prof.enabled:
+            stats = self.stats()
+            prof.event(func, self.debug, blocks=stats["blocks"], elapsed=stats["elapsed"], bottleneck=stats["bottleneck"])
+        return dict((n.name, [n.results[k] for k in sorted(n.results)]) for n in self.order if n.collect)
+
+    def stats(self):
+        """
+        Per-stage timing of the last run.
+
+        Return:
+        -------
+          stats : dict with 'elapsed' (s), 'blocks' (blocks out of the sources),
+                  'bottleneck' (stage with the highest utilization) and 'stages':
+                  {name : {"calls", "dropped", "busy" (s), "mean" (s), "max" (s),
+                  "utilization"}}. Utilization is busy time over the wall time (a
+                  parallel stage can exceed 1); a serial stage near 1 limits the
+                  throughput of the pipeline.
+        """
+        ret = {"elapsed" : self.elapsed, "blocks" : 0, "bottleneck" : None, "stages" : {}}
+        best = -1.0
+        for n in self.order:
+            if not hasattr(n, "calls"):
+                continue
+            busy = n.busy/1e9
+            util = busy/self.elapsed if self.elapsed > 0 else 0.0
+            ret["stages"][n.name] = {"calls" : n.calls, "dropped" : n.dropped, "busy" : busy,
+                                     "mean" : busy/n.calls if n.calls else 0.0, "max" : n.longest/1e9,
+                                     "utilization" : util}
+            if not n.inputs:
+                ret["blocks"] += n.calls
+            if util > best:
+                best, ret["bottleneck"] = util, n.name
+        return ret
@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" 
+Plotting layer of the DSP module. 
+
+Kept separate from the compute core (DSP.py) so that importing DSP does not pay 
+for matplotlib. DSP loads this module lazily on first use of any plotting function 
+(DSP.makeFigure, DSP.subplot, signal.tplot, ...). 
+"""
+
+import os
+import warnings
+import numpy as np
+import matplotlib.pyplot as plt
+
+import DSP # Note: Loaded before this module whenever plotting is reached through DSP.
+
+
+# TODOS:
+# ======
+# 
+# Plotting Related: 
+# =================
+# Note to self: This should be kept to a very minimum. MatplotLib is too flexible (complicated and complex) 
+#               to properly map all functionality. However, simple plotting functions should be consdiered. 
+# 
+# (p001): signal.tplot()
+#         signal.fplot() (dft or fft must first be taken).
+#         signal.tstem()
+#         signal.fstem() 
+# (p002): Related to (p001), Shoule we offer an keyword arg for the user to select the x-axis to be shown
+#         as time-stamps (Ts*[0,1,2,...,N-1]) or sample indices ([0,1,2,..., N-1])
+# (p003): Consider mergeing signal.__plot and signal.__stem into a single location (only do so when you move to 
+#         managing Figure objects).
+# (p004): ** Add docs to makeFigure, subplot, and makeGridSpec, showFigures() 
+#
+
+
+
+# TODO: Look at all plt.figure() input vars + look into FIgure.supt()
+# Default Figure settings. 
+FIGSIZEW = 10.0 # matplotlib default = 6.4
+FIGSIZEH =  8.0 # matplotlib default = 4.8
+FIGSIZE  = [FIGSIZEW, FIGSIZEH]
+DPI = 100       # matplotlib default = 100
+FACECOLOR = 'w' # matplotlib default = 'w'
+EDGECOLOR = 'w' # matplotlib default = 'w'
+FIGI = 0 
+def makeFigure(grid=True, t=None, figsize=None, dpi=None, facecolor=None, edgecolor=None, num=None, frameon=True, debug=False):
+    func = "makeFigure" 
+
+    global FIGI 
+    FIGI += 1
+    if (debug): DSP.PROFILER.event(func, True, FIGI=FIGI)
+
+    # Set default values: 
+    if grid: 
+        plt.rcParams['axes.grid'] = True 
+    if not figsize:
+        figsize = FIGSIZE
+    if not dpi:
+        dpi = DPI
+    if not facecolor:
+        facecolor = FACECOLOR
+    if not edgecolor:
+        edgecolor = EDGECOLOR
+    # Create 'Figure' object
+    if not num: 
+        figure = plt.figure(num=FIGI, figsize=figsize, dpi=dpi, facecolor=facecolor, edgecolor=edgecolor, frameon=frameon)
+    else: 
+        figure = plt.figure(num=num, figsize=figsize, dpi=dpi, facecolor=facecolor, edgecolor=edgecolor, frameon=frameon)
+    if (debug): DSP.PROFILER.event(func, True, Figure=figure)
+
+    # Add title to figure. (TODO: other args. See source for figure.suptitle())
+    if t: 
+        figure.suptitle(t=t)
+  
+    # Return 'Figure' object
+    return figure
+
+def makeGridSpec(figure, nrows=1, ncols=1, wspace=None, hspace=None, debug=False):
+    func = "makeGridspec"
+    GS = figure.add_gridspec(nrows=nrows, ncols=ncols, hspace=hspace, wspace=wspace)
+    return GS
+
+# TODO: Track the keyword arg 'show'. I want to remove it but not sure yet. So just set to 'true' for now
+def subplot(signals, dim, show=True, debug=False):
+    """ 
+    Produce a subplot of signals using matplotlib.pyplot.stem function
+
+    Parameters: 
+    ----------
+    signals : list
+    	A list of signals to be plotted. 
+    
+    dim : list or tuple 
+    	Number of rows and columns in grid. 
+        Ex.) (2,3) -> 2 rows, 3 columns
+
+    """
+    func = "subplot"
+    _signals = len(signals)
+    
+    nrows = dim[0]
+    ncols = dim[1]
+
+    # Create GridSpec: 
+    hspace = .5
+    wspace = None 
+    figure = makeFigure() #  figure : Figure (matplotlib.figure.Figure)
+    gridspec = makeGridSpec(figure, nrows=nrows, ncols=ncols, wspace=wspace, hspace=hspace)
+
+    i = 0 
+    for ir in range(nrows):
+        for ic in range(ncols): 
+            # TODO: Here there is potential to extract nameing out the signal objects and place them on the labels.
+            ax = figure.add_subplot(gridspec[ir,ic], xlabel = "Signal:%d"%i)
+
+            # Signal type: signal OR numpy.ndarray
+            signalType = str(type(signals[i]))
+            if debug: DSP.PROFILER.event(func, True, signalType=signalType)   
+            if "ndarray" in signalType:
+                drawSamples(ax, "stem", signals[i])
+            else: 
+                drawSamples(ax, "stem", signals[i].TimeSignal, dx=signals[i].Ts, cache=signals[i])
+            i+=1
+    if show:
+        plt.show()
+    
+    return
+
+
+def showFigures():
+    plt.show(); 
+    return;
+    
+
+# Decimated rendering: 
+# ====================
+# Long signals are not handed to matplotlib sample by sample. They are reduced to a 
+# min/max envelope of about two points per output pixel (peaks are preserved) from a 
+# pyramid of per-block minima and maxima. The pyramid of a signal is cached on the 
+# signal (dropped with its other caches when 'TimeSignal' changes), so re-plotting 
+# and zooming (the envelope is rebuilt for the visible range) only read the pyramid. 
+STEMMAX   = 4096    # Note: stem() of more samples is drawn as a decimated line instead.
+PYRBASE   = 64      # Note: Samples per block of the finest pyramid level.
+PYRFACTOR = 4       # Note: Blocks merged per coarser level.
+PYRCHUNK  = 1 << 22 # Note: Samples read per pass while building (memory-mapped captures are streamed).
+PIXELS    = 2000    # Note: Envelope width when the axes size is unknown.
+
+def _blockMinMax(y, k):
+    """ 
+    Per-block minimum and maximum of 'y' (last axis) over blocks of k samples; 
+    the last block may be partial. 
+    """
+    n = y.shape[-1]
+    full = (n // k) * k
+    blocks = y[..., :full].reshape(y.shape[:-1] + (n // k, k))
+    lo, hi = blocks.min(axis=-1), blocks.max(axis=-1)
+    if full < n: 
+        lo = np.concatenate([lo, y[..., full:].min(axis=-1)[..., None]], axis=-1)
+        hi = np.concatenate([hi, y[..., full:].max(axis=-1)[..., None]], axis=-1)
+    return lo, hi
+
+
+class Pyramid(object): 
+    """ 
+    Min/max pyramid of a sample array (last axis is time; complex samples use the real part). 
+
+    Level j holds the minimum and maximum of every block of base*factor**j samples. 
+    The finest level is built in chunks of 'chunk' samples, so memory-mapped 
+    captures are streamed instead of being read at once. 
+
+    Parameters: 
+    -----------
+    y : numpy.ndarray 
+        Samples, shape (N,) or (channels, N). 
+
+    base, factor, chunk : int, default: PYRBASE, PYRFACTOR, PYRCHUNK 
+    """
+    def __init__(self, y, base=PYRBASE, factor=PYRFACTOR, chunk=PYRCHUNK): 
+        self.y      = y
+        self.N      = y.shape[-1]
+        self.base   = int(base)
+        self.factor = int(factor)
+
+        chunk = max(1, int(chunk) // self.base) * self.base
+        lo, hi = [], []
+        for start in range(0, self.N, chunk): 
+            block = np.real(y[..., start:start+chunk])
+            l, h = _blockMinMax(block, self.base)
+            lo.append(l)
+            hi.append(h)
+        lo = np.concatenate(lo, axis=-1) if lo else np.zeros(y.shape[:-1] + (0,))
+        hi = np.concatenate(hi, axis=-1) if hi else np.zeros(y.shape[:-1] + (0,))
+
+        self.levels = [(self.base, lo, hi)] # Note: (samples per block, minima, maxima)
+        while lo.shape[-1] > self.factor: 
+            lo = _blockMinMax(lo, self.factor)[0]
+            hi = _blockMinMax(hi, self.factor)[1]
+            self.levels.append((self.levels[-1][0]*self.factor, lo, hi))
+        return 
+
+    def envelope(self, start, stop, bins): 
+        """ 
+        Min/max envelope of samples [start, stop) in about 'bins' bins. 
+
+        Return: 
+        -------
+          (n, v) : sample positions (length 2*bins) and values (..., 2*bins): every 
+                   bin contributes its minimum and its maximum at the bin start. 
+                   Ranges of at most 2*bins samples are returned as-is. 
+        """
+        start, stop = max(0, int(start)), min(self.N, int(stop))
+        if stop - start <= 2*bins: 
+            return np.arange(start, stop), np.real(self.y[..., start:stop])
+        per = (stop - start) / float(bins) # Note: Samples per bin.
+        if per < self.base: 
+            # Note: Finer than the pyramid; only the visible samples are read.
+            k = int(np.ceil(per))
+            lo, hi = _blockMinMax(np.real(self.y[..., start:stop]), k)
+            n = start + k*np.arange(lo.shape[-1])
+        else: 
+            size, lo, hi = self.levels[0]
+            for level in self.levels: 
+                if level[0] <= per: 
+                    size, lo, hi = level
+            first, last = start // size, -(-stop // size)
+            k = max(1, int(per // size))
+            lo = _blockMinMax(lo[..., first:last], k)[0]
+            hi = _blockMinMax(hi[..., first:last], k)[1]
+            n = (first + k*np.arange(lo.shape[-1]))*size
+        v = np.stack([lo, hi], axis=-1).reshape(lo.shape[:-1] + (2*lo.shape[-1],))
+        return np.repeat(n, 2), v
+
+
+def pyramid(x): 
+    """ 
+    Return the (cached) min/max Pyramid of a signal's 'TimeSignal'. 
+    """
+    if x._pyramid is None or x._pyramid.y is not x.TimeSignal: 
+        x._pyramid = Pyramid(x.TimeSignal)
+    return x._pyramid
+
+
+class DecimatedLine(object): 
+    """ 
+    Line plot of a long signal drawn from its min/max envelope. 
+
+    The envelope is recomputed for the visible range whenever the x-limits of 
+    the axes change (zoom/pan), at about two points per pixel. 
+
+    Parameters: 
+    -----------
+    ax : matplotlib.axes.Axes 
+
+    pyr : Pyramid 
+        Pyramid of the samples (see pyramid()). 
+
+    dx, x0 : float, default: 1.0, 0.0
+        The x-axis is x0 + dx*[0,1,2,...,N-1]. 
+
+    **kwargs : matplotlib.axes.Axes.plot keyword arguments, optional
+    """
+    def __init__(self, ax, pyr, dx=1.0, x0=0.0, **kwargs): 
+        self.ax  = ax
+        self.pyr = pyr
+        self.dx  = float(dx)
+        self.x0  = float(x0)
+        n, v = pyr.envelope(0, pyr.N, self.bins())
+        self.lines = ax.plot(self.x0 + self.dx*n, v.T, **kwargs)
+        # Note: A plain function (not a bound method) so the registry keeps this object alive.
+        self.cid = ax.callbacks.connect("xlim_changed", lambda ax: self.update(ax))
+        return 
+
+    def bins(self): 
+        return _pixels(self.ax)
+
+    def update(self, ax=None): 
+        lo, hi = sorted(self.ax.get_xlim())
+        start = int(np.floor((lo - self.x0)/self.dx))
+        stop  = int(np.ceil((hi - self.x0)/self.dx)) + 1
+        n, v = self.pyr.envelope(start, stop, self.bins())
+        v = v.reshape((-1, len(n)))
+        for line, row in zip(self.lines, v): 
+            line.set_data(self.x0 + self.dx*n, row)
+        self.ax.figure.canvas.draw_idle()
+        return 
+
+
+def _pixels(ax): 
+    """ 
+    Width of 'ax' in pixels (PIXELS when unknown). 
+    """
+    width = ax.get_window_extent().width if ax.figure is not None else 0
+    return max(1, int(width) or PIXELS)
+
+
+_STEMONLY = ("linefmt", "markerfmt", "basefmt", "bottom", "use_line_collection", "orientation")
+
+def drawSamples(ax, Type, y, dx=1.0, x0=0.0, xaxis=None, cache=None, **kwargs): 
+    """ 
+    Draw samples 'y' on 'ax' with plot (Type="plot") or stem (Type="stem"), 
+    decimating long signals (see DecimatedLine). 
+
+    Parameters: 
+    -----------
+    dx, x0 : float, default: 1.0, 0.0 
+        Uniform x-axis x0 + dx*[0,1,2,...]. 
+
+    xaxis : numpy.ndarray, optional 
+        Explicit (e.g. frequency) x-axis. Long signals are then decimated once, without zoom updates. 
+
+    cache : signal, optional 
+        Signal whose 'TimeSignal' is 'y'; its pyramid is cached on it. 
+    """
+    func = "drawSamples"
+
+    N = y.shape[-1]
+    if Type == "stem" and N > STEMMAX: 
+        warnings.warn("(%s): %d samples exceed STEMMAX = %d; drawing a decimated line instead of a stem plot."%(func, N, STEMMAX), 
+                      stacklevel=3)
+        Type = "plot"
+        kwargs = dict((k, v) for k, v in kwargs.items() if k not in _STEMONLY)
+    small = N <= 2*_pixels(ax)
+    if Type == "stem": 
+        return ax.stem(x0 + dx*np.arange(N) if xaxis is None else xaxis, y, **kwargs)
+    if small: 
+        return ax.plot(x0 + dx*np.arange(N) if xaxis is None else xaxis, np.transpose(y), **kwargs)
+    if xaxis is not None: 
+        n, v = Pyramid(y).envelope(0, N, _pixels(ax))
+        return ax.plot(xaxis[n], v.T, **kwargs)
+    return DecimatedLine(ax, pyramid(cache) if cache is not None else Pyramid(y), dx=dx, x0=x0, **kwargs)
+
+
+
+
+def plotSignal(x, Type, index = "time", domain="time", title="", **kwargs):
+    """ 
+    Plot a signal with matplotlib.pyplot.plot (Type="plot") or .stem (Type="stem"). 
+    Implementation of signal.tplot/tstem/fplot/fstem; see signal.__Plot for the arguments. 
+    """
+    func = "plotSignal"
+
+    # for kw in kwargs: 
+    # other checks 
+
+    ax = plt.figure().gca()
+    ax.grid(True)
+
+    # Check domain
+    if (domain == "time"):  
+        # Check index: Time-stamps Ts*[0,1,...,N-1] or sample indices [0,1,...,N-1]. 
+        dx = x.Ts if (index == "time") else 1.0
+        # Note: Long signals are decimated (see drawSamples). Lag-indexed signals start at 'lag0'.
+        drawSamples(ax, Type, x.TimeSignal, dx=dx, x0=getattr(x, "lag0", 0)*dx, cache=x, **kwargs)
+
+    # Check domain:
+    elif (domain == "freq"): 
+        # Note: The default transform is taken (and cached) on first access of 'FreqSignal'.
+        mag = np.abs(x.FreqSignal)
+        # Check index:
+        if (index == "freq"):  # x.nFs = freqRes * [0,1,2,3, ... ]
+            xaxis = x.nFs
+        else: # bin indices -> [0,1,2,...]
+            xaxis = np.arange(len(mag))
+        drawSamples(ax, Type, mag, xaxis=xaxis, **kwargs)
+
+    else: 
+        raise ValueError("ERROR: (%s): Arg(%s) only has the following options: %s"%(func,"index",str(["time","samples"])))
+
+
+    if title:
+        plt.title(title) 
+
+    plt.show()
+
+    return;
+
+
+# Batch export: 
+# =============
+# Headless, parallel rendering of many figures straight to files. Figures are built 
+# with the object-oriented API on the Agg canvas (no pyplot state, no FIGI counter, 
+# no rcParams changes), so workers in a process pool do not interfere, and every 
+# figure is cleared and released as soon as it is written. 
+
+def renderFigure(signals, path, dim=None, Type="plot", title=None, figsize=None, dpi=None, 
+                 facecolor=None, edgecolor=None, hspace=.5, **kwargs): 
+    """ 
+    Render one figure of signals to an image file (format from the extension of 'path'). 
+
+    Parameters: 
+    -----------
+    signals : signal, numpy.ndarray, or list of them
+        One signal per axes. A single signal (or ndarray) gives a single axes. 
+
+    path : str 
+        Output file, e.g. "qa/run1.png" or "qa/run1.svg". 
+
+    dim : list or tuple, optional, default: (len(signals), 1) 
+        Number of rows and columns in the grid. 
+
+    Type : str, default: "plot" 
+        Options: "plot", "stem" (see drawSamples). 
+
+    title : str, optional 
+        Figure title. 
+
+    figsize, dpi, facecolor, edgecolor : optional, default: the module defaults 
+
+    **kwargs : matplotlib.axes.Axes.plot (or .stem) keyword arguments, optional
+
+    Return: 
+    -------
+      path : str 
+    """
+    func = "renderFigure"
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    if not isinstance(signals, (list, tuple)): 
+        signals = [signals]
+    if dim is None: 
+        dim = (len(signals), 1)
+    nrows, ncols = dim[0], dim[1]
+    if nrows*ncols < len(signals): 
+        raise ValueError("ERROR: (%s): Grid %s is too small for %d signals."%(func, str(tuple(dim)), len(signals)))
+
+    figure = Figure(figsize=figsize or FIGSIZE, dpi=dpi or DPI, facecolor=facecolor or FACECOLOR, 
+                    edgecolor=edgecolor or EDGECOLOR)
+    FigureCanvasAgg(figure)
+    try: 
+        gridspec = figure.add_gridspec(nrows=nrows, ncols=ncols, hspace=hspace)
+        for i, x in enumerate(signals): 
+            ax = figure.add_subplot(gridspec[i // ncols, i % ncols], xlabel="Signal:%d"%i)
+            ax.grid(True)
+            if isinstance(x, np.ndarray): 
+                drawSamples(ax, Type, x, **kwargs)
+            else: 
+                drawSamples(ax, Type, x.TimeSignal, dx=x.Ts, cache=x, **kwargs)
+        if title: 
+            figure.suptitle(t=title)
+        figure.savefig(path)
+    finally: 
+        figure.clear() # Note: Not registered with pyplot; clearing breaks the axes/artist cycles.
+    return path
+
+def _renderJob(job): 
+    signals, path, options = job
+    return renderFigure(signals, path, **options)
+
+def exportFigures(figures, outdir=".", fmt="png", names=None, titles=None, workers=None, chunksize=1, debug=False, **options): 
+    """ 
+    Render many figures to files in parallel (headless). 
+
+    Parameters: 
+    -----------
+    figures : list 
+        One entry per figure: a signal, an ndarray, or a list of them (a grid; see renderFigure). 
+
+    outdir : str, default: "." 
+        Output directory (created if missing). 
+
+    fmt : str, default: "png" 
+        File format / extension, e.g. "png", "svg", "pdf". 
+
+    names : list of str, optional, default: "figure00000", "figure00001", ... 
+        File names (without extension), one per figure. 
+
+    titles : list of str, optional 
+        Figure titles, one per figure. 
+
+    workers : int, optional, default: all cores 
+        Number of worker processes. With workers=1 figures are rendered in this process. 
+
+    chunksize : int, default: 1 
+        Figures handed to a worker at a time (larger values amortize pickling of small signals). 
+
+    **options : renderFigure keyword arguments (dim, Type, figsize, dpi, ...). 
+
+    Return: 
+    -------
+      paths : list of str, in the order of 'figures'. 
+
+    Useage example: 
+    ---------------
+      >> paths = DSPplot.exportFigures([x1, [x2, x3]], outdir="qa", fmt="svg", workers=4) 
+    """
+    func = "exportFigures"
+
+    if names is None: 
+        names = ["figure%05d"%i for i in range(len(figures))]
+    if len(names) != len(figures) or (titles is not None and len(titles) != len(figures)): 
+        raise ValueError("ERROR: (%s): 'names' and 'titles' must have one entry per figure."%(func))
+    if not os.path.isdir(outdir): 
+        os.makedirs(outdir)
+
+    jobs = []
+    for i, signals in enumerate(figures): 
+        opts = dict(options)
+        if titles is not None: 
+            opts["title"] = titles[i]
+        jobs.append((signals, os.path.join(outdir, "%s.%s"%(names[i], fmt)), opts))
+
+    if workers is None: 
+        workers = os.cpu_count() or 1
+    workers = max(1, min(int(workers), len(jobs)))
+    if debug: DSP.PROFILER.event(func, True, figures=len(jobs), workers=workers, format=fmt)
+    if workers == 1: 
+        return [_renderJob(job) for job in jobs]
+    import concurrent.futures
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool: 
+        return list(pool.map(_renderJob, jobs, chunksize=max(1, int(chunksize))))
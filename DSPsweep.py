@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parameter sweeps and Monte-Carlo runs over DSP signal configurations.
+
+A sweep evaluates a metric function on every point of a parameter grid (and
+'trials' independent realizations of each point) across a process pool:
+
+  >> import DSP, DSPsweep
+  >> def snr(params, rng):
+  >>     x = DSPsweep.realize(params, rng)          # DSP.sin + DSP.Noise from the grid point
+  >>     X = np.abs(x.rfft())**2
+  >>     k = int(round(params["Fo"]/x.freqRes))
+  >>     return 10*np.log10(X[k]/(X.sum() - X[k]))
+  >> grid = DSPsweep.grid(A=[0.5, 1.0], Fo=[1e3, 2e3], Fs=[48e3], N=[4096], std=[0.1, 1.0])
+  >> results = DSPsweep.Sweep(snr, grid, trials=100, seed=7, checkpoint="snr.ckpt").run()
+  >> results[i][t]  -> metric of grid point i, trial t
+
+Tasks are sent to the workers in chunks to keep inter-process traffic low. Every
+task draws from its own SeedSequence (spawn key = task index), so results do not
+depend on the number of workers or the chunking. Large ndarray results are handed
+back through shared memory instead of being pickled, and finished chunks are
+appended to a checkpoint file from which an interrupted sweep resumes.
+"""
+
+import os
+import pickle
+import itertools
+import numpy as np
+
+import DSP
+
+
+SHMBYTES = 1 << 16 # Note: ndarray results of at least this many bytes are returned through shared memory.
+
+
+def grid(**axes):
+    """
+    Cartesian product of parameter values.
+
+    Useage example:
+    ---------------
+      >> DSPsweep.grid(A=[1.0, 2.0], std=[0.1]) -> [{"A": 1.0, "std": 0.1}, {"A": 2.0, "std": 0.1}]
+    """
+    names = list(axes.keys())
+    values = [list(axes[name]) if isinstance(axes[name], (list, tuple, np.ndarray)) else [axes[name]] for name in names]
+    return [dict(zip(names, point)) for point in itertools.product(*values)]
+
+
+def realize(params, rng, Type="sin"):
+    """
+    Build one realization of a tone from a grid point.
+
+    Parameters:
+    -----------
+    params : dict
+        signal.init keyword arguments (A, DC, Fo, To, Phase, Fs, Ts, N, method, dtype, ...)
+        plus the Noise settings 'std', 'mean' and 'form' (default "awg").
+
+    rng : numpy.random.Generator
+        Stream of the task (seeds the noise).
+
+    Type : str, default: "sin"
+        Options: "sin", "cos", "cexp".
+    """
+    func = "realize"
+
+    types = {"sin" : DSP.sin, "cos" : DSP.cos, "cexp" : DSP.cexp}
+    if Type not in types:
+        raise ValueError("ERROR: (%s): Arguement (%s) only takes the following options = %s"%(func,"Type",str(list(types.keys()))))
+    kwargs = dict(params)
+    noise = {}
+    for kw in ("std", "mean", "form"):
+        if kw in kwargs:
+            noise[kw] = kwargs.pop(kw)
+    if noise.get("std"):
+        form = noise.pop("form", "awg")
+        kwargs["Noise"] = DSP.Noise(form, size=int(kwargs["N"]), seed=rng, dtype=kwargs.get("dtype", float), **noise)
+    return types[Type](**kwargs)
+
+
+# Shared memory returns:
+# ======================
+
+def _unregister(shm):
+    """
+    Hand ownership of a worker-created block to the parent (which unlinks it after copying).
+    """
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+
+def _pack(results):
+    """
+    Move the large ndarrays of a chunk of results into one shared memory block.
+    Returns (results with ("__shm__", slot, shape, dtype) placeholders, block name or None, slot offsets).
+    """
+    arrays = []
+    def visit(x):
+        if isinstance(x, np.ndarray) and x.nbytes >= SHMBYTES and x.dtype != object:
+            arrays.append(x)
+            return ("__shm__", len(arrays) - 1, x.shape, x.dtype.str)
+        if isinstance(x, dict):
+            return dict((k, visit(v)) for k, v in x.items())
+        if isinstance(x, (list, tuple)):
+            return type(x)(visit(v) for v in x)
+        return x
+    results = visit(results)
+    if not arrays:
+        return results, None, []
+
+    from multiprocessing import shared_memory
+    offsets, total = [], 0
+    for a in arrays:
+        offsets.append(total)
+        total += -(-a.nbytes // 64) * 64 # Note: 64-byte aligned slots.
+    shm = shared_memory.SharedMemory(create=True, size=total)
+    for a, off in zip(arrays, offsets):
+        np.ndarray(a.shape, dtype=a.dtype, buffer=shm.buf, offset=off)[...] = a
+    name = shm.name
+    _unregister(shm)
+    shm.close()
+    return results, name, offsets
+
+def _unpack(results, name, offsets):
+    """
+    Copy the shared memory arrays of a chunk back into the results and free the block.
+    """
+    if name is None:
+        return results
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        def visit(x):
+            if isinstance(x, tuple) and len(x) == 4 and x[0] == "__shm__":
+                return np.ndarray(x[2], dtype=np.dtype(x[3]), buffer=shm.buf, offset=offsets[x[1]]).copy()
+            if isinstance(x, dict):
+                return dict((k, visit(v)) for k, v in x.items())
+            if isinstance(x, (list, tuple)):
+                return type(x)(visit(v) for v in x)
+            return x
+        return visit(results)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _discard(name):
+    """
+    Unlink the shared memory block of a chunk result that will not be unpacked.
+    """
+    if name is None:
+        return
+    from multiprocessing import shared_memory
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
+
+
+def _runChunk(job):
+    """
+    Worker: evaluate the metric on a chunk of tasks.
+    """
+    metric, entropy, tasks, shared = job
+    out = []
+    for index, params in tasks:
+        rng = np.random.Generator(np.random.PCG64(np.random.SeedSequence(entropy, spawn_key=(index,))))
+        out.append(metric(params, rng))
+    if shared:
+        return _pack(out)
+    return out, None, []
+
+
+class Sweep(object):
+    """
+    Process-pool Monte-Carlo runner over a parameter grid.
+
+    Parameters:
+    -----------
+    metric : callable
+        metric(params, rng) -> result. 'params' is a grid point (dict), 'rng' a
+        numpy.random.Generator private to the task. Must be picklable (a module-level
+        function) when workers > 1.
+
+    params : list of dict
+        Grid points (see grid()).
+
+    trials : int, default: 1
+        Independent realizations per grid point.
+
+    seed : int, optional
+        Root seed. Task k (grid point k // trials, trial k % trials) uses
+        SeedSequence(seed, spawn_key=(k,)). A fresh seed is drawn when not given
+        (see Sweep.seed to reproduce the run).
+
+    workers : int, optional, default: all cores
+        Worker processes. With workers=1 the tasks run in this process.
+
+    chunksize : int, optional
+        Tasks per chunk sent to a worker (default: about 4 chunks per worker).
+
+    checkpoint : str, optional
+        File to which finished chunks are appended. Re-running a sweep with the
+        same checkpoint (and the same params, trials and seed) skips the tasks
+        already in it.
+
+    shared : bool, default: True
+        Return ndarray results of at least SHMBYTES bytes through shared memory.
+    """
+    def __init__(self, metric, params, trials=1, seed=None, workers=None, chunksize=None,
+                 checkpoint=None, shared=True, debug=False):
+        func = "Sweep.__init__"
+
+        if not callable(metric):
+            raise ValueError("ERROR: (%s): 'metric' must be callable."%(func))
+        self.metric = metric
+        self.params = list(params)
+        self.trials = int(trials)
+        if self.trials < 1:
+            raise ValueError("ERROR: (%s): Arguement (%s) must be a positive integer."%(func, "trials"))
+        self.seed = int(np.random.SeedSequence().entropy) if seed is None else int(seed)
+        self.workers = (os.cpu_count() or 1) if workers is None else max(1, int(workers))
+        self.tasks = len(self.params) * self.trials
+        if chunksize is None:
+            chunksize = max(1, -(-self.tasks // (4*self.workers)))
+        self.chunksize = int(chunksize)
+        self.checkpoint = checkpoint
+        self.shared = shared
+        self.debug = debug
+
+    def __key(self):
+        """
+        Identity of the sweep stored in (and checked against) the checkpoint.
+        """
+        return {"seed" : self.seed, "tasks" : self.tasks, "trials" : self.trials,
+                "params" : repr(self.params)}
+
+    def __resume(self):
+        """
+        Results recorded in the checkpoint file: {task index : result}.
+        """
+        func = "Sweep.run"
+        done = {}
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return done
+        with open(self.checkpoint, "rb") as f:
+            try:
+                key = pickle.load(f)
+            except Exception:
+                return done
+            if key != self.__key():
+                raise RuntimeError("ERROR: (%s): Checkpoint %s belongs to a different sweep."%(func, self.checkpoint))
+            while True:
+                try:
+                    indexes, results = pickle.load(f)
+                except EOFError:
+                    break
+                except Exception:
+                    break # Note: A chunk cut short by the interruption; it is recomputed.
+                done.update(zip(indexes, results))
+        return done
+
+    def run(self):
+        """
+        Run (or resume) the sweep.
+
+        Return:
+        -------
+          results : list, results[i][t] is the metric of grid point i, trial t.
+        """
+        func = "Sweep.run"
+
+        done = self.__resume()
+        todo = [k for k in range(self.tasks) if k not in done]
+        chunks = [todo[i:i + self.chunksize] for i in range(0, len(todo), self.chunksize)]
+        if self.debug or DSP.PROFILER.enabled: 
+            DSP.PROFILER.event(func, self.debug, tasks=self.tasks, resumed=len(done), chunks=len(chunks), workers=self.workers)
+
+        log = None
+        if self.checkpoint:
+            # Note: The file is rewritten with the valid records, dropping a truncated tail. The
+            #       compacted copy replaces it atomically, so a crash here keeps the old records.
+            tmp = self.checkpoint + ".tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(self.__key(), f)
+                if done:
+                    pickle.dump((list(done.keys()), list(done.values())), f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.checkpoint)
+            log = open(self.checkpoint, "ab")
+        try:
+            jobs = [(self.metric, self.seed, [(k, self.params[k // self.trials]) for k in chunk], self.shared and self.workers > 1)
+                    for chunk in chunks]
+            for chunk, (results, name, offsets) in self.__map(chunks, jobs):
+                results = _unpack(results, name, offsets)
+                done.update(zip(chunk, results))
+                if log is not None:
+                    pickle.dump((chunk, results), log)
+                    log.flush()
+                    os.fsync(log.fileno())
+        finally:
+            if log is not None:
+                log.close()
+
+        return [[done[i*self.trials + t] for t in range(self.trials)] for i in range(len(self.params))]
+
+    def __map(self, chunks, jobs):
+        """
+        Yield (chunk, chunk result) as the chunks finish.
+        """
+        if self.workers == 1 or len(jobs) <= 1:
+            for chunk, job in zip(chunks, jobs):
+                yield chunk, _runChunk(job)
+            return
+        import concurrent.futures
+        with concurrent.futures.ProcessPoolExecutor(max_workers=min(self.workers, len(jobs))) as pool:
+            futures = dict((pool.submit(_runChunk, job), chunk) for chunk, job in zip(chunks, jobs))
+            taken = set()
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    taken.add(future)
+                    yield futures[future], future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                # Note: Workers hand their blocks over to the parent, so the blocks of the chunks
+                #       that finished (or are still running) and will not be unpacked are freed here.
+                concurrent.futures.wait(futures)
+                for future in futures:
+                    if future not in taken and not future.cancelled() and future.exception() is None:
+                        _discard(future.result()[1])
+                raise
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Throughput benchmark suite of the DSP compute core.
+
+Times the construction of sin/cos signals for N = 1e2 ... 1e7 (1e8 with
+'--max-n 1e8'; about 800 MB per call), Noise generation, SItoString/SItoArray
+parsing of large input lists, decay(), DDC and hilbert on channel stacks, the
+polyphase channelizer and a DSPpipeline chain on all cores, and reports for every case the throughput (ops/sec, where an op is one sample or
+one parsed string) and the peak memory allocated by one call (tracemalloc;
+includes numpy buffers).
+
+Results are written as JSON and can be compared against a stored baseline (the
+JSON of an earlier run); the suite then exits non-zero if any case common to both
+lost more than '--threshold' of its throughput.
+
+Useage example:
+---------------
+  >> python benchmarks/bench_dsp.py --out baseline.json
+  >> python benchmarks/bench_dsp.py --baseline baseline.json --threshold 0.15 --out new.json
+  >> python benchmarks/bench_dsp.py --filter Noise --max-n 1e6
+  >> python benchmarks/bench_dsp.py --filter sin --max-n 1e8   # needs several GB of memory
+
+NOTE: Throughput is the best of '--repeat' timings (each at least '--min-time'
+      seconds of calls), which is the most stable statistic on a shared machine.
+      Compare runs from the same machine only.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import DSP
+import DSPpipeline
+
+
+def cases(maxN):
+    """
+    Benchmark cases: (name, function, ops per call).
+    """
+    ret = []
+    for k in range(2, 9):
+        N = 10**k
+        if N > maxN:
+            break
+        ret.append(("sin N=1e%d"%k, lambda N=N: DSP.sin(A=1.0, Fo=1e3, Fs=1e6, N=N), N))
+        ret.append(("cos N=1e%d"%k, lambda N=N: DSP.cos(A=1.0, Fo=1e3, Fs=1e6, N=N), N))
+    for k in (4, 6, 7):
+        N = 10**k
+        if N > maxN:
+            break
+        ret.append(("Noise.awg N=1e%d"%k, lambda N=N: DSP.Noise("awg", std=1.0, size=N, seed=1), N))
+    for form in ("uniform", "pink", "brown"):
+        N = min(10**6, maxN)
+        ret.append(("Noise.%s N=%d"%(form, N), lambda N=N, form=form: DSP.Noise(form, std=1.0, size=N, seed=1), N))
+
+    units = ["200kHz", "30.0us", "1.5GHz", "48000", "2.5ms", "10MHz", "0.125", "3ns"]
+    strings = [units[i % len(units)] for i in range(100000)]
+    ret.append(("SItoString list=1e5", lambda: [DSP.SItoString(s) for s in strings], len(strings)))
+    units = ["200 kHz", "30.0 us", "1.5 GHz", "48000", "-2.5 ms", "1e1 MHz", "0.125", "3 ns"]
+    spaced = [units[i % len(units)] for i in range(100000)]
+    ret.append(("SItoArray list=1e5", lambda: DSP.SItoArray(spaced), len(spaced)))
+    x = np.random.default_rng(1).standard_normal(min(10**5, maxN)).astype(np.float32)
+    ret.append(("DDC 64ch N=%d"%len(x), lambda: DSP.DDC(np.linspace(1e4, 4.5e5, 64), 1e6, 16).filter(x), 64*len(x)))
+    ret.append(("hilbert 16ch N=%d"%len(x), lambda: DSP.hilbert(np.broadcast_to(x, (16, len(x)))), 16*len(x)))
+    ret.append(("Channelizer 256ch N=%d"%len(x), lambda: DSP.Channelizer(256, oversample=2).filter(x), len(x)))
+    ret.append(("Pipeline 16x%d"%len(x), lambda: _pipeline(x, 16), 16*len(x)))
+    ret.append(("decay", lambda: DSP.decay(2.0, b=1.0), 1000))
+    return ret
+
+def _pipeline(x, blocks):
+    """
+    Noise -> DDC -> FFT -> detect on 'blocks' copies of x through a DSPpipeline.
+    """
+    p = DSPpipeline.Pipeline()
+    p.add("gen", lambda: (x for k in range(blocks)))
+    p.add("noise", lambda v, out: np.add(v, DSP.Noise("awg", std=0.1, size=len(v), seed=1).getNoise(), out=out),
+          inputs="gen", parallel=True, buffer=(len(x), float))
+    p.add("ddc", DSP.DDC(1e5, 1e6, 16).filter, inputs="noise")
+    p.add("fft", np.fft.fft, inputs="ddc", parallel=True)
+    p.add("detect", lambda X: np.argmax(np.abs(X)), inputs="fft", parallel=True, collect=True)
+    return p.run()
+
+def measure(fn, ops, repeat, minTime):
+    """
+    Return (ops/sec, seconds per call, peak bytes) of fn.
+    """
+    fn() # Note: Warm-up (caches, lazy imports).
+    best = float("inf")
+    for r in range(repeat):
+        calls, start = 0, time.perf_counter()
+        while True:
+            fn()
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= minTime:
+                break
+        best = min(best, elapsed / calls)
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return ops / best, best, peak
+
+def compare(results, baseline, threshold):
+    """
+    Print the change against the baseline; return the names of regressed cases.
+    """
+    regressed = []
+    print("\n%-26s %14s %14s %9s"%("case", "baseline op/s", "current op/s", "change"))
+    for name, cur in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]["ops_per_sec"]
+        change = cur["ops_per_sec"]/base - 1.0
+        flag = ""
+        if change < -threshold:
+            regressed.append(name)
+            flag = "  REGRESSION"
+        print("%-26s %14.4g %14.4g %+8.1f%%%s"%(name, base, cur["ops_per_sec"], 100*change, flag))
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--out", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative throughput loss (default 0.10)")
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this string")
+    parser.add_argument("--max-n", type=float, default=1e7, help="largest signal/noise length (default 1e7; 1e8 needs several GB)")
+    parser.add_argument("--repeat", type=int, default=5, help="timings per case (best is kept)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per timing")
+    args = parser.parse_args()
+
+    results = {}
+    print("%-26s %14s %12s %12s"%("case", "op/s", "s/call", "peak MB"))
+    for name, fn, ops in cases(int(args.max_n)):
+        if args.filter not in name:
+            continue
+        DSP._AXIS_CACHE.clear() # Note: Every case builds its own time axes once (first call).
+        rate, seconds, peak = measure(fn, ops, args.repeat, args.min_time)
+        results[name] = {"ops_per_sec" : rate, "seconds_per_call" : seconds, "peak_bytes" : peak, "ops" : ops}
+        print("%-26s %14.4g %12.3g %12.2f"%(name, rate, seconds, peak/2.0**20))
+    DSP._AXIS_CACHE.clear()
+
+    if args.out:
+        meta = {"python" : platform.python_version(), "numpy" : np.__version__, "machine" : platform.machine(),
+                "platform" : platform.platform(), "time" : time.strftime("%Y-%m-%dT%H:%M:%S")}
+        with open(args.out, "w") as f:
+            json.dump({"meta" : meta, "results" : results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressed = compare(results, baseline, args.threshold)
+        if regressed:
+            print("FAIL: %d case(s) regressed by more than %.0f%%: %s"%(len(regressed), 100*args.threshold, ", ".join(regressed)))
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" 
+Import-time benchmark of the DSP compute core. 
+
+Measures, in fresh interpreters, the wall time of 'import numpy' and of 
+'import DSP', and reports the median overhead of DSP on top of numpy. It also 
+checks that importing DSP and running a headless workload (generation, noise, 
+FFT, Welch, filtering) never loads matplotlib. 
+
+Useage example:
+---------------
+  >> python benchmarks/bench_import.py --runs 20 --max-overhead-ms 30
+
+Exits non-zero if matplotlib is loaded by the core or the overhead exceeds 
+'--max-overhead-ms'. 
+
+NOTE: With PYTHONDONTWRITEBYTECODE set, every run also pays for compiling DSP.py; 
+      the benchmark byte-compiles DSP.py once up front and runs with -B unset so 
+      the measured time is the steady-state import. 
+"""
+
+import argparse
+import os
+import py_compile
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TIMER = """
+import time
+t = time.perf_counter()
+import %s
+print(time.perf_counter() - t)
+"""
+
+HEADLESS = """
+import sys
+import DSP
+x = DSP.sin(A=1.0, Fo=1e3, Fs=48e3, N=4096, Noise=DSP.Noise("awg", std=0.1, size=4096, seed=1))
+x.rfft()
+DSP.welch(x, nperseg=256)
+x.filter(DSP.FIR(DSP.firwin(31, 5e3, Fs=48e3)))
+print(int("matplotlib" in sys.modules))
+"""
+
+def run(code): 
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    out = subprocess.run([sys.executable, "-c", code], env=env, check=True, capture_output=True, text=True)
+    return out.stdout.strip()
+
+def main(): 
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15, help="interpreter launches per measurement")
+    parser.add_argument("--max-overhead-ms", type=float, default=50.0, help="fail above this median DSP-over-numpy overhead")
+    args = parser.parse_args()
+
+    py_compile.compile(os.path.join(ROOT, "DSP.py"), doraise=True)
+
+    numpyTimes = sorted(float(run(TIMER%"numpy")) for i in range(args.runs))
+    dspTimes   = sorted(float(run("import numpy\n" + TIMER%"DSP")) for i in range(args.runs)) # Note: numpy preloaded.
+    overhead   = 1e3*statistics.median(dspTimes)
+    plotLoaded = run(HEADLESS) == "1"
+
+    print("import numpy        : median %7.2f ms, min %7.2f ms"%(1e3*statistics.median(numpyTimes), 1e3*numpyTimes[0]))
+    print("import DSP          : median %7.2f ms, min %7.2f ms"%(overhead, 1e3*dspTimes[0]))
+    print("matplotlib loaded by headless workload: %s"%(plotLoaded))
+
+    failed = False
+    if plotLoaded: 
+        print("FAIL: the compute core imported matplotlib.")
+        failed = True
+    if overhead > args.max_overhead_ms: 
+        print("FAIL: DSP import overhead %.2f ms exceeds %.2f ms."%(overhead, args.max_overhead_ms))
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the DDC and the polyphase Channelizer against their direct references
+(run with: python -m pytest tests).
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pytest
+import numpy as np
+import DSP
+
+sig = pytest.importorskip("scipy.signal")
+
+Fs, q = 1e6, 8
+SIZES = [1, 5, 8, 13, 640, 1001, 64, 3000]
+
+
+def _stream(obj, x):
+    parts, start, k = [], 0, 0
+    while start < x.shape[-1]:
+        n = SIZES[k % len(SIZES)]
+        parts.append(obj.filter(x[..., start:start + n]))
+        start, k = start + n, k + 1
+    return np.concatenate(parts, axis=-1)
+
+def _reference(x, Fc, taps, q, Fs):
+    """
+    Mix to baseband, low-pass filter, keep every q-th sample.
+    """
+    n = np.arange(x.shape[-1])
+    return sig.lfilter(taps, 1.0, x*np.exp(-2j*np.pi*Fc*n/Fs))[::q]
+
+
+@pytest.mark.parametrize("method, atol", [("exact", 1e-10), ("lut", 1e-6)])
+def test_ddc_matches_mix_filter_decimate(method, atol):
+    x = np.random.default_rng(14).standard_normal(8000)
+    ddc = DSP.DDC(123e3, Fs, q, method=method)
+    assert np.allclose(ddc.filter(x), _reference(x, 123e3, ddc.taps, q, Fs), rtol=0, atol=atol)
+
+
+def test_ddc_channel_array_matches_reference():
+    x = np.random.default_rng(15).standard_normal(8000)
+    Fc = [1e5, 2e5, 3e5]
+    y = DSP.DDC(Fc, Fs, q).filter(x)
+    taps = DSP.DDC(Fc, Fs, q).taps
+    assert y.shape == (3, 1000)
+    for k, f in enumerate(Fc):
+        assert np.allclose(y[k], _reference(x, f, taps, q, Fs), rtol=0, atol=1e-10)
+
+
+@pytest.mark.parametrize("Fc", [123e3, [1e5, 2e5, 3e5]])
+def test_ddc_streamed_matches_one_shot(Fc):
+    x = np.random.default_rng(16).standard_normal(20000).astype(np.float32)
+    once = DSP.DDC(Fc, Fs, q, method="exact").filter(x)
+    streamed = _stream(DSP.DDC(Fc, Fs, q, method="exact", chunk=100), x)
+    assert streamed.shape == once.shape
+    assert np.allclose(streamed, once, rtol=0, atol=1e-5)
+
+
+@pytest.mark.parametrize("oversample", [1, 2])
+def test_channelizer_channels_match_ddc(oversample):
+    M = 16
+    x = np.random.default_rng(17).standard_normal(8000)
+    ch = DSP.Channelizer(M, oversample=oversample)
+    Y = ch.filter(x)
+    assert Y.shape == (M, len(x)//ch.D)
+    for k in range(M):
+        ref = DSP.DDC(float(k)/M, 1.0, ch.D, taps=ch.prototype, method="exact").filter(x)
+        assert np.allclose(Y[k], ref, rtol=0, atol=1e-10)
+
+
+@pytest.mark.parametrize("oversample", [1, 4])
+def test_channelizer_streamed_matches_one_shot(oversample):
+    x = np.random.default_rng(18).standard_normal((2, 12000))
+    once = DSP.Channelizer(32, oversample=oversample).filter(x)
+    streamed = _stream(DSP.Channelizer(32, oversample=oversample), x)
+    assert streamed.shape == once.shape == (2, 32, 12000*oversample//32)
+    assert np.allclose(streamed, once, rtol=0, atol=1e-12)
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of convolve/correlate against numpy (run with: python -m pytest tests).
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pytest
+import numpy as np
+import DSP
+
+
+@pytest.mark.parametrize("mode", ["full", "same", "valid"])
+@pytest.mark.parametrize("complex_", [False, True])
+def test_convolve_correlate_match_numpy(mode, complex_):
+    rng = np.random.default_rng(6)
+    x = rng.standard_normal(5000)
+    h = rng.standard_normal(37)
+    if complex_:
+        x = x + 1j*rng.standard_normal(5000)
+        h = h + 1j*rng.standard_normal(37)
+    assert np.allclose(DSP.convolve(x, h, mode).TimeSignal, np.convolve(x, h, mode), rtol=0, atol=1e-10)
+    assert np.allclose(DSP.correlate(x, h, mode).TimeSignal, np.correlate(x, h, mode), rtol=0, atol=1e-10)
+
+
+def test_convolve_batched_channels():
+    rng = np.random.default_rng(7)
+    x = rng.standard_normal((3, 2000))
+    h = rng.standard_normal(300)
+    y = DSP.convolve(x, h, "same").TimeSignal
+    for k in range(3):
+        assert np.allclose(y[k], np.convolve(x[k], h, "same"), rtol=0, atol=1e-10)
+
+
+def test_correlate_delay():
+    rng = np.random.default_rng(8)
+    tx = rng.standard_normal(512)
+    rx = np.concatenate([np.zeros(100), tx, np.zeros(50)])
+    assert np.isclose(DSP.correlate(rx, tx, Fs=1e3).delay(), 0.1)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Equivalence tests of the streaming FIR and IIR filters against scipy.signal
+(run with: python -m pytest tests).
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pytest
+import numpy as np
+import DSP
+
+sig = pytest.importorskip("scipy.signal")
+
+
+def _blocks(x, sizes):
+    """
+    Split x (last axis is time) into consecutive blocks of the given sizes (cycled).
+    """
+    out, start, k = [], 0, 0
+    while start < x.shape[-1]:
+        n = sizes[k % len(sizes)]
+        out.append(x[..., start:start + n])
+        start, k = start + n, k + 1
+    return out
+
+
+@pytest.mark.parametrize("method", ["direct", "ols", "ola", "auto"])
+def test_fir_matches_lfilter(method):
+    rng = np.random.default_rng(1)
+    taps = DSP.firwin(63, 0.2, window="hamming")
+    x = rng.standard_normal((3, 5000))
+    ref = sig.lfilter(taps, 1.0, x, axis=-1)
+    y = DSP.FIR(taps, method=method).filter(x)
+    assert np.allclose(y, ref, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("method", ["direct", "ols", "ola"])
+def test_fir_streamed_matches_one_shot(method):
+    rng = np.random.default_rng(2)
+    taps = DSP.firwin(101, 0.1)
+    x = rng.standard_normal(7000) + 1j*rng.standard_normal(7000)
+    once = DSP.FIR(taps, method=method).filter(x)
+    fir = DSP.FIR(taps, method=method)
+    streamed = np.concatenate([fir.filter(b) for b in _blocks(x, [1, 17, 100, 999, 64, 2500])])
+    assert np.allclose(streamed, once, rtol=0, atol=1e-12)
+    assert np.allclose(once, sig.lfilter(taps, 1.0, x), rtol=0, atol=1e-12)
+
+
+def test_iir_matches_sosfilt():
+    rng = np.random.default_rng(3)
+    sos = sig.butter(6, 0.15, output="sos")
+    x = rng.standard_normal((2, 20000))
+    ref = sig.sosfilt(sos, x, axis=-1)
+    assert np.allclose(DSP.IIR(sos, block=1024).filter(x), ref, rtol=0, atol=1e-9)
+
+
+def test_iir_streamed_matches_one_shot():
+    rng = np.random.default_rng(4)
+    sos = np.vstack([DSP.biquad("lowpass", 2e3, 48e3), DSP.biquad("highpass", 100.0, 48e3)])
+    x = rng.standard_normal(30000)
+    iir = DSP.IIR(sos, block=512)
+    streamed = np.concatenate([iir.filter(b) for b in _blocks(x, [1, 7, 511, 513, 4096, 333])])
+    assert np.allclose(streamed, DSP.IIR(sos).filter(x), rtol=0, atol=1e-9)
+    assert np.allclose(streamed, sig.sosfilt(sos, x), rtol=0, atol=1e-9)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Regression tests of DSPingest (run with: python -m pytest tests).
+"""
+
+import os
+import sys
+import socket
+import asyncio
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pytest
+import numpy as np
+import DSPingest
+
+
+def test_failing_stage_propagates_and_leaves_no_tasks():
+    def fail(x):
+        return 1/0
+
+    async def main():
+        source = DSPingest.LoopbackSource(Fs=1e6, fmt="int16", N=1 << 20, realtime=False)
+        ingest = DSPingest.Ingest(source, Fs=1e6, fmt="int16", block=1024, stages=[fail], queue=2)
+        with pytest.raises(ZeroDivisionError):
+            await asyncio.wait_for(ingest.run(), timeout=10)
+        return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    assert asyncio.run(main()) == []
+
+
+def test_udp_datagrams_spanning_blocks_are_kept():
+    async def main():
+        source = DSPingest.SocketSource.udp("127.0.0.1", 0)
+        port = source.sock.getsockname()[1]
+        data = np.arange(3000, dtype="<i2")
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        for k in range(0, len(data), 750):
+            sender.sendto(data[k:k + 750].tobytes(), ("127.0.0.1", port))
+        sender.sendto(b"", ("127.0.0.1", port)) # Note: An empty datagram ends the stream.
+        sender.close()
+        out = []
+        ingest = DSPingest.Ingest(source, Fs=1e3, fmt="int16", block=1000, sink=out.append)
+        await asyncio.wait_for(ingest.run(), timeout=10)
+        return np.concatenate([x.TimeSignal for x in out]), data
+
+    got, data = asyncio.run(main())
+    assert np.array_equal(np.round(got*32768).astype(int), data)
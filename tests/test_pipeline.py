@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Regression tests of DSPpipeline (run with: python -m pytest tests).
+"""
+
+import os
+import sys
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import DSPpipeline
+
+
+def _run(p, timeout=10):
+    """
+    Run the pipeline in a thread so a hang fails the test instead of blocking it.
+    """
+    out = {}
+    def target():
+        try:
+            out["result"] = p.run()
+        except BaseException as exc:
+            out["error"] = exc
+    t = threading.Thread(target=target, daemon=True)
+    t.start()
+    t.join(timeout)
+    assert not t.is_alive(), "Pipeline.run did not return"
+    if "error" in out:
+        raise out["error"]
+    return out["result"]
+
+
+def test_join_of_unequal_lengths_ends_with_the_shortest():
+    for short, parallel in (("a", False), ("b", True)):
+        p = DSPpipeline.Pipeline(workers=2, queue=2)
+        p.add("a", range(3) if short == "a" else range(20))
+        p.add("b", range(3) if short == "b" else range(20))
+        p.add("j", lambda x, y: x + y, inputs=["a", "b"], parallel=parallel, collect=True)
+        assert _run(p) == {"j" : [0, 2, 4]}
+
+
+def test_join_past_the_end_returns_pooled_buffers():
+    def fill(v, out):
+        out[...] = v
+        return out
+
+    p = DSPpipeline.Pipeline(workers=2, queue=2)
+    p.add("a", range(2))
+    p.add("s", range(30))
+    p.add("b", fill, inputs="s", buffer=(4, float))
+    p.add("j", lambda x, y: x, inputs=["a", "b"], collect=True)
+    p.add("k", lambda y: 1, inputs="b")
+    assert _run(p) == {"j" : [0, 1]}
+    assert len(p.nodes["b"].pool) == p.nodes["b"].pool.allocated
+    assert p.stats()["stages"]["k"]["calls"] == 30
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the stage profiler (run with: python -m pytest tests).
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import DSP
+
+
+def test_signal_stages_use_one_name_per_class():
+    DSP.PROFILER.enable()
+    try:
+        for k in range(3):
+            DSP.sin(Fo=1e3, Fs=1e5, N=100)
+        DSP.cos(Fo=1e3, Fs=1e5, N=100)
+        stages = DSP.PROFILER.summary()["stages"]
+    finally:
+        DSP.PROFILER.disable()
+        DSP.PROFILER.reset()
+    names = sorted(name for name in stages if name.split(".")[0] in ("sin", "cos", "DSP"))
+    assert names == ["cos.axis", "cos.init", "cos.sanity_checks", "cos.waveform",
+                     "sin.axis", "sin.init", "sin.sanity_checks", "sin.waveform"]
+    assert stages["sin.init"]["count"] == 3
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming vs one-shot tests of the polyphase Resampler (run with: python -m pytest tests).
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pytest
+import numpy as np
+import DSP
+
+
+@pytest.mark.parametrize("kwargs", [dict(up=3, down=2), dict(up=1, down=4), dict(up=5, down=1), dict(ratio=0.7071)])
+def test_resampler_streamed_matches_one_shot(kwargs):
+    rng = np.random.default_rng(5)
+    x = rng.standard_normal((2, 4001))
+    if "ratio" in kwargs:
+        once = DSP.resample(x, new_Fs=kwargs["ratio"], Fs=1.0)
+    else:
+        once = DSP.resample(x, **kwargs)
+    rs = DSP.Resampler(**kwargs)
+    parts, start = [], 0
+    for n in [1, 2, 3, 250, 999, 17, 1000, 4000]:
+        parts.append(rs.filter(x[..., start:start + n]))
+        start += n
+    parts.append(rs.flush())
+    streamed = np.concatenate(parts, axis=-1)
+    assert streamed.shape == once.shape
+    assert np.allclose(streamed, once, rtol=0, atol=1e-12)
+    assert once.shape[-1] == int(np.ceil(x.shape[-1]*float(rs.ratio)))
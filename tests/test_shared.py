@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of shared-memory signals and SharedRing across processes (run with: python -m pytest tests).
+"""
+
+import os
+import sys
+import gc
+import glob
+import pickle
+import multiprocessing
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pytest
+import numpy as np
+import DSP
+
+pytestmark = pytest.mark.skipif(not os.path.isdir("/dev/shm"), reason="needs /dev/shm")
+
+
+def _segments():
+    return set(glob.glob("/dev/shm/psm_*"))
+
+def _summarize(x):
+    """
+    Worker: check the samples arrived zero-copy and return their checksum.
+    """
+    return DSP.isShared(x.TimeSignal), float(np.sum(x.TimeSignal)), x.Fs
+
+def _consume(ring, n, out):
+    """
+    Worker: read the ring in odd-sized pieces until it is closed.
+    """
+    parts = []
+    while True:
+        x = ring.read(n)
+        if x.shape[-1] == 0:
+            break
+        parts.append(x)
+    out.put(np.concatenate(parts, axis=-1))
+
+
+def test_shared_signal_spawn_round_trip():
+    before = _segments()
+    x = DSP.sin(A=1.0, Fo=1e3, Fs=1e6, N=1 << 18, shared=True)
+    assert DSP.isShared(x.TimeSignal)
+    assert len(pickle.dumps(x)) < 4096
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(2) as pool:
+        results = pool.map(_summarize, [x, x])
+    for shared, total, Fs in results:
+        assert shared and Fs == x.Fs
+        assert np.isclose(total, np.sum(x.TimeSignal))
+    del x, results
+    gc.collect()
+    assert _segments() - before == set()
+
+
+def test_segment_unlinked_after_last_reference():
+    before = _segments()
+    x = DSP.cos(A=1.0, Fo=1e3, Fs=1e6, N=4096, shared=True)
+    view = x.TimeSignal[10:20]
+    y = pickle.loads(pickle.dumps(x))
+    assert np.shares_memory(y.TimeSignal, x.TimeSignal) # Note: Attached once per process.
+    assert _segments() - before
+    del x, y
+    gc.collect()
+    assert _segments() - before # Note: 'view' still holds the segment.
+    del view
+    gc.collect()
+    assert _segments() - before == set()
+
+
+def test_shared_ring_wraps_across_processes():
+    before = _segments()
+    data = np.arange(2*10007, dtype=np.float32).reshape(2, 10007)
+    ring = DSP.SharedRing(1000, dtype=np.float32, shape=(2,), poll=1e-4)
+    ctx = multiprocessing.get_context("spawn")
+    out = ctx.Queue()
+    proc = ctx.Process(target=_consume, args=(ring, 333, out))
+    proc.start()
+    for start in range(0, data.shape[-1], 701): # Note: Blocks straddle the end of the 1000-sample ring.
+        ring.write(data[:, start:start + 701], timeout=30)
+    ring.close()
+    got = out.get(timeout=60)
+    proc.join(30)
+    assert proc.exitcode == 0
+    assert np.array_equal(got, data)
+    del ring
+    gc.collect()
+    assert _segments() - before == set()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the Welch and STFT estimators against scipy.signal (run with: python -m pytest tests).
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pytest
+import numpy as np
+import DSP
+
+sig = pytest.importorskip("scipy.signal")
+
+
+@pytest.mark.parametrize("average", ["mean", "median"])
+def test_welch_matches_scipy(average):
+    x = np.random.default_rng(11).standard_normal(10000)
+    f, P = DSP.welch(x, Fs=100.0, nperseg=256, average=average)
+    f2, P2 = sig.welch(x, fs=100.0, nperseg=256, average=average)
+    assert np.allclose(f, f2)
+    assert np.allclose(P, P2, rtol=1e-10, atol=0)
+
+
+def test_incremental_welch_matches_one_shot():
+    x = np.random.default_rng(12).standard_normal((2, 10000))
+    est = DSP.Welch(Fs=100.0, nperseg=256, noverlap=200)
+    for s in range(0, x.shape[-1], 777):
+        est.update(x[..., s:s + 777])
+    f, P = est.result()
+    f2, P2 = sig.welch(x, fs=100.0, nperseg=256, noverlap=200, axis=-1)
+    assert np.allclose(P, P2, rtol=1e-10, atol=0)
+
+
+def test_stft_matches_scipy():
+    x = np.random.default_rng(13).standard_normal(5000)
+    f, t, Z = DSP.stft(x, Fs=100.0, nperseg=128, noverlap=96)
+    f2, t2, Z2 = sig.stft(x, fs=100.0, nperseg=128, noverlap=96, boundary=None, padded=False)
+    assert np.allclose(f, f2) and np.allclose(t, t2)
+    assert np.allclose(Z, Z2.T, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("average", ["mean", "median"])
+def test_lazy_signal_welch_matches_materialized(average):
+    kw = dict(A=1.0, Fo=1e3, Fs=1e5, N=50000, Noise=None)
+    lazy = DSP.sin(lazy=True, **kw)
+    f, P = lazy.welch(chunk=4096, nperseg=512, average=average)
+    f2, P2 = DSP.sin(**kw).welch(nperseg=512, average=average)
+    assert np.allclose(f, f2)
+    assert np.allclose(P, P2, rtol=1e-9, atol=1e-15)
+    with pytest.raises(ValueError):
+        lazy.welch(Fs=1e5)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Regression tests of DSPsweep (run with: python -m pytest tests).
+"""
+
+import os
+import sys
+import glob
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pytest
+import numpy as np
+import DSPsweep
+
+
+def _segments():
+    return set(glob.glob("/dev/shm/psm_*"))
+
+def _failing(params, rng):
+    if params["a"] == 5:
+        raise ValueError("metric failed")
+    return np.zeros(4*DSPsweep.SHMBYTES//8) # Note: Returned through shared memory.
+
+def _metric(params, rng):
+    return params["a"]*rng.random()
+
+
+@pytest.mark.skipif(not os.path.isdir("/dev/shm"), reason="needs /dev/shm")
+def test_failing_metric_leaves_no_shared_memory():
+    before = _segments()
+    sweep = DSPsweep.Sweep(_failing, DSPsweep.grid(a=list(range(12))), trials=2, seed=1, workers=3, chunksize=2)
+    with pytest.raises(ValueError):
+        sweep.run()
+    assert _segments() - before == set()
+
+
+def test_checkpoint_resume(tmp_path):
+    ckpt = str(tmp_path/"sweep.ckpt")
+    params = DSPsweep.grid(a=[1, 2, 3, 4])
+    first = DSPsweep.Sweep(_metric, params, trials=3, seed=5, workers=1, chunksize=2, checkpoint=ckpt).run()
+    again = DSPsweep.Sweep(_metric, params, trials=3, seed=5, workers=2, chunksize=5, checkpoint=ckpt).run()
+    assert first == again
+    assert not os.path.exists(ckpt + ".tmp")
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the Goertzel and sliding DFT tone detectors against FFT bins
+(run with: python -m pytest tests).
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import DSP
+
+
+N, Fs = 64, 6400.0
+BINS = np.array([0, 3, 10, 32])
+
+
+def test_goertzel_matches_fft_bins():
+    rng = np.random.default_rng(9)
+    x = rng.standard_normal((2, 5*N))
+    det = DSP.ToneDetector(list(BINS*Fs/N), Fs=Fs, N=N, method="goertzel")
+    X = np.concatenate([det.update(x[..., s:s + 37]) for s in range(0, x.shape[-1], 37)], axis=-1)
+    ref = np.fft.fft(x.reshape(2, 5, N), axis=-1)[..., BINS] # Note: (channels, windows, bins).
+    assert X.shape == (2, len(BINS), 5)
+    assert np.allclose(X, np.swapaxes(ref, -1, -2), rtol=0, atol=1e-9)
+
+
+def test_sliding_dft_matches_fft_bins():
+    rng = np.random.default_rng(10)
+    x = rng.standard_normal(4*N) + 1j*rng.standard_normal(4*N)
+    det = DSP.ToneDetector(list(BINS*Fs/N), Fs=Fs, N=N, method="sdft")
+    X = np.concatenate([det.update(x[s:s + 50]) for s in range(0, len(x), 50)], axis=-1)
+    padded = np.concatenate([np.zeros(N - 1), x])
+    for n in (0, N - 1, N, 2*N + 5, len(x) - 1):
+        ref = np.fft.fft(padded[n:n + N])[BINS]
+        assert np.allclose(X[:, n], ref, rtol=0, atol=1e-9)